@@ -1,18 +1,314 @@
 
+import hmac
+import os
+import time
+
 from flask import Flask, request, jsonify
-from flask import Response, make_response
+from flask import Response, make_response, g, send_file, url_for
+from weather_app.models.async_favorite_list_model import AsyncFavoriteListModel
 from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.models.favorites_store import SqliteFavoritesStore
 from weather_app.utils.sql_utils import check_database_connection, check_table_exists
 from weather_app.models.user_model import UserModel
+from weather_app.utils.async_http_transport import AsyncHttpTransport
+from weather_app.utils.encoding import COMPRESSORS, ENCODERS, JSON_MIMETYPE, compress, encode
+from weather_app.utils.event_loop import BackgroundEventLoop
+from weather_app.utils.fanout import FANOUT_MAX_WORKERS
+from weather_app.utils.geocode_cache import GeocodeCache
+from weather_app.utils.http_transport import HttpTransport
+from weather_app.utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, REGISTRY
+from weather_app.utils.profiling import PROFILE_HEADER, RequestProfiler
+from weather_app.utils.refresher import WeatherRefresher
+from weather_app.utils.tile_cache import TileCache
+from weather_app.utils.tiles import DEFAULT_MAP_ZOOM
 
 app = Flask(__name__)
-favorites_model = FavoriteListModel()
+transport = HttpTransport()  # Keep-alive connection pool shared by all OpenWeatherMap calls
+favorites_model = FavoriteListModel(
+    geocode_cache=GeocodeCache(persistent=True), transport=transport, store=SqliteFavoritesStore()
+)
+# The async routes share the store and caches above, and run on one long-lived event loop
+# so that their upstream connections and concurrency limit are shared across requests.
+async_loop = BackgroundEventLoop()
+async_favorites_model = AsyncFavoriteListModel(favorites_model, transport=AsyncHttpTransport())
 user_model = UserModel()
+tile_cache = TileCache()  # Tile images proxied through /weather/map/tiles, so clients never see the API key
+profiler = RequestProfiler()  # Profiles requests sent with PROFILE_TOKEN, or a PROFILE_SAMPLE_RATE of heavy ones
 API_KEY =  "your_openweathermap_api_key"  # Replace with your actual API key
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() == "true"  # Reject requests without a session token
+WEATHER_BATCH_MAX_ITEMS = int(os.getenv("WEATHER_BATCH_MAX_ITEMS", "500"))  # Pairs accepted by /weather/batch
+FAVORITES_BULK_MAX_ITEMS = int(os.getenv("FAVORITES_BULK_MAX_ITEMS", "200"))  # Cities accepted by /favorites/bulk-add
+# Map tiles hold no account data, and <img> tags that load a proxy_url cannot send a bearer token
+PUBLIC_ENDPOINTS = {"healthcheck", "db_check", "create_account", "login", "static", "get_map_tile"}
+# Internal services (e.g. dashboards) send SERVICE_TOKEN in X-Service-Token to call these routes
+# for any account. Empty disables the service credential.
+SERVICE_TOKEN = os.getenv("SERVICE_TOKEN", "")
+SERVICE_HEADER = "X-Service-Token"
+SERVICE_ENDPOINTS = {"get_weather_batch"}
+
+if not AUTH_REQUIRED:
+    app.logger.warning("AUTH_REQUIRED is off: requests without a session token may act on any account. "
+                       "This legacy mode is deprecated; set AUTH_REQUIRED=true.")
+
+# Keep the response cache warm for every favorited location so reads rarely wait on OpenWeatherMap
+refresher = WeatherRefresher(favorites_model, API_KEY)
+if os.getenv("REFRESH_ENABLED", "false").lower() == "true":
+    refresher.start()
+
+def _cache_counters():
+    """Return ``{cache name: (hits, misses, entries)}`` for the caches exposed at /api/metrics."""
+    responses = favorites_model.response_cache.stats()
+    geocodes = favorites_model.geocode_cache.stats()
+    tiles = tile_cache.stats()
+    return {
+        "response": (responses["hits"], responses["misses"], responses["size"]),
+        "geocode": (geocodes["memory_hits"] + geocodes["persistent_hits"], geocodes["misses"], geocodes["memory"]["size"]),
+        "tile": (tiles["hits"], tiles["misses"], tiles["tiles"]),
+    }
+
+# The caches keep their own counters; these read them when /api/metrics is scraped
+REGISTRY.callback("weather_app_cache_hits_total", "Cache hits, by cache.", ("cache",),
+                  lambda: {(name,): hits for name, (hits, _, _) in _cache_counters().items()}, kind="counter")
+REGISTRY.callback("weather_app_cache_misses_total", "Cache misses, by cache.", ("cache",),
+                  lambda: {(name,): misses for name, (_, misses, _) in _cache_counters().items()}, kind="counter")
+REGISTRY.callback("weather_app_cache_hit_ratio", "Fraction of cache lookups that hit since start, by cache.", ("cache",),
+                  lambda: {(name,): hits / (hits + misses) if hits + misses else 0.0
+                           for name, (hits, misses, _) in _cache_counters().items()})
+REGISTRY.callback("weather_app_cache_entries", "Entries held in memory, by cache.", ("cache",),
+                  lambda: {(name,): entries for name, (_, _, entries) in _cache_counters().items()})
+# Requests without a session token that act on an account; only possible while AUTH_REQUIRED is off
+ANONYMOUS_ACCOUNT_REQUESTS = REGISTRY.counter(
+    "weather_app_anonymous_account_requests_total",
+    "Requests without a session token that named an account (legacy access, AUTH_REQUIRED=false), by route.",
+    ("route",),
+)
+REGISTRY.callback("weather_app_upstream_coalesced_total",
+                  "Upstream calls avoided because an identical call was already in flight.",
+                  func=lambda: favorites_model.single_flight.stats()["coalesced"], kind="counter")
 
 ###################################################################################################################
 
 
+###############################################################
+# RESPONSE ENCODING
+###############################################################
+
+def _encoded(payload, status=200):
+    """
+    Build a response in the encoding the client prefers.
+
+    The body is compact JSON unless ``Accept`` prefers MessagePack, and it is
+    gzip- or deflate-compressed if ``Accept-Encoding`` allows it and the body
+    is at least RESPONSE_COMPRESSION_MIN_BYTES long. Used by the routes whose
+    payloads grow with the number of favorites.
+    """
+    mimetype, coding = _negotiated()
+    body, coding = compress(encode(payload, mimetype), coding)
+    response = Response(body, status=status, mimetype=mimetype)
+    if coding:
+        response.headers['Content-Encoding'] = coding
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+def _negotiated():
+    """Return the media type and content coding the client prefers; the coding is None for identity."""
+    mimetype = request.accept_mimetypes.best_match(list(ENCODERS), default=JSON_MIMETYPE)
+    return mimetype, request.accept_encodings.best_match(list(COMPRESSORS))
+
+def _representation():
+    """
+    Return what selects a weather read's body besides the cached data.
+
+    That is the route (``/weather`` and ``/weather/all`` read the same
+    responses), the ``fields`` projection, the forecast time window and the
+    negotiated encoding, so each of them gets its own ETag.
+    """
+    return (_route(), request.args.get('fields'), request.args.get('start'), request.args.get('end')) + _negotiated()
+
+def _not_modified(validator):
+    """Return True if the request's If-None-Match or If-Modified-Since matches ``validator``."""
+    if request.if_none_match:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110, section 13.1.3)
+        return request.if_none_match.contains_weak(validator.etag)
+    if request.if_modified_since is not None:
+        return validator.last_modified <= request.if_modified_since.timestamp()
+    return False
+
+def _with_validator(response, validator):
+    """Add ETag, Last-Modified and Cache-Control headers from ``validator`` to a response."""
+    response.set_etag(validator.etag, weak=True)
+    response.last_modified = validator.last_modified
+    response.cache_control.private = True
+    response.cache_control.max_age = validator.max_age
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+def _precondition(endpoint, user_id, city_name=None):
+    """
+    Answer a conditional request from the response cache alone.
+
+    Returns:
+        A 304 response if the client's copy matches the fresh cached responses
+        behind the read, else None. Stale responses are left to the read, which
+        revalidates them.
+    """
+    validator = favorites_model.get_cache_validator(endpoint, user_id, city_name, _representation())
+    if validator is not None and validator.max_age > 0 and _not_modified(validator):
+        return _with_validator(Response(status=304), validator)
+    return None
+
+def _validated(payload, endpoint, user_id, city_name=None):
+    """
+    Build the response to a weather read with validators and Cache-Control.
+
+    The validators are derived from the upstream timestamps of the cached
+    responses behind the read and from its representation; max-age is the time left before the first of
+    them expires. The read may have refreshed the cache, so they are taken
+    again here. A client whose copy still matches gets a 304 and the payload
+    is never serialized.
+    """
+    validator = favorites_model.get_cache_validator(endpoint, user_id, city_name, _representation())
+    if validator is None:
+        return _encoded(payload)
+    if _not_modified(validator):
+        return _with_validator(Response(status=304), validator)
+    return _with_validator(_encoded(payload), validator)
+
+###############################################################
+# METRICS
+###############################################################
+
+@app.before_request
+def start_request_timer():
+    """Record when the request started; registered first so that authentication is timed too."""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Count the request and record its latency under its route pattern.
+
+    The URL rule (for example ``/weather/map/tiles/<layer>/<int:z>/<int:x>/<int:y>.png``)
+    is used rather than the path, so the number of label values stays bounded.
+    """
+    started = g.get('request_started')
+    route = _route()
+    HTTP_REQUESTS.inc(request.method, route, str(response.status_code))
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route)
+    return response
+
+###############################################################
+# PROFILING
+###############################################################
+
+def _route():
+    """Return the route pattern of the current request, or 'unmatched'."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def start_profile():
+    """Profile this request if it carries the profile token or is sampled."""
+    g.profile = None
+    if profiler.should_profile(_route(), request.headers.get(PROFILE_HEADER)):
+        g.profile = profiler.start()
+
+@app.teardown_request
+def finish_profile(exc):
+    """Write the request's profile, also when the request failed."""
+    active = g.pop('profile', None)
+    if active is not None:
+        profiler.finish(active, _route(), g.get('username') or request.args.get('user_id'))
+
+###############################################################
+# AUTHENTICATION MIDDLEWARE
+###############################################################
+
+def _bearer_token():
+    """Return the bearer token from the Authorization header, or None."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    return token.strip()
+
+def _is_service_request():
+    """Return whether the request is to a service route and carries the service token."""
+    token = request.headers.get(SERVICE_HEADER)
+    return bool(SERVICE_TOKEN and token and request.endpoint in SERVICE_ENDPOINTS
+                and hmac.compare_digest(token.encode(), SERVICE_TOKEN.encode()))
+
+def _target_accounts():
+    """Return the usernames and user ids the request acts on, as two sets of strings."""
+    data = request.get_json(silent=True) if request.is_json else None
+    data = data if isinstance(data, dict) else {}
+    usernames = {request.args.get('username'), data.get('username')}
+    user_ids = {request.args.get('user_id'), data.get('user_id')}
+    items = data.get('items')
+    if isinstance(items, list):
+        user_ids.update(item.get('user_id') for item in items if isinstance(item, dict))
+    return ({str(name) for name in usernames if name is not None},
+            {str(user_id) for user_id in user_ids if user_id is not None})
+
+def _owns_target_account():
+    """Return whether every account the request names belongs to g.username."""
+    usernames, user_ids = _target_accounts()
+    if usernames - {g.username}:
+        return False
+    if user_ids:
+        return user_ids == {str(user_model.get_user_id(g.username))}
+    return True
+
+@app.before_request
+def authenticate_request():
+    """
+    Verify the session token on every request that presents one.
+
+    A valid token sets g.username. Verification is a signature check plus an 
+    in-memory session lookup, never a password hash. Public routes (health 
+    checks, account creation and login) are not checked. When AUTH_REQUIRED 
+    is enabled, every other route must carry a valid token.
+
+    A token only grants access to its own account: every username and 
+    user_id the request names, in the query string, the JSON body or the 
+    items of a batch, must belong to g.username.
+
+    Requests to SERVICE_ENDPOINTS that carry SERVICE_TOKEN in the 
+    X-Service-Token header are internal service calls and may name any 
+    account, so that dashboards can batch many users' pairs.
+
+    Requests without a token that name an account are legacy anonymous 
+    access. They are only served while AUTH_REQUIRED is off, and each one is 
+    logged and counted in weather_app_anonymous_account_requests_total so 
+    that remaining clients can be found before AUTH_REQUIRED is enabled.
+
+    Returns:
+        None to continue handling the request, a 401 JSON response if the 
+        token is invalid, expired or revoked, or missing while required, or 
+        a 403 JSON response if the request targets another user's account.
+    """
+    g.username = None
+    if request.endpoint in PUBLIC_ENDPOINTS or _is_service_request():
+        return None
+
+    token = _bearer_token()
+    if token is None:
+        if AUTH_REQUIRED:
+            return make_response(jsonify({"error": "Authentication required"}), 401)
+        usernames, user_ids = _target_accounts()
+        if usernames or user_ids:
+            ANONYMOUS_ACCOUNT_REQUESTS.inc(_route())
+            app.logger.info("Legacy anonymous request to %s for accounts %s", _route(),
+                            sorted(usernames | user_ids))
+        return None
+
+    g.username = user_model.authenticate_token(token)
+    if g.username is None:
+        return make_response(jsonify({"error": "Invalid or expired token"}), 401)
+    if not _owns_target_account():
+        return make_response(jsonify({"error": "Forbidden"}), 403)
+    return None
+
+
 ###############################################################
 # HEALTHCHECKS
 ###############################################################
@@ -31,7 +327,7 @@ def healthcheck() -> Response:
 @app.route('/api/db-check', methods=['GET'])
 def db_check() -> Response:
     """
-    Route to check if the database connection and meals table are functional.
+    Route to check if the database connection and users table are functional.
 
     Returns:
         JSON response indicating the database health status.
@@ -42,13 +338,107 @@ def db_check() -> Response:
         app.logger.info("Checking database connection...")
         check_database_connection()
         app.logger.info("Database connection is OK.")
-        app.logger.info("Checking if meals table exists...")
-        check_table_exists("meals")
-        app.logger.info("meals table exists.")
+        app.logger.info("Checking if users table exists...")
+        check_table_exists("users")
+        app.logger.info("users table exists.")
         return make_response(jsonify({'database_status': 'healthy'}), 200)
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/refresher', methods=['GET'])
+def refresher_stats() -> Response:
+    """
+    Route to report the background refresher's state.
+
+    Returns:
+        JSON response with refresh cycle counts, refresh durations and lag 
+        (how long the most overdue refreshed response had been stale), in seconds.
+    """
+    return make_response(jsonify(refresher.stats()), 200)
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose request, upstream, database and cache metrics.
+
+    Returns:
+        The metrics in the Prometheus text exposition format.
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles() -> Response:
+    """
+    Route to list the most recent request profiles with their top functions.
+
+    Query parameters: limit (profiles, default 20) and top (functions per 
+    profile by cumulative time, default 5; 0 lists the files only). The 
+    request must carry PROFILE_TOKEN in the X-Profile-Token header.
+
+    Returns:
+        JSON response with the profiler's counters and the profiles, newest first.
+    Raises:
+        400 error if limit or top is not an integer.
+        403 error if the profile token is missing or wrong, or PROFILE_TOKEN is not set.
+    """
+    if not profiler.is_authorized(request.headers.get(PROFILE_HEADER)):
+        return jsonify({"error": "A valid profile token is required"}), 403
+    try:
+        limit = int(request.args.get('limit', 20))
+        top = int(request.args.get('top', 5))
+    except ValueError:
+        return jsonify({"error": "limit and top must be integers"}), 400
+
+    profiles = profiler.list_profiles(limit)
+    if top > 0:
+        for profile in profiles:
+            try:
+                profile["functions"] = profiler.summarize(profile["name"], top)["functions"]
+            except ValueError:
+                profile["functions"] = []  # rotated away by another worker in the meantime
+    return make_response(jsonify({"stats": profiler.stats(), "profiles": profiles}), 200)
+
+@app.route('/api/profiles/<name>', methods=['GET'])
+def profile_summary(name: str) -> Response:
+    """
+    Route to summarize one request profile.
+
+    Query parameters: top (functions, default 25) and sort (cumulative or tottime). 
+    The request must carry PROFILE_TOKEN in the X-Profile-Token header.
+
+    Returns:
+        JSON response with the profile's call and time totals and its top functions.
+    Raises:
+        400 error if top or sort is invalid.
+        403 error if the profile token is missing or wrong, or PROFILE_TOKEN is not set.
+        404 error if there is no such profile.
+    """
+    if not profiler.is_authorized(request.headers.get(PROFILE_HEADER)):
+        return jsonify({"error": "A valid profile token is required"}), 403
+    sort = request.args.get('sort', 'cumulative')
+    try:
+        top = int(request.args.get('top', 25))
+    except ValueError:
+        return jsonify({"error": "top must be an integer"}), 400
+    if sort not in ('cumulative', 'tottime'):
+        return jsonify({"error": "sort must be cumulative or tottime"}), 400
+    try:
+        return make_response(jsonify(profiler.summarize(name, top, sort)), 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+@app.route('/api/spatial-grid', methods=['GET'])
+def spatial_grid_stats() -> Response:
+    """
+    Route to report how much the spatial grid collapses favorited locations.
+
+    Returns:
+        JSON response with, per endpoint, the geohash precision, the number of 
+        distinct favorited locations, the number of grid cells they fall in 
+        (the upstream locations actually fetched) and the fraction saved.
+    """
+    locations = favorites_model.store.distinct_locations()
+    return make_response(jsonify(favorites_model.response_cache.grid.collapse_stats(locations)), 200)
 
 ####################################################################################################################
 
@@ -67,6 +457,7 @@ def create_account():
         or an error message if something goes wrong.
     Raises:
         400 error if required fields are missing or account creation fails.
+        503 error if the password hashing queue is full.
     """
     data = request.json
     username = data.get('username')
@@ -80,6 +471,8 @@ def create_account():
         return jsonify({"message": "Account created successfully"}), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
     
 
 @app.route('/auth/login', methods=['POST'])
@@ -88,11 +481,13 @@ def login():
     Route to log in a user.
 
     Returns:
-        JSON response with a success message and a session token if the 
-        login is successful, or an error message if credentials are invalid.
+        JSON response with a success message, the user's id, a signed session 
+        token and its lifetime in seconds if the login is successful, or an error message 
+        if credentials are invalid.
     Raises:
         400 error if required fields are missing.
         401 error if the login credentials are invalid.
+        503 error if the password hashing queue is full.
     """
     data = request.json
     username = data.get('username')
@@ -101,11 +496,38 @@ def login():
     if not username or not password:
         return jsonify({"error": "Username and password are required"}), 400
 
-    if user_model.login(username, password):
-        # Generate and return a session token (implement token generation if needed)
-        return jsonify({"message": "Login successful", "token": "fake-token-for-now"}), 200
+    try:
+        logged_in = user_model.login(username, password)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+
+    if logged_in:
+        token = user_model.create_session(username)
+        return jsonify({
+            "message": "Login successful",
+            "user_id": user_model.get_user_id(username),
+            "token": token,
+            "expires_in": int(user_model.sessions.ttl),
+        }), 200
     return jsonify({"error": "Invalid credentials"}), 401
 
+@app.route('/auth/logout', methods=['POST'])
+def logout():
+    """
+    Route to revoke the session token sent in the Authorization header.
+
+    Returns:
+        JSON response with a success message if the session is revoked.
+    Raises:
+        400 error if no bearer token is provided.
+    """
+    token = _bearer_token()
+    if not token:
+        return jsonify({"error": "Bearer token is required"}), 400
+
+    user_model.revoke_session(token)
+    return jsonify({"message": "Logged out successfully"}), 200
+
 @app.route('/auth/update-password', methods=['PUT'])
 def update_password():
     """
@@ -116,6 +538,8 @@ def update_password():
         or an error message if something goes wrong.
     Raises:
         400 error if required fields are missing or the update fails.
+        403 error if the session token belongs to another user.
+        503 error if the password hashing queue is full.
     """
     data = request.json
     username = data.get('username')
@@ -126,9 +550,11 @@ def update_password():
 
     try:
         user_model.update_password(username, new_password)
-        return jsonify({"message": "Password updated successfully"}), 200
-    except Exception as e:
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({"message": "Password updated successfully"}), 200
 ####################################################################################################################
 
 ###############################################################
@@ -159,6 +585,42 @@ def add_city():
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route('/favorites/bulk-add', methods=['POST'])
+def bulk_add_cities():
+    """
+    Route to add many cities to the user's favorites in one request.
+
+    Names are deduplicated, unknown cities are geocoded concurrently and all 
+    inserts are applied in one transaction. Each city reports its own status.
+
+    Returns:
+        JSON response with one result per requested city, in request order, 
+        and the number of results with each status.
+    Raises:
+        400 error if required fields are missing, malformed, or there are 
+        more than FAVORITES_BULK_MAX_ITEMS cities.
+    """
+    data = request.get_json(silent=True) or {}
+    user_id = data.get('user_id')
+    city_names = data.get('city_names')
+
+    if not user_id or not isinstance(city_names, list) or not city_names:
+        return jsonify({"error": "Missing required fields"}), 400
+    if len(city_names) > FAVORITES_BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {FAVORITES_BULK_MAX_ITEMS} cities are allowed per request"}), 400
+    if not all(isinstance(city_name, str) and city_name.strip() for city_name in city_names):
+        return jsonify({"error": "City names must be non-empty strings"}), 400
+
+    max_parallelism = request.args.get('max_parallelism', type=int)
+    if max_parallelism is not None:
+        max_parallelism = min(max(max_parallelism, 1), FANOUT_MAX_WORKERS)
+
+    results = favorites_model.add_cities(user_id, city_names, API_KEY, max_parallelism=max_parallelism)
+    summary = {"added": 0, "exists": 0, "duplicate": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return _encoded({"results": results, "summary": summary})
+
 @app.route('/favorites/remove', methods=['DELETE'])
 def remove_city():
     """
@@ -201,15 +663,37 @@ def get_all_favorites():
 
     try:
         favorites = favorites_model.get_all_favorites(int(user_id))
-        return jsonify({"favorites": favorites}), 200
+        return _encoded({"favorites": favorites})
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
+def _fields_arg():
+    """Return the comma-separated ``fields`` query parameter as a list, or None if it is absent."""
+    fields = request.args.get('fields')
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+def _time_window_args():
+    """Return the ``start`` and ``end`` query parameters as Unix timestamps, None where absent."""
+    window = []
+    for name in ('start', 'end'):
+        value = request.args.get(name)
+        if value is not None:
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {value}. Expected a Unix timestamp.")
+        window.append(value)
+    return tuple(window)
+
 @app.route('/weather', methods=['GET'])
 def get_weather():
     """
     Route to fetch current weather for a specific city in a user's favorites.
 
+    An optional comma-separated ``fields`` parameter returns only those fields, flattened.
+
     Returns:
         JSON response containing the weather data if successful,
         or an error message if something goes wrong.
@@ -223,15 +707,11 @@ def get_weather():
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        favorites = favorites_model.get_all_favorites(int(user_id))
-        favorite = next((fav for fav in favorites if fav["city_name"] == city_name), None)
-        if not favorite:
-            raise ValueError(f"City {city_name} not in favorites.")
-
-        weather = favorites_model.get_weather(
-            city_name, favorite["latitude"], favorite["longitude"], API_KEY
-        )
-        return jsonify({"weather": weather}), 200
+        not_modified = _precondition("weather", int(user_id), city_name)
+        if not_modified is not None:
+            return not_modified
+        weather = favorites_model.get_weather(int(user_id), city_name, API_KEY, fields=_fields_arg())
+        return _validated({"weather": weather}, "weather", int(user_id), city_name)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
@@ -240,6 +720,9 @@ def get_forecast():
     """
     Route to fetch the weather forecast for a specific city in a user's favorites.
 
+    Optional ``fields`` (comma-separated) and ``start``/``end`` (Unix timestamps)
+    parameters return the selected fields over that window in columnar form.
+
     Returns:
         JSON response containing the forecast data if successful,
         or an error message if something goes wrong.
@@ -253,15 +736,12 @@ def get_forecast():
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        favorites = favorites_model.get_all_favorites(int(user_id))
-        favorite = next((fav for fav in favorites if fav["city_name"] == city_name), None)
-        if not favorite:
-            raise ValueError(f"City {city_name} not in favorites.")
-
-        forecast = favorites_model.get_forecast(
-            city_name, favorite["latitude"], favorite["longitude"], API_KEY
-        )
-        return jsonify({"forecast": forecast}), 200
+        start, end = _time_window_args()
+        not_modified = _precondition("forecast", int(user_id), city_name)
+        if not_modified is not None:
+            return not_modified
+        forecast = favorites_model.get_forecast(int(user_id), city_name, API_KEY, _fields_arg(), start, end)
+        return _validated({"forecast": forecast}, "forecast", int(user_id), city_name)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
@@ -283,15 +763,11 @@ def get_air_pollution():
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        favorites = favorites_model.get_all_favorites(int(user_id))
-        favorite = next((fav for fav in favorites if fav["city_name"] == city_name), None)
-        if not favorite:
-            raise ValueError(f"City {city_name} not in favorites.")
-
-        air_pollution = favorites_model.get_air_pollution(
-            favorite["latitude"], favorite["longitude"], API_KEY
-        )
-        return jsonify({"air_pollution": air_pollution}), 200
+        not_modified = _precondition("air_pollution", int(user_id), city_name)
+        if not_modified is not None:
+            return not_modified
+        air_pollution = favorites_model.get_air_pollution(int(user_id), city_name, API_KEY)
+        return _validated({"air_pollution": air_pollution}, "air_pollution", int(user_id), city_name)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     
@@ -300,12 +776,17 @@ def get_all_weather():
     """
     Route to fetch current weather for all favorite cities of a user.
 
+    Cities are fetched concurrently. The optional max_parallelism query 
+    parameter caps how many are fetched at once for this request.
+
     Returns:
         JSON response containing the weather data for all favorite cities 
-        if successful, or an error message if something goes wrong.
+        that could be fetched, plus an error message for each city that 
+        failed or timed out.
     Raises:
         400 error if the required user_id field is missing.
         404 error if no favorite cities are found for the user.
+        502 error if the weather could not be fetched for any city.
     """
     user_id = request.args.get('user_id')
 
@@ -313,34 +794,76 @@ def get_all_weather():
         return jsonify({"error": "Missing required field: user_id"}), 400
 
     try:
+        max_parallelism = request.args.get('max_parallelism', type=int)
+        if max_parallelism is not None:
+            max_parallelism = min(max(max_parallelism, 1), FANOUT_MAX_WORKERS)
+
         # Get all favorite cities for the user
         favorites = favorites_model.get_all_favorites(int(user_id))
         if not favorites:
             return jsonify({"error": "No favorites found for user"}), 404
+        not_modified = _precondition("weather", int(user_id), None)
+        if not_modified is not None:
+            return not_modified
 
-        # Fetch current weather for all favorites
-        all_weather = {}
-        for favorite in favorites:
-            weather = favorites_model.get_weather(
-                favorite["city_name"], favorite["latitude"], favorite["longitude"], API_KEY
-            )
-            all_weather[favorite["city_name"]] = weather
+        # Fetch current weather for all favorites concurrently; hot cities come from the shared response cache
+        all_weather, errors = favorites_model.get_all_weather_partial(
+            int(user_id), API_KEY, max_parallelism=max_parallelism
+        )
+        if not all_weather:
+            return jsonify({"error": "Failed to fetch weather for any favorite", "errors": errors}), 502
 
-        return jsonify({"all_weather": all_weather}), 200
+        return _validated({"all_weather": all_weather, "errors": errors}, "weather", int(user_id))
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route('/weather/batch', methods=['POST'])
+def get_weather_batch():
+    """
+    Route to fetch current weather for many (user_id, city_name) pairs in one request.
+
+    Pairs that resolve to the same location share a single upstream call, and 
+    the unique locations are fetched concurrently. Each item reports its own 
+    status, so one failing city does not fail the batch.
+
+    Returns:
+        JSON response with one result per requested pair, in request order, 
+        and the number of results with each status.
+    Raises:
+        400 error if the items list is missing, malformed or larger than WEATHER_BATCH_MAX_ITEMS.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing required field: items"}), 400
+    if len(items) > WEATHER_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {WEATHER_BATCH_MAX_ITEMS} items are allowed per batch"}), 400
+
+    try:
+        pairs = [(int(item['user_id']), item['city_name']) for item in items]
+    except (TypeError, KeyError, ValueError):
+        return jsonify({"error": "Each item requires user_id and city_name"}), 400
+
+    results = favorites_model.get_weather_batch(pairs, API_KEY)
+    summary = {"ok": 0, "not_found": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return _encoded({"results": results, "summary": summary})
+
 @app.route('/weather/map', methods=['GET'])
 def get_weather_map():
     """
     Route to fetch a specific weather criteria map tile for a city.
 
     Returns:
-        JSON response containing the map tile URL for the requested weather criteria 
-        if successful, or an error message if something goes wrong.
+        JSON response containing the tile coordinates and the URL of the tile on 
+        this service's tile proxy for the requested weather criteria if successful, 
+        or an error message if something goes wrong. The OpenWeatherMap URL, which 
+        carries the API key, is never returned.
     Raises:
         400 error if required fields (user_id, city_name, or criteria) are missing 
-        or if the requested criteria is invalid.
+        or if the requested criteria or zoom is invalid.
     """
     user_id = request.args.get('user_id')
     city_name = request.args.get('city_name')
@@ -350,9 +873,235 @@ def get_weather_map():
         return jsonify({"error": "Missing required fields: user_id, city_name, or criteria"}), 400
 
     try:
-        # Now we directly call the new get_weather_map() method from the model,
-        # which handles looking up the city in the user's favorites and returning the tile URL.
-        weather_map = favorites_model.get_weather_map(int(user_id), city_name, criteria, API_KEY)
+        zoom = int(request.args.get('zoom', DEFAULT_MAP_ZOOM))
+        # The model looks the city up in the user's favorites and locates the tile; clients
+        # download it through the tile proxy, so the API key never leaves the server.
+        weather_map = favorites_model.get_weather_map(int(user_id), city_name, criteria, zoom=zoom)
+        weather_map["proxy_url"] = _tile_proxy_url(weather_map["layer"], zoom, weather_map["x"], weather_map["y"])
         return jsonify({"weather_map": weather_map}), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+
+@app.route('/weather/map/all', methods=['GET'])
+def get_weather_map_all():
+    """
+    Route to fetch the deduplicated set of map tiles covering all of a user's favorites.
+
+    The optional min_zoom and max_zoom query parameters select a range of 
+    zoom levels; both default to the standard map zoom.
+
+    Returns:
+        JSON response containing the layer, the zoom levels and the tiles 
+        (zoom, x, y and tile proxy URL) covering every favorite.
+    Raises:
+        400 error if required fields (user_id or criteria) are missing, or if 
+        the criteria or zoom range is invalid.
+    """
+    user_id = request.args.get('user_id')
+    criteria = request.args.get('criteria')
+
+    if not all([user_id, criteria]):
+        return jsonify({"error": "Missing required fields: user_id or criteria"}), 400
+
+    try:
+        min_zoom = int(request.args.get('min_zoom', DEFAULT_MAP_ZOOM))
+        max_zoom = int(request.args.get('max_zoom', min_zoom))
+        weather_map = favorites_model.get_weather_map_all(int(user_id), criteria, min_zoom, max_zoom)
+        for tile in weather_map["tiles"]:
+            tile["proxy_url"] = _tile_proxy_url(weather_map["layer"], tile["zoom"], tile["x"], tile["y"])
+        return jsonify({"weather_map": weather_map}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+def _tile_proxy_url(layer, z, x, y):
+    """Return the URL of a tile on this service's tile proxy."""
+    return url_for('get_map_tile', layer=layer, z=z, x=x, y=y)
+
+@app.route('/weather/map/tiles/<layer>/<int:z>/<int:x>/<int:y>.png', methods=['GET'])
+def get_map_tile(layer, z, x, y):
+    """
+    Route to serve a weather map tile image through the local tile cache.
+
+    Tiles are downloaded from OpenWeatherMap only on a cache miss or after 
+    their layer's TTL, and served straight from disk otherwise. The response 
+    carries an ETag (the content hash), so a client that already has the 
+    tile gets a 304.
+
+    Returns:
+        The PNG tile, or 304 Not Modified if If-None-Match matches.
+    Raises:
+        400 error if the layer or tile coordinates are invalid.
+        502 error if the tile could not be downloaded.
+    """
+    try:
+        fetch = lambda: favorites_model.fetch_tile(layer, z, x, y, API_KEY)
+        entry = tile_cache.get(layer, z, x, y, fetch)
+        try:
+            response = send_file(entry.path, mimetype='image/png', etag=entry.digest,
+                                 conditional=True, max_age=entry.max_age())
+        except FileNotFoundError:
+            # Evicted between lookup and open by a burst of other tiles; fetch it again
+            entry = tile_cache.get(layer, z, x, y, fetch)
+            response = send_file(entry.path, mimetype='image/png', etag=entry.digest,
+                                 conditional=True, max_age=entry.max_age())
+        response.headers['Cache-Control'] = f'public, max-age={entry.max_age()}'
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 502
+
+
+
+###############################################################
+# ASYNC FAVORITE LIST MODEL
+###############################################################
+
+@app.route('/async/favorites/add', methods=['POST'])
+async def async_add_city():
+    """
+    Asynchronous version of /favorites/add; the geocoding call does not block a thread.
+
+    Returns:
+        JSON response with a success message if the city is added, 
+        or an error message if something goes wrong.
+    Raises:
+        400 error if required fields are missing or the city cannot be added.
+    """
+    data = request.json
+    user_id = data.get('user_id')
+    city_name = data.get('city_name')
+
+    if not all([user_id, city_name]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        await async_loop.run_async(async_favorites_model.add_city(user_id, city_name, API_KEY))
+        return jsonify({"message": f"City {city_name} added to favorites"}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/async/weather', methods=['GET'])
+async def async_get_weather():
+    """
+    Asynchronous version of /weather.
+
+    Returns:
+        JSON response containing the weather data if successful,
+        or an error message if something goes wrong.
+    Raises:
+        400 error if required fields are missing or if the city is not in the user's favorites.
+    """
+    user_id = request.args.get('user_id')
+    city_name = request.args.get('city_name')
+
+    if not all([user_id, city_name]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        not_modified = _precondition("weather", int(user_id), city_name)
+        if not_modified is not None:
+            return not_modified
+        weather = await async_loop.run_async(
+            async_favorites_model.get_weather(int(user_id), city_name, API_KEY, fields=_fields_arg())
+        )
+        return _validated({"weather": weather}, "weather", int(user_id), city_name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/async/forecast', methods=['GET'])
+async def async_get_forecast():
+    """
+    Asynchronous version of /forecast.
+
+    Returns:
+        JSON response containing the forecast data if successful,
+        or an error message if something goes wrong.
+    Raises:
+        400 error if required fields are missing or if the city is not in the user's favorites.
+    """
+    user_id = request.args.get('user_id')
+    city_name = request.args.get('city_name')
+
+    if not all([user_id, city_name]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        start, end = _time_window_args()
+        not_modified = _precondition("forecast", int(user_id), city_name)
+        if not_modified is not None:
+            return not_modified
+        forecast = await async_loop.run_async(
+            async_favorites_model.get_forecast(int(user_id), city_name, API_KEY, _fields_arg(), start, end)
+        )
+        return _validated({"forecast": forecast}, "forecast", int(user_id), city_name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/async/air_pollution', methods=['GET'])
+async def async_get_air_pollution():
+    """
+    Asynchronous version of /air_pollution.
+
+    Returns:
+        JSON response containing the air pollution data if successful,
+        or an error message if something goes wrong.
+    Raises:
+        400 error if required fields are missing or if the city is not in the user's favorites.
+    """
+    user_id = request.args.get('user_id')
+    city_name = request.args.get('city_name')
+
+    if not all([user_id, city_name]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        not_modified = _precondition("air_pollution", int(user_id), city_name)
+        if not_modified is not None:
+            return not_modified
+        air_pollution = await async_loop.run_async(
+            async_favorites_model.get_air_pollution(int(user_id), city_name, API_KEY)
+        )
+        return _validated({"air_pollution": air_pollution}, "air_pollution", int(user_id), city_name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/async/weather/all', methods=['GET'])
+async def async_get_all_weather():
+    """
+    Asynchronous version of /weather/all; each city is a coroutine instead of a pool thread.
+
+    Returns:
+        JSON response containing the weather data for all favorite cities 
+        that could be fetched, plus an error message for each city that 
+        failed or timed out.
+    Raises:
+        400 error if the required user_id field is missing.
+        404 error if no favorite cities are found for the user.
+        502 error if the weather could not be fetched for any city.
+    """
+    user_id = request.args.get('user_id')
+
+    if not user_id:
+        return jsonify({"error": "Missing required field: user_id"}), 400
+
+    try:
+        max_parallelism = request.args.get('max_parallelism', type=int)
+        if max_parallelism is not None:
+            max_parallelism = min(max(max_parallelism, 1), async_favorites_model.transport.max_concurrency)
+
+        if not favorites_model.get_all_favorites(int(user_id)):
+            return jsonify({"error": "No favorites found for user"}), 404
+        not_modified = _precondition("weather", int(user_id), None)
+        if not_modified is not None:
+            return not_modified
+
+        all_weather, errors = await async_loop.run_async(
+            async_favorites_model.get_all_weather_partial(int(user_id), API_KEY, max_parallelism=max_parallelism)
+        )
+        if not all_weather:
+            return jsonify({"error": "Failed to fetch weather for any favorite", "errors": errors}), 502
+
+        return _validated({"all_weather": all_weather, "errors": errors}, "weather", int(user_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,106 @@
+"""Compare response encodings on /weather/all payloads of increasing size.
+
+Run from the weather_app2 directory:
+
+    python -m benchmarks.bench_encodings --favorites 10 100 1000 --repeat 50
+
+Each payload is shaped like the output of ``get_all_weather`` for a user
+with that many favorites, filled with realistic OpenWeatherMap current
+weather responses. For every serializer and content coding the benchmark
+reports the median time to produce the body (serialization plus
+compression) and its size. ``stdlib`` is what ``jsonify`` does by default
+(sorted keys); ``stdlib-pretty`` is its debug-mode indented output.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from weather_app.utils.encoding import COMPRESSORS, RESPONSE_COMPRESSION_LEVEL, encode_json, encode_msgpack
+
+
+SERIALIZERS = {
+    "stdlib": lambda data: json.dumps(data, sort_keys=True).encode(),
+    "stdlib-pretty": lambda data: json.dumps(data, sort_keys=True, indent=2).encode(),
+    "orjson": encode_json,
+    "msgpack": encode_msgpack,
+}
+CONDITIONS = [
+    ("Clear", "clear sky", "01d"),
+    ("Clouds", "scattered clouds", "03d"),
+    ("Clouds", "overcast clouds", "04d"),
+    ("Rain", "light rain", "10d"),
+    ("Snow", "light snow", "13d"),
+]
+
+
+def weather_response(rng: random.Random, city_id: int) -> dict:
+    """Return a current weather response like the ones OpenWeatherMap sends."""
+    lat, lon = round(rng.uniform(-60, 70), 4), round(rng.uniform(-180, 180), 4)
+    temp = round(rng.uniform(250, 310), 2)
+    main, description, icon = rng.choice(CONDITIONS)
+    return {
+        "coord": {"lon": lon, "lat": lat},
+        "weather": [{"id": 800 + city_id % 5, "main": main, "description": description, "icon": icon}],
+        "base": "stations",
+        "main": {
+            "temp": temp, "feels_like": round(temp - rng.uniform(0, 4), 2), "temp_min": round(temp - 1.2, 2),
+            "temp_max": round(temp + 1.4, 2), "pressure": rng.randint(990, 1035),
+            "humidity": rng.randint(20, 100), "sea_level": rng.randint(990, 1035), "grnd_level": rng.randint(900, 1030),
+        },
+        "visibility": 10000,
+        "wind": {"speed": round(rng.uniform(0, 15), 2), "deg": rng.randint(0, 359), "gust": round(rng.uniform(0, 20), 2)},
+        "clouds": {"all": rng.randint(0, 100)},
+        "dt": 1700000000 + rng.randint(0, 3600),
+        "sys": {"type": 2, "id": 2000000 + city_id, "country": "GB", "sunrise": 1699946000, "sunset": 1699978000},
+        "timezone": 0,
+        "id": 2600000 + city_id,
+        "name": f"City {city_id}",
+        "cod": 200,
+    }
+
+
+def all_weather_payload(favorites: int, seed: int = 0) -> dict:
+    """Return a ``/weather/all`` response body for a user with ``favorites`` cities."""
+    rng = random.Random(seed)
+    all_weather = {f"City {i}": weather_response(rng, i) for i in range(favorites)}
+    return {"all_weather": all_weather, "errors": {}}
+
+
+def measure(serialize, coding: str, payload: dict, repeat: int) -> tuple:
+    """Return the median seconds to produce the body and its size in bytes."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = serialize(payload)
+        if coding != "identity":
+            body = COMPRESSORS[coding](body, RESPONSE_COMPRESSION_LEVEL)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--favorites", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--codings", nargs="+", default=["identity"] + list(COMPRESSORS),
+                        choices=["identity"] + list(COMPRESSORS))
+    args = parser.parse_args()
+
+    print(f"compression level={RESPONSE_COMPRESSION_LEVEL} repeat={args.repeat}")
+    print(f"{'favorites':>10} {'format':>14} {'coding':>9} {'encode ms':>10} {'bytes':>10} {'vs stdlib':>10}")
+    for favorites in args.favorites:
+        payload = all_weather_payload(favorites)
+        baseline = None
+        for name, serialize in SERIALIZERS.items():
+            for coding in args.codings:
+                seconds, size = measure(serialize, coding, payload, args.repeat)
+                if baseline is None:
+                    baseline = size
+                print(f"{favorites:>10} {name:>14} {coding:>9} {seconds * 1000:>10.3f} {size:>10} "
+                      f"{size / baseline:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
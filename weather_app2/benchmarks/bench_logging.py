@@ -0,0 +1,122 @@
+"""Measure the logging cost a request pays before and after the queued logging pipeline.
+
+Run from the weather_app2 directory:
+
+    python -m benchmarks.bench_logging --favorites 20 --requests 2000 --threads 1 8
+
+Each simulated request logs what a /weather/all call for a user with
+``--favorites`` favorites logged: the favorites list, then per city a cache
+hit or an upstream call with its payload. Modes:
+
+- ``legacy``: the previous setup. Every module logger had its own stderr
+  handler and the root logger a ``basicConfig`` one, so each record was
+  formatted and written twice on the request thread, payloads included.
+- ``queued``: the same messages through ``setup_logging``: filtered and
+  truncated on the request thread, formatted and written on the writer thread.
+- ``queued+summaries``: the queued pipeline with the current messages, which
+  log counts instead of payloads and cache hits at DEBUG.
+
+Output goes to /dev/null so that terminal speed is not measured. Times are
+what the request threads spend in logging calls; the writer thread's
+backlog is drained between modes and is not counted.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import time
+
+from benchmarks.bench_encodings import all_weather_payload
+from weather_app.utils.logger import LOG_FORMAT, RateLimitFilter, logging_stats, setup_logging
+
+
+def legacy_loggers(stream) -> tuple:
+    """Recreate the previous configuration on a private logger tree."""
+    root = logging.getLogger("bench_legacy")
+    root.propagate = False
+    root.setLevel(logging.INFO)
+    root_handler = logging.StreamHandler(stream)  # stands in for the basicConfig handler
+    root_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    root.addHandler(root_handler)
+
+    model = logging.getLogger("bench_legacy.favorite_list_model")
+    transport = logging.getLogger("bench_legacy.http_transport")
+    for logger in (model, transport):
+        logger.setLevel(logging.DEBUG)
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+    return model, transport
+
+
+def request_legacy_messages(model, transport, favorites: list, payloads: dict, user_id: int):
+    model.info("Retrieved favorites for user ID %d: %s", user_id, favorites)
+    for i, favorite in enumerate(favorites):
+        if i % 2:
+            model.info("Response cache hit for %s at (%s, %s).", "weather", favorite["latitude"], favorite["longitude"])
+        else:
+            transport.info("GET %s -> %d in %.1f ms", "https://api.openweathermap.org/data/2.5/weather", 200, 85.3)
+            model.info("API call to %s successful: %s", "weather", payloads[favorite["city_name"]])
+
+
+def request_current_messages(model, transport, favorites: list, payloads: dict, user_id: int):
+    model.info("Retrieved %d favorites for user ID %d.", len(favorites), user_id)
+    for i, favorite in enumerate(favorites):
+        if i % 2:
+            model.debug("Response cache hit for %s at (%s, %s).", "weather", favorite["latitude"], favorite["longitude"])
+        else:
+            transport.info("GET %s -> %d in %.1f ms", "https://api.openweathermap.org/data/2.5/weather", 200, 85.3)
+            model.info("API call to %s successful.", "weather")
+
+
+def run(request, loggers: tuple, favorites: list, payloads: dict, requests: int, threads: int) -> float:
+    """Return the mean microseconds spent logging per request."""
+    def one(i):
+        started = time.perf_counter()
+        request(*loggers, favorites, payloads, i)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        elapsed = sum(pool.map(one, range(requests)))
+    return elapsed / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--favorites", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="disable the rate limit filter, to measure the pipeline without suppression")
+    args = parser.parse_args()
+
+    all_weather = all_weather_payload(args.favorites)["all_weather"]
+    favorites = [
+        {"city_name": name, "latitude": data["coord"]["lat"], "longitude": data["coord"]["lon"]}
+        for name, data in all_weather.items()
+    ]
+
+    with open(os.devnull, "w") as devnull:
+        handler = setup_logging(stream=devnull)
+        if args.no_rate_limit:
+            for log_filter in handler.filters:
+                if isinstance(log_filter, RateLimitFilter):
+                    log_filter.rate = 0
+        queued = (logging.getLogger("bench.favorite_list_model"), logging.getLogger("bench.http_transport"))
+        modes = [
+            ("legacy", request_legacy_messages, legacy_loggers(devnull)),
+            ("queued", request_legacy_messages, queued),
+            ("queued+summaries", request_current_messages, queued),
+        ]
+        print(f"favorites={args.favorites} requests={args.requests}")
+        print(f"{'mode':>18} {'threads':>8} {'us/request':>11}")
+        for name, request, loggers in modes:
+            for threads in args.threads:
+                micros = run(request, loggers, favorites, all_weather, args.requests, threads)
+                handler.queue.join()  # let the writer catch up before the next mode
+                print(f"{name:>18} {threads:>8} {micros:>11.1f}")
+        print(f"pipeline counters: {logging_stats()}")
+
+
+if __name__ == "__main__":
+    main()
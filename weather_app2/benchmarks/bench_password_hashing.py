@@ -0,0 +1,78 @@
+"""Measure login throughput against the size of the password hashing pool.
+
+Run from the weather_app2 directory:
+
+    python -m benchmarks.bench_password_hashing --pool-sizes 0 1 2 4 --clients 16 --logins 200
+
+Pool size 0 hashes inline on the request threads, which is the behaviour
+before hashing was offloaded.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from weather_app.models.user_model import UserModel
+from weather_app.utils.password_hasher import PASSWORD_HASH_METHOD, PasswordHasher
+from weather_app.utils.sql_utils import get_db_connection, get_pool
+
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "sql", "create_user_table.sql")
+
+
+def run(pool_size: int, method: str, clients: int, logins: int, users: int) -> float:
+    """Create ``users`` accounts, then perform ``logins`` logins from ``clients`` threads.
+
+    Returns
+    -------
+    float
+        Logins per second.
+    """
+    hasher = PasswordHasher(method=method, workers=pool_size)
+    model = UserModel(hasher=hasher)
+    try:
+        for i in range(users):
+            model.create_account(f"user{i}", f"password{i}")
+        # Warm the worker processes so their start-up cost is not measured.
+        for i in range(max(pool_size, 1)):
+            model.login(f"user{i % users}", f"password{i % users}")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as clients_pool:
+            results = list(clients_pool.map(
+                lambda i: model.login(f"user{i % users}", f"password{i % users}"), range(logins)
+            ))
+        elapsed = time.perf_counter() - started
+    finally:
+        hasher.shutdown()
+
+    if not all(results):
+        raise RuntimeError("Some logins failed during the benchmark.")
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[0, 1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--method", default=PASSWORD_HASH_METHOD, help="werkzeug hashing method and work factor")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent login threads")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"method={args.method} clients={args.clients} logins={args.logins}")
+    print(f"{'pool size':>10} {'logins/s':>10}")
+    for pool_size in args.pool_sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch("weather_app.utils.sql_utils.DB_PATH", os.path.join(tmp_dir, "bench.db")):
+                with open(SCHEMA_PATH) as schema, get_db_connection() as conn:
+                    conn.executescript(schema.read())
+                rate = run(pool_size, args.method, args.clients, args.logins, args.users)
+                get_pool().close()
+        print(f"{pool_size:>10} {rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""Benchmark the model and the Flask app against a local fake OpenWeatherMap.
+
+Run from the weather_app2 directory:
+
+    python -m benchmarks.bench_suite --scales 10x5x4 100x10x16 --profile typical --output results.json
+    python -m benchmarks.bench_suite --profile typical --baseline baseline.json
+    python -m benchmarks.bench_suite --compare results.json --baseline baseline.json
+
+A scale is ``USERSxFAVORITESxCONCURRENCY``. For each scale and target, a
+fresh model (or the app's model) gets ``USERS`` users with ``FAVORITES``
+favorites each, drawn from a shared pool of cities so that users overlap.
+Then ``--requests`` operations run from ``CONCURRENCY`` threads. They are a
+mix of all-favorites weather, single-city weather and forecast reads:
+
+- ``model``: ``FavoriteListModel`` calls.
+- ``app``: the same reads through the Flask app's routes with the test client.
+
+Upstream calls go over HTTP to ``benchmarks.fake_owm``, which delays and
+fails them according to ``--profile``. ``--cache cold`` disables the response
+cache so that every read reaches the fake service. ``warm`` keeps it, as in
+production.
+
+Per operation the results record throughput, p50/p95/p99 latency and errors.
+Each run is repeated under ``tracemalloc`` to record peak traced memory;
+``--no-memory`` skips that pass. Results are written as JSON. With
+``--baseline``, p95/p99 latency, throughput and peak memory are compared to a
+stored results file. The exit status is 1 if any moved the wrong way by more
+than ``--tolerance``.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.fake_owm import PROFILES, FakeOwmServer
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils import sql_utils
+from weather_app.utils.http_transport import HttpTransport
+from weather_app.utils.response_cache import ResponseCache
+
+
+API_KEY = "benchmark"
+# Relative weight of each operation in the request mix
+OPERATION_MIX = {"weather_all": 2, "weather": 5, "forecast": 3}
+# Metrics compared against a baseline, and whether a higher value is better
+COMPARED_METRICS = {"throughput_rps": True, "p95_ms": False, "p99_ms": False, "peak_memory_bytes": False}
+
+
+def parse_scale(value: str) -> tuple:
+    """Parse ``"USERSxFAVORITESxCONCURRENCY"``."""
+    try:
+        users, favorites, concurrency = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected USERSxFAVORITESxCONCURRENCY, got {value!r}")
+    return users, favorites, concurrency
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Return the nearest-rank percentile of an ascending list, or 0.0 if it is empty."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies: list, errors: int, elapsed: float) -> dict:
+    """Return request counts, throughput and latency percentiles in milliseconds."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "error_rate": round(errors / len(ordered), 4) if ordered else 0.0,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def workload(users: int, favorites: int, requests: int, seed: int) -> tuple:
+    """Return ``(favorites by user, operations)`` for a scale, the same for every target and run."""
+    rng = random.Random(seed)
+    pool = [f"City {i}" for i in range(max(favorites, users * favorites // 2))]
+    by_user = {user_id: rng.sample(pool, favorites) for user_id in range(1, users + 1)}
+    names, weights = zip(*OPERATION_MIX.items())
+    operations = []
+    for _ in range(requests):
+        user_id = rng.randint(1, users)
+        operations.append((rng.choices(names, weights)[0], user_id, rng.choice(by_user[user_id])))
+    return by_user, operations
+
+
+class ModelTarget:
+    """Runs operations as ``FavoriteListModel`` calls."""
+
+    name = "model"
+
+    def __init__(self, server: FakeOwmServer, cache: str):
+        response_cache = ResponseCache(ttls={}) if cache == "cold" else ResponseCache()
+        self.transport = HttpTransport(**server.transport_urls())
+        self.model = FavoriteListModel(response_cache=response_cache, transport=self.transport)
+
+    def add_favorites(self, user_id: int, cities: list):
+        self.model.add_cities(user_id, cities, API_KEY)
+
+    def run(self, operation: str, user_id: int, city_name: str) -> bool:
+        """Run one operation and return True if it succeeded."""
+        try:
+            if operation == "weather_all":
+                _, errors = self.model.get_all_weather_partial(user_id, API_KEY)
+                return not errors
+            if operation == "weather":
+                self.model.get_weather(user_id, city_name, API_KEY)
+            else:
+                self.model.get_forecast(user_id, city_name, API_KEY)
+            return True
+        except (RuntimeError, ValueError):
+            return False
+
+    def close(self):
+        self.transport.close()
+
+
+class AppTarget:
+    """Runs operations as requests to the Flask app's routes through the test client.
+
+    The app module holds one model for the process. Its favorites and
+    geocodes stay in the scratch SQLite database between runs, while its
+    response cache and transport are replaced on every run.
+    """
+
+    name = "app"
+
+    def __init__(self, server: FakeOwmServer, cache: str):
+        import app as weather_app  # imported here so that the model target does not need the app's setup
+
+        self.app = weather_app
+        model = weather_app.favorites_model
+        model.response_cache = ResponseCache(ttls={}) if cache == "cold" else ResponseCache()
+        self.transport = model.transport = HttpTransport(**server.transport_urls())
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.app.test_client()
+        return client
+
+    def add_favorites(self, user_id: int, cities: list):
+        self._client().post("/favorites/bulk-add", json={"user_id": user_id, "city_names": cities})
+
+    def run(self, operation: str, user_id: int, city_name: str) -> bool:
+        if operation == "weather_all":
+            response = self._client().get("/weather/all", query_string={"user_id": user_id})
+            return response.status_code == 200 and not response.get_json().get("errors")
+        path = "/weather" if operation == "weather" else "/forecast"
+        response = self._client().get(path, query_string={"user_id": user_id, "city_name": city_name})
+        return response.status_code == 200
+
+    def close(self):
+        self.transport.close()
+
+
+TARGETS = {"model": ModelTarget, "app": AppTarget}
+
+
+def run_once(target_class, server: FakeOwmServer, scale: tuple, args, trace_memory: bool) -> tuple:
+    """Set up a target at ``scale`` and run its operations.
+
+    Returns
+    -------
+    tuple
+        ``({operation: summary}, setup seconds, peak traced bytes or None)``.
+    """
+    users, favorites, concurrency = scale
+    by_user, operations = workload(users, favorites, args.requests, args.seed)
+    if trace_memory:
+        tracemalloc.start()
+    target = target_class(server, args.cache)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda item: target.add_favorites(*item), by_user.items()))
+        setup_seconds = time.perf_counter() - started
+
+        def one(operation):
+            op_started = time.perf_counter()
+            ok = target.run(*operation)
+            return operation[0], time.perf_counter() - op_started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(one, operations))
+        elapsed = time.perf_counter() - started
+    finally:
+        target.close()
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    latencies = {name: [] for name in OPERATION_MIX}
+    errors = {name: 0 for name in OPERATION_MIX}
+    for name, latency, ok in outcomes:
+        latencies[name].append(latency)
+        errors[name] += not ok
+    summaries = {name: summarize_latencies(latencies[name], errors[name], elapsed) for name in OPERATION_MIX}
+    summaries["all"] = summarize_latencies(
+        [latency for values in latencies.values() for latency in values], sum(errors.values()), elapsed
+    )
+    return summaries, setup_seconds, peak
+
+
+def run_suite(args) -> dict:
+    """Run every target at every scale and return the results document."""
+    results = []
+    with FakeOwmServer(PROFILES[args.profile], seed=args.seed) as server:
+        for scale in args.scales:
+            for target_name in args.targets:
+                summaries, setup_seconds, _ = run_once(TARGETS[target_name], server, scale, args, False)
+                peak = None
+                if not args.no_memory:
+                    _, _, peak = run_once(TARGETS[target_name], server, scale, args, True)
+                users, favorites, concurrency = scale
+                for operation, summary in summaries.items():
+                    results.append(dict(
+                        target=target_name, users=users, favorites=favorites, concurrency=concurrency,
+                        operation=operation, setup_seconds=round(setup_seconds, 3), peak_memory_bytes=peak, **summary
+                    ))
+                    print_result(results[-1])
+        upstream = {"requests": server.requests, "errors": server.errors}
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "profile": args.profile,
+            "latency_profile": PROFILES[args.profile].to_dict(),
+            "cache": args.cache,
+            "requests": args.requests,
+            "seed": args.seed,
+            "upstream": upstream,
+        },
+        "results": results,
+    }
+
+
+def result_key(result: dict) -> str:
+    return f"{result['target']}/{result['users']}x{result['favorites']}x{result['concurrency']}/{result['operation']}"
+
+
+def print_result(result: dict):
+    memory = f"{result['peak_memory_bytes'] / 2 ** 20:.1f}" if result["peak_memory_bytes"] is not None else "-"
+    print(f"{result_key(result):<36} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} "
+          f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['error_rate']:>7.1%} {memory:>8}")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Return the regressions of ``current`` against ``baseline``.
+
+    A metric regresses if it is worse than the baseline by more than
+    ``tolerance`` (a fraction). Results present in only one file are ignored.
+
+    Returns
+    -------
+    list of dict
+        ``key``, ``metric``, ``baseline``, ``current`` and ``change`` (a fraction) per regression.
+    """
+    baseline_results = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        reference = baseline_results.get(result_key(result))
+        if reference is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({"key": result_key(result), "metric": metric, "baseline": old,
+                                    "current": new, "change": round(change, 4)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=parse_scale, nargs="+", default=[parse_scale("10x5x4"), parse_scale("50x10x16")],
+                        help="USERSxFAVORITESxCONCURRENCY")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--profile", choices=list(PROFILES), default="typical")
+    parser.add_argument("--cache", choices=["warm", "cold"], default="warm")
+    parser.add_argument("--requests", type=int, default=500, help="operations per scale and target")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--compare", metavar="RESULTS", help="compare this results file instead of running")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative change (default 0.2)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare) as f:
+            current = json.load(f)
+    else:
+        logging.getLogger().setLevel(logging.ERROR)  # retries and per-call logging would swamp the output
+        # The app target keeps users and favorites in SQLite; give it a scratch database
+        sql_utils.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="weather_bench_"), "bench.db")
+        print(f"profile={args.profile} cache={args.cache} requests={args.requests} seed={args.seed}")
+        print(f"{'target/scale/operation':<36} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'errors':>7} {'peak MiB':>8}")
+        current = run_suite(args)
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['key']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']} ({regression['change']:+.0%})")
+        print(f"{len(regressions)} regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""A local stand-in for the OpenWeatherMap weather, geocoding and tile services.
+
+The server runs on a background thread of the benchmarking process and
+answers the endpoints the application calls:
+
+- ``/data/2.5/weather``, ``/data/2.5/forecast`` and ``/data/2.5/air_pollution``
+- ``/geo/1.0/direct``
+- ``/map/<layer>/<z>/<x>/<y>.png``
+
+Bodies are deterministic for given coordinates or city names and are built
+once, so that the server spends as little of the process's CPU as possible.
+Each response is delayed according to a latency profile, and a fraction of
+requests fail with a 503, which the transport retries. Use it as::
+
+    with FakeOwmServer(PROFILES["typical"], seed=1) as server:
+        transport = HttpTransport(**server.transport_urls())
+
+or run it on its own and point a running app at it, for load tests::
+
+    python -m benchmarks.fake_owm --port 8081 --profile typical
+    OWM_API_BASE_URL=http://127.0.0.1:8081/data/2.5 OWM_GEO_BASE_URL=http://127.0.0.1:8081/geo/1.0 \
+        OWM_TILE_BASE_URL=http://127.0.0.1:8081/map flask run
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.bench_encodings import weather_response
+
+
+class LatencyProfile:
+    """How the fake service delays and fails requests.
+
+    Parameters
+    ----------
+    median : float
+        The median response delay in seconds.
+    sigma : float
+        The spread of the log-normal delay distribution. 0 makes every delay ``median``.
+    error_rate : float
+        The fraction of requests answered with a 503.
+    slow_rate : float
+        The fraction of requests delayed by ``slow_latency`` instead, for a long tail.
+    slow_latency : float
+        The delay of slow requests in seconds. Keep it below the transport's read timeout.
+    """
+
+    def __init__(self, median: float = 0.0, sigma: float = 0.0, error_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 1.0):
+        self.median = median
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+PROFILES = {
+    # No delay: measures the application's own overhead
+    "instant": LatencyProfile(),
+    # Roughly what OpenWeatherMap looks like from a nearby region
+    "typical": LatencyProfile(median=0.04, sigma=0.4, error_rate=0.005, slow_rate=0.01, slow_latency=0.4),
+    # An upstream incident: slow, with a long tail and frequent errors
+    "degraded": LatencyProfile(median=0.15, sigma=0.8, error_rate=0.08, slow_rate=0.05, slow_latency=1.5),
+}
+
+# A 1x1 transparent PNG
+TILE_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000a49444154789c63000100000500010d0a2db40000000049454e44ae426082"
+)
+
+
+def _forecast(rng: random.Random, lat: float, lon: float) -> dict:
+    entries = []
+    for i in range(40):
+        current = weather_response(rng, i)
+        entries.append({
+            "dt": 1700000000 + i * 10800,
+            "main": current["main"],
+            "weather": current["weather"],
+            "clouds": current["clouds"],
+            "wind": current["wind"],
+            "visibility": current["visibility"],
+            "pop": round(rng.random(), 2),
+            "sys": {"pod": "d" if i % 2 else "n"},
+        })
+    city = {"id": 1, "name": f"{lat},{lon}", "coord": {"lat": lat, "lon": lon}, "country": "GB", "timezone": 0}
+    return {"cod": "200", "message": 0, "cnt": len(entries), "list": entries, "city": city}
+
+
+def _air_pollution(rng: random.Random, lat: float, lon: float) -> dict:
+    components = {name: round(rng.uniform(0, 80), 2) for name in ("co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3")}
+    return {"coord": {"lon": lon, "lat": lat},
+            "list": [{"main": {"aqi": rng.randint(1, 5)}, "components": components, "dt": 1700000000}]}
+
+
+def _weather(rng: random.Random, lat: float, lon: float) -> dict:
+    data = weather_response(rng, rng.randint(0, 9999))
+    data["coord"] = {"lon": lon, "lat": lat}
+    return data
+
+
+def city_coordinates(city_name: str) -> tuple:
+    """Return the deterministic coordinates the fake geocoder gives ``city_name``."""
+    rng = random.Random(city_name)
+    return round(rng.uniform(-60, 70), 4), round(rng.uniform(-180, 180), 4)
+
+
+_BUILDERS = {"weather": _weather, "forecast": _forecast, "air_pollution": _air_pollution}
+
+
+class FakeOwmServer:
+    """An HTTP server that imitates OpenWeatherMap.
+
+    Parameters
+    ----------
+    profile : LatencyProfile
+        How requests are delayed and failed.
+    seed : int
+        Seeds the delays and failures.
+    host, port : str, int
+        Where to listen. Port 0 picks a free port.
+    """
+
+    def __init__(self, profile: LatencyProfile = PROFILES["instant"], seed: int = 0, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.profile = profile
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._bodies = {}  # Structure: {(endpoint, lat, lon): bytes}
+        self._bodies_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def transport_urls(self) -> dict:
+        """Return the keyword arguments that point an ``HttpTransport`` at this server."""
+        return {
+            "api_base_url": f"{self.base_url}/data/2.5",
+            "geo_base_url": f"{self.base_url}/geo/1.0",
+            "tile_base_url": f"{self.base_url}/map",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-owm", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _draw(self) -> tuple:
+        """Return ``(delay in seconds, fail)`` for the next request."""
+        profile = self.profile
+        with self._rng_lock:
+            self.requests += 1
+            fail = self._rng.random() < profile.error_rate
+            if self._rng.random() < profile.slow_rate:
+                delay = profile.slow_latency
+            elif profile.sigma > 0:
+                delay = profile.median * math.exp(self._rng.gauss(0, profile.sigma))
+            else:
+                delay = profile.median
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def _body(self, path: str, query: dict):
+        """Return ``(status, content type, body)`` for a request that does not fail."""
+        parts = path.strip("/").split("/")
+        if parts[:2] == ["data", "2.5"] and len(parts) == 3 and parts[2] in _BUILDERS:
+            try:
+                lat, lon = float(query["lat"][0]), float(query["lon"][0])
+            except (KeyError, ValueError):
+                return 400, "application/json", b'{"cod": "400", "message": "wrong latitude"}'
+            key = (parts[2], lat, lon)
+            build = lambda: json.dumps(_BUILDERS[parts[2]](random.Random(f"{key}"), lat, lon)).encode()
+            return 200, "application/json", self._cached(key, build)
+        if parts == ["geo", "1.0", "direct"]:
+            name = query.get("q", [""])[0]
+            lat, lon = city_coordinates(name)
+            body = [{"name": name, "lat": lat, "lon": lon, "country": "GB"}] if name else []
+            return 200, "application/json", json.dumps(body).encode()
+        if parts[:1] == ["map"] and len(parts) == 5 and parts[4].endswith(".png"):
+            return 200, "image/png", TILE_PNG
+        return 404, "application/json", b'{"cod": "404", "message": "Not found"}'
+
+    def _cached(self, key, build) -> bytes:
+        body = self._bodies.get(key)
+        if body is None:
+            body = build()
+            with self._bodies_lock:
+                self._bodies[key] = body
+        return body
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real service
+
+            def do_GET(self):
+                delay, fail = server._draw()
+                if delay > 0:
+                    time.sleep(delay)
+                if fail:
+                    status, content_type, body = 503, "application/json", b'{"cod": 503, "message": "busy"}'
+                else:
+                    url = urlsplit(self.path)
+                    status, content_type, body = server._body(url.path, parse_qs(url.query))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # one line per request on stderr would dominate the benchmark output
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--profile", choices=list(PROFILES), default="typical")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOwmServer(PROFILES[args.profile], seed=args.seed, host=args.host, port=args.port)
+    for name, url in server.transport_urls().items():
+        print(f"{name}: {url}")
+    print(f"profile={args.profile}; Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"served {server.requests} requests, {server.errors} failed on purpose")
+
+
+if __name__ == "__main__":
+    main()
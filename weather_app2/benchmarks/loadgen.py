@@ -0,0 +1,353 @@
+"""Generate concurrent load against a running app and report per-route statistics.
+
+Run from the weather_app2 directory, against an app whose upstream is the
+fake OpenWeatherMap server (see ``benchmarks/fake_owm.py``), not the real one:
+
+    python -m benchmarks.fake_owm --port 8081 --profile typical
+    python -m benchmarks.loadgen --base-url http://localhost:5000 --users 50 --ramp 30 --steady 120 --soak 600
+    python -m benchmarks.loadgen --base-url http://localhost:5000 --smoke
+
+Each virtual user creates an account, logs in, adds ``--favorites``
+favorites, and then issues requests until the run ends. Its favorites are
+stored under the user ID its own, new account gets at login, so reruns
+against a persistent database never collide with earlier runs or real
+users. Each request picks
+a route from ``--mix`` (relative weights), and the user waits an
+exponentially distributed think time averaging ``--think`` seconds between
+requests. Favorites added and removed in the mix are tracked per user, so
+removals hit existing favorites.
+
+Users start evenly over the ``--ramp`` seconds. All of them then run for
+``--steady`` and ``--soak`` seconds; the soak phase catches leaks and slow
+degradation. Throughput, latency percentiles and error rates are reported
+per phase and route. A request is an error if it fails to connect or returns
+a 4xx/5xx status.
+
+``--smoke`` replaces the old smoketest.sh: one user calls every route once
+in order and the exit status is 1 if any call fails.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+
+import requests
+
+from benchmarks.bench_suite import summarize_latencies
+
+
+ROUTES = ("create_account", "login", "favorites_add", "favorites_remove", "favorites", "weather", "forecast",
+          "air_pollution", "weather_all")
+DEFAULT_MIX = "weather=30,forecast=15,air_pollution=10,weather_all=15,favorites=15,favorites_add=5," \
+              "favorites_remove=5,login=5,create_account=2"
+DEFAULT_CITIES = "London,Paris,Tokyo,New York,Los Angeles,Berlin,Madrid,Rome,Sydney,Toronto,Chicago,Boston," \
+                 "Seattle,Dublin,Lisbon,Oslo"
+PHASES = ("ramp", "steady", "soak")
+
+
+def parse_mix(value: str) -> dict:
+    """Parse ``"route=weight,route=weight"`` into a dictionary, rejecting unknown routes."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        route, _, weight = item.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {route!r}; choose from {', '.join(ROUTES)}")
+        mix[route] = float(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one route with a positive weight")
+    return mix
+
+
+class Recorder:
+    """Collects ``(phase, route, seconds, ok)`` samples from every virtual user."""
+
+    def __init__(self):
+        self._samples = []
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.phase_bounds = {}  # Structure: {phase: (start, end)} in seconds since started
+
+    def phase(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        for name in PHASES:
+            start, end = self.phase_bounds.get(name, (0, 0))
+            if start <= elapsed < end:
+                return name
+        return PHASES[-1]
+
+    def record(self, phase: str, route: str, seconds: float, ok: bool):
+        with self._lock:
+            self._samples.append((phase, route, seconds, ok))
+
+    def counts(self) -> tuple:
+        """Return ``(requests, errors)`` recorded so far."""
+        with self._lock:
+            return len(self._samples), sum(not sample[3] for sample in self._samples)
+
+    def report(self) -> dict:
+        """Return ``{phase: {route: summary}}``, with an ``all`` entry per phase."""
+        with self._lock:
+            samples = list(self._samples)
+        report = {}
+        for phase in PHASES:
+            start, end = self.phase_bounds.get(phase, (0, 0))
+            in_phase = [sample for sample in samples if sample[0] == phase]
+            if not in_phase or end <= start:
+                continue
+            routes = sorted({sample[1] for sample in in_phase})
+            report[phase] = {
+                route: summarize_latencies([s[2] for s in in_phase if s[1] == route],
+                                           sum(not s[3] for s in in_phase if s[1] == route), end - start)
+                for route in routes
+            }
+            report[phase]["all"] = summarize_latencies([s[2] for s in in_phase], sum(not s[3] for s in in_phase),
+                                                       end - start)
+        return report
+
+
+class VirtualUser:
+    """One simulated client with its own account, session and favorites.
+
+    Parameters
+    ----------
+    base_url : str
+        The app's base URL.
+    recorder : Recorder or None
+        Where request timings go. None records nothing.
+    """
+
+    def __init__(self, base_url: str, cities: list, recorder: Recorder = None, rng=None, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.user_id = None  # set by login; favorites and weather requests are made for this account
+        self.cities = cities
+        self.recorder = recorder
+        self.rng = rng or random.Random()
+        self.timeout = timeout
+        self.session = requests.Session()  # keep-alive, like a browser
+        self.username = f"loadgen-{uuid.uuid4().hex[:12]}"
+        self.password = uuid.uuid4().hex
+        self.favorites = []
+
+    def call(self, route: str, method: str, path: str, expect_key: str = None, **kwargs):
+        """Send one request, record it and return the response, or None on a connection error."""
+        phase = self.recorder.phase() if self.recorder else None
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            ok = response.status_code < 400
+            if ok and expect_key is not None:
+                ok = expect_key in response.json()
+        except (requests.RequestException, ValueError):
+            response, ok = None, False
+        if self.recorder is not None:
+            self.recorder.record(phase, route, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    def create_account(self):
+        return self.call("create_account", "POST", "/auth/create-account",
+                         json={"username": self.username, "password": self.password})
+
+    def create_other_account(self):
+        """Create a throwaway account, to measure account creation during the run."""
+        return self.call("create_account", "POST", "/auth/create-account",
+                         json={"username": f"loadgen-{uuid.uuid4().hex[:12]}", "password": uuid.uuid4().hex})
+
+    def login(self):
+        response = self.call("login", "POST", "/auth/login", expect_key="token",
+                             json={"username": self.username, "password": self.password})
+        if response is not None:
+            body = response.json()
+            self.session.headers["Authorization"] = f"Bearer {body['token']}"
+            # A token only grants access to its own account's favorites
+            self.user_id = body["user_id"]
+        return response
+
+    def add_favorite(self, city_name: str = None):
+        candidates = [city for city in self.cities if city not in self.favorites]
+        if city_name is None and not candidates:
+            return self.remove_favorite()
+        city_name = city_name or self.rng.choice(candidates)
+        response = self.call("favorites_add", "POST", "/favorites/add",
+                             json={"user_id": self.user_id, "city_name": city_name})
+        if response is not None:
+            self.favorites.append(city_name)
+        return response
+
+    def remove_favorite(self):
+        if len(self.favorites) <= 1:
+            # Keep at least one favorite for the read routes
+            if len(self.favorites) < len(self.cities):
+                return self.add_favorite()
+            return self.step("favorites")
+        city_name = self.favorites.pop(self.rng.randrange(len(self.favorites)))
+        return self.call("favorites_remove", "DELETE", "/favorites/remove",
+                         json={"user_id": self.user_id, "city_name": city_name})
+
+    def city_read(self, route: str, path: str):
+        city_name = self.rng.choice(self.favorites) if self.favorites else self.cities[0]
+        return self.call(route, "GET", path, expect_key=route,
+                         params={"user_id": self.user_id, "city_name": city_name})
+
+    def step(self, route: str):
+        """Issue one request of the given route."""
+        if route == "create_account":
+            return self.create_other_account()
+        if route == "login":
+            return self.login()
+        if route == "favorites_add":
+            return self.add_favorite()
+        if route == "favorites_remove":
+            return self.remove_favorite()
+        if route == "favorites":
+            return self.call(route, "GET", "/favorites", expect_key="favorites", params={"user_id": self.user_id})
+        if route == "weather_all":
+            return self.call(route, "GET", "/weather/all", expect_key="all_weather", params={"user_id": self.user_id})
+        return self.city_read(route, f"/{route}")
+
+    def run(self, mix: dict, favorites: int, think: float, stop: threading.Event):
+        self.create_account()
+        self.login()
+        for city_name in self.rng.sample(self.cities, min(favorites, len(self.cities))):
+            self.add_favorite(city_name)
+        routes, weights = zip(*mix.items())
+        while not stop.is_set():
+            self.step(self.rng.choices(routes, weights)[0])
+            if think > 0:
+                stop.wait(self.rng.expovariate(1 / think))
+        self.session.close()
+
+
+def run_load(args) -> dict:
+    """Run the ramp, steady and soak phases and return the report."""
+    recorder = Recorder()
+    recorder.phase_bounds = {
+        "ramp": (0, args.ramp),
+        "steady": (args.ramp, args.ramp + args.steady),
+        "soak": (args.ramp + args.steady, args.ramp + args.steady + args.soak),
+    }
+    stop = threading.Event()
+    threads = []
+    for i in range(args.users):
+        user = VirtualUser(args.base_url, args.cities, recorder, random.Random(args.seed * 100003 + i), args.timeout)
+        thread = threading.Thread(target=user.run, args=(args.mix, args.favorites, args.think, stop),
+                                  name=f"vu-{i}", daemon=True)
+        # Users start evenly over the ramp
+        delay = recorder.started + args.ramp * i / args.users - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        thread.start()
+        threads.append(thread)
+
+    total = args.ramp + args.steady + args.soak
+    while True:
+        remaining = recorder.started + total - time.perf_counter()
+        if remaining <= 0:
+            break
+        time.sleep(min(remaining, args.report_every or remaining))
+        if args.report_every and remaining > args.report_every:
+            print_progress(recorder)
+    stop.set()
+    for thread in threads:
+        thread.join(args.timeout)
+    return recorder.report()
+
+
+def print_progress(recorder: Recorder):
+    elapsed = time.perf_counter() - recorder.started
+    requests_sent, errors = recorder.counts()
+    print(f"[{elapsed:7.1f}s] {recorder.phase():>6}: {requests_sent} requests, {errors} errors", flush=True)
+
+
+def print_report(report: dict):
+    print(f"{'phase':>6} {'route':<16} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for phase, routes in report.items():
+        for route, stats in routes.items():
+            print(f"{phase:>6} {route:<16} {stats['requests']:>9} {stats['throughput_rps']:>8.1f} "
+                  f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} "
+                  f"{stats['max_ms']:>9.1f} {stats['error_rate']:>7.1%}")
+
+
+def run_smoke(args) -> bool:
+    """Call every route once as a single user and return True if all succeeded."""
+    user = VirtualUser(args.base_url, args.cities)
+    city_name = args.cities[0]
+
+    def update_password():
+        # Changing the password revokes the session, so log in again with the new one
+        new_password = uuid.uuid4().hex
+        response = user.call("update_password", "PUT", "/auth/update-password",
+                             json={"username": user.username, "new_password": new_password})
+        if response is not None:
+            user.password = new_password
+            return user.login()
+        return None
+
+    steps = [
+        ("health", lambda: user.call("health", "GET", "/api/health", expect_key="status")),
+        ("db-check", lambda: user.call("db_check", "GET", "/api/db-check", expect_key="database_status")),
+        ("create-account", user.create_account),
+        ("login", user.login),
+        ("update-password", update_password),
+        ("favorites/add", lambda: user.add_favorite(city_name)),
+        ("favorites", lambda: user.step("favorites")),
+        ("weather", lambda: user.step("weather")),
+        ("forecast", lambda: user.step("forecast")),
+        ("air_pollution", lambda: user.step("air_pollution")),
+        ("weather/all", lambda: user.step("weather_all")),
+        ("favorites/remove", lambda: user.call("favorites_remove", "DELETE", "/favorites/remove",
+                                               json={"user_id": user.user_id, "city_name": city_name})),
+        ("logout", lambda: user.call("logout", "POST", "/auth/logout")),
+    ]
+    passed = True
+    for name, step in steps:
+        ok = step() is not None
+        passed = passed and ok
+        print(f"{'ok' if ok else 'FAILED':>6}  {name}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--users", type=int, default=20, help="virtual users")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which users start")
+    parser.add_argument("--steady", type=float, default=60, help="seconds at full load")
+    parser.add_argument("--soak", type=float, default=0, help="further seconds at full load")
+    parser.add_argument("--think", type=float, default=0.5, help="mean seconds between a user's requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"default: {DEFAULT_MIX}")
+    parser.add_argument("--favorites", type=int, default=5, help="favorites each user starts with")
+    parser.add_argument("--cities", type=lambda value: [c.strip() for c in value.split(",") if c.strip()],
+                        default=DEFAULT_CITIES.split(","))
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per request")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--report-every", type=float, default=10, help="seconds between progress lines; 0 disables")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    parser.add_argument("--max-error-rate", type=float,
+                        help="exit with status 1 if the steady-phase error rate is higher")
+    parser.add_argument("--smoke", action="store_true", help="call every route once and exit")
+    args = parser.parse_args()
+
+    if args.smoke:
+        sys.exit(0 if run_smoke(args) else 1)
+
+    print(f"{args.users} users against {args.base_url}: ramp {args.ramp}s, steady {args.steady}s, soak {args.soak}s")
+    report = run_load(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "report": report}, f, indent=2)
+        print(f"report written to {args.output}")
+
+    steady = report.get("steady", {}).get("all")
+    if args.max_error_rate is not None and steady is not None and steady["error_rate"] > args.max_error_rate:
+        print(f"steady-phase error rate {steady['error_rate']:.1%} exceeds {args.max_error_rate:.1%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,32 @@ DROP TABLE IF EXISTS users;
 CREATE TABLE users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT NOT NULL UNIQUE,
-    salt TEXT NOT NULL, 
     hashed_password TEXT NOT NULL
 );
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions (username);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    city_name TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_favorites_user_city ON favorites (user_id, city_name);
+
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    city_key TEXT PRIMARY KEY,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    fetched_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_geocode_cache_fetched_at ON geocode_cache (fetched_at);
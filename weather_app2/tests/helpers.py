@@ -0,0 +1,8 @@
+class FakeClock:
+    """A clock for code that takes a ``clock`` callable; advance it by setting ``now``."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,313 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import msgpack
+
+import app as app_module
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.models.user_model import UserModel
+from weather_app.utils.http_transport import HttpTransport, StubBackend, TransportResponse
+from weather_app.utils.password_hasher import PasswordHasher
+from weather_app.utils.profiling import RequestProfiler
+from weather_app.utils.session_tokens import SessionManager
+from weather_app.utils.sql_utils import get_db_connection, get_pool
+from weather_app.utils.tile_cache import TileCache
+
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "sql", "create_user_table.sql")
+API_KEY = "test-owm-api-key"
+LONDON = {"city_name": "London", "latitude": 51.5, "longitude": -0.12}
+TILE = b"\x89PNG\r\n\x1a\n tile"
+FORECAST = {"list": [{"dt": 1700010800, "main": {"temp": 10.5}}, {"dt": 1700021600, "main": {"temp": 11.0}}]}
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs the Flask routes against a stubbed OpenWeatherMap and a temporary database."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self._patchers = [patch("weather_app.utils.sql_utils.DB_PATH", os.path.join(self.tmp_dir.name, "test.db"))]
+        self._patchers[0].start()
+        with open(SCHEMA_PATH) as schema, get_db_connection() as conn:
+            conn.executescript(schema.read())
+
+        self.backend = StubBackend({
+            "/data/2.5/weather": lambda params: {"dt": 1700000000, "main": {"temp": 12.5}, "lat": params["lat"]},
+            "/data/2.5/forecast": lambda params: FORECAST,
+            "/geo/1.0/direct": lambda params: [{"lat": 51.5, "lon": -0.12}],
+            "/map/clouds_new/5/15/10.png": lambda params: TILE,
+            "/map/clouds_new/5/15/11.png": lambda params: TransportResponse(500, b"upstream error"),
+        })
+        self.model = FavoriteListModel(transport=HttpTransport(backend=self.backend, max_retries=0))
+        self.user_model = UserModel(hasher=PasswordHasher(method="pbkdf2:sha256:1000", workers=0),
+                                    sessions=SessionManager(secret="test-secret"))
+        self.profiler = RequestProfiler(os.path.join(self.tmp_dir.name, "profiles"), token="profile-token",
+                                        sample_rate=0)
+        for name, value in (("favorites_model", self.model), ("user_model", self.user_model),
+                            ("tile_cache", TileCache(os.path.join(self.tmp_dir.name, "tiles"))),
+                            ("profiler", self.profiler), ("API_KEY", API_KEY)):
+            patcher = patch.object(app_module, name, value)
+            patcher.start()
+            self._patchers.append(patcher)
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        get_pool().close()
+        for patcher in reversed(self._patchers):
+            patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def login(self, username="alice", password="secret"):
+        """Create an account and log in; return its user ID and the Authorization header."""
+        self.user_model.create_account(username, password)
+        body = self.client.post("/auth/login", json={"username": username, "password": password}).get_json()
+        return body["user_id"], {"Authorization": f"Bearer {body['token']}"}
+
+
+class TestAuthentication(AppTestCase):
+
+    def test_missing_or_invalid_token_is_rejected_when_required(self):
+        user_id, headers = self.login()
+        with patch.object(app_module, "AUTH_REQUIRED", True):
+            self.assertEqual(self.client.get(f"/favorites?user_id={user_id}").status_code, 401)
+            self.assertEqual(self.client.get(f"/favorites?user_id={user_id}",
+                                             headers={"Authorization": "Bearer forged"}).status_code, 401)
+            self.assertEqual(self.client.get(f"/favorites?user_id={user_id}", headers=headers).status_code, 200)
+            self.assertEqual(self.client.get("/api/health").status_code, 200)
+            self.assertEqual(self.client.get("/weather/map/tiles/clouds_new/5/15/10.png").status_code, 200)
+
+    def test_token_for_another_account_is_forbidden(self):
+        alice_id, alice = self.login("alice")
+        bob_id, _ = self.login("bob")
+
+        self.assertEqual(self.client.get(f"/favorites?user_id={bob_id}", headers=alice).status_code, 403)
+        self.assertEqual(self.client.post("/favorites/add", json={"user_id": bob_id, "city_name": "London"},
+                                          headers=alice).status_code, 403)
+        self.assertEqual(self.client.put("/auth/update-password", json={"username": "bob", "new_password": "x"},
+                                         headers=alice).status_code, 403)
+        self.assertEqual(self.client.post("/favorites/add", json={"user_id": alice_id, "city_name": "London"},
+                                          headers=alice).status_code, 200)
+
+    def test_service_token_may_batch_across_users(self):
+        self.model.favorites = {1: [LONDON], 2: [LONDON]}
+        _, alice = self.login("alice")
+        batch = {"items": [{"user_id": 1, "city_name": "London"}, {"user_id": 2, "city_name": "London"}]}
+        service = {"X-Service-Token": "service-token"}
+
+        with patch.object(app_module, "SERVICE_TOKEN", "service-token"), patch.object(app_module, "AUTH_REQUIRED", True):
+            response = self.client.post("/weather/batch", json=batch, headers=service)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["summary"], {"ok": 2, "not_found": 0, "error": 0})
+
+            self.assertEqual(self.client.post("/weather/batch", json=batch, headers=alice).status_code, 403)
+            self.assertEqual(self.client.post("/weather/batch", json=batch,
+                                              headers={"X-Service-Token": "wrong"}).status_code, 401)
+            # The service credential is scoped to the service routes
+            self.assertEqual(self.client.get("/favorites?user_id=2", headers=service).status_code, 401)
+
+    def test_failed_password_update_is_a_bad_request(self):
+        self.assertEqual(self.client.put("/auth/update-password",
+                                         json={"username": "carol", "new_password": "x"}).status_code, 400)
+        _, headers = self.login()
+        with patch.object(self.user_model, "hasher") as hasher:
+            hasher.hash.side_effect = RuntimeError("Password hashing queue is full")
+            response = self.client.put("/auth/update-password", json={"username": "alice", "new_password": "x"},
+                                       headers=headers)
+        self.assertEqual(response.status_code, 503)
+
+    def test_anonymous_access_is_legacy_and_counted(self):
+        counted = lambda: app_module.ANONYMOUS_ACCOUNT_REQUESTS.values().get(("/favorites",), 0)
+        before = counted()
+
+        self.assertEqual(self.client.get("/favorites?user_id=1").status_code, 200)
+        self.assertEqual(counted(), before + 1)
+        self.client.get("/api/health")
+        self.assertEqual(counted(), before + 1)
+
+
+class TestConditionalRequests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.model.favorites = {1: [LONDON]}
+
+    def etag(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response.headers["ETag"]
+
+    def test_validators_and_cache_control(self):
+        response = self.client.get("/weather?user_id=1&city_name=London")
+
+        self.assertTrue(response.headers["ETag"].startswith('W/"'))
+        self.assertEqual(response.last_modified.timestamp(), 1700000000)
+        self.assertTrue(response.cache_control.private)
+        self.assertGreater(response.cache_control.max_age, 0)
+        self.assertEqual(set(response.vary), {"Accept", "Accept-Encoding"})
+
+    def test_matching_validators_get_304(self):
+        url = "/weather?user_id=1&city_name=London"
+        etag = self.etag(url)
+        calls = len(self.backend.calls)
+
+        by_etag = self.client.get(url, headers={"If-None-Match": etag})
+        by_date = self.client.get(url, headers={"If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT"})
+
+        self.assertEqual((by_etag.status_code, by_date.status_code), (304, 304))
+        self.assertEqual(by_etag.get_data(), b"")
+        self.assertEqual(by_etag.headers["ETag"], etag)
+        self.assertEqual(set(by_etag.vary), {"Accept", "Accept-Encoding"})
+        self.assertEqual(len(self.backend.calls), calls)
+        # An older copy, or an ETag that does not match, gets the full body
+        self.assertEqual(self.client.get(url, headers={"If-Modified-Since": "Tue, 14 Nov 2023 22:13:19 GMT"}).status_code, 200)
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": 'W/"other"',
+                                                       "If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT"}).status_code, 200)
+
+    def test_each_representation_has_its_own_etag(self):
+        full = self.etag("/weather?user_id=1&city_name=London")
+        etags = {full,
+                 self.etag("/weather?user_id=1&city_name=London&fields=temp"),
+                 self.etag("/weather/all?user_id=1"),
+                 self.etag("/weather?user_id=1&city_name=London", Accept="application/msgpack"),
+                 self.etag("/weather?user_id=1&city_name=London", **{"Accept-Encoding": "gzip"})}
+        self.assertEqual(len(etags), 5)
+
+        self.assertEqual(self.client.get("/weather?user_id=1&city_name=London",
+                                         headers={"If-None-Match": full}).status_code, 304)
+        for url in ("/weather?user_id=1&city_name=London&fields=temp", "/weather/all?user_id=1"):
+            self.assertEqual(self.client.get(url, headers={"If-None-Match": full}).status_code, 200)
+
+    def test_forecast_window_and_last_modified(self):
+        url = "/forecast?user_id=1&city_name=London"
+        full = self.client.get(url)
+        windowed = self.etag(url + "&start=1700010800&end=1700021600")
+
+        self.assertNotEqual(full.headers["ETag"], windowed)
+        # One forecast step before the first entry, not the time it was fetched
+        self.assertEqual(full.last_modified.timestamp(), 1700000000)
+        self.assertEqual(self.client.get(url + "&start=1700010800&end=1700021600",
+                                         headers={"If-None-Match": full.headers["ETag"]}).status_code, 200)
+
+
+class TestEncodingNegotiation(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Enough favorites for the body to pass the compression threshold
+        self.model.favorites = {1: [{"city_name": f"City {i}", "latitude": i, "longitude": i} for i in range(40)]}
+
+    def test_json_by_default(self):
+        response = self.client.get("/weather/all?user_id=1")
+
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(len(response.get_json()["all_weather"]), 40)
+
+    def test_msgpack_and_gzip(self):
+        response = self.client.get("/weather/all?user_id=1",
+                                   headers={"Accept": "application/msgpack", "Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.mimetype, "application/msgpack")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        body = msgpack.unpackb(gzip.decompress(response.get_data()))
+        self.assertEqual(body["all_weather"]["City 3"]["main"]["temp"], 12.5)
+
+
+class TestOperationalRoutes(AppTestCase):
+
+    def test_metrics(self):
+        self.client.get("/api/health")
+
+        response = self.client.get("/api/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        text = response.get_data(as_text=True)
+        self.assertIn('weather_app_http_requests_total{method="GET",route="/api/health",status="200"}', text)
+        self.assertIn('weather_app_cache_hits_total{cache="response"}', text)
+
+    def test_profiles_require_the_profile_token(self):
+        token = {"X-Profile-Token": "profile-token"}
+        self.assertEqual(self.client.get("/api/profiles").status_code, 403)
+        self.assertEqual(self.client.get("/api/profiles", headers={"X-Profile-Token": "wrong"}).status_code, 403)
+        self.assertEqual(self.client.get("/api/profiles/missing.prof").status_code, 403)
+
+        # A request carrying the token is profiled
+        self.client.get("/api/health", headers=token)
+        response = self.client.get("/api/profiles?top=0", headers=token)
+
+        self.assertEqual(response.status_code, 200)
+        profiles = response.get_json()["profiles"]
+        self.assertEqual(len(profiles), 1)
+        summary = self.client.get(f"/api/profiles/{profiles[0]['name']}", headers=token)
+        self.assertEqual(summary.status_code, 200)
+        self.assertEqual(self.client.get("/api/profiles/missing.prof", headers=token).status_code, 404)
+
+    def test_spatial_grid(self):
+        self.model.favorites = {1: [LONDON], 2: [LONDON, {"city_name": "Sydney", "latitude": -33.9, "longitude": 151.2}]}
+
+        stats = self.client.get("/api/spatial-grid").get_json()
+
+        self.assertEqual(stats["weather"]["locations"], 2)
+        self.assertLessEqual(stats["weather"]["cells"], 2)
+
+
+class TestTileProxy(AppTestCase):
+
+    def test_tile_is_cached_and_revalidated(self):
+        url = "/weather/map/tiles/clouds_new/5/15/10.png"
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/png")
+        self.assertEqual(response.get_data(), TILE)
+        self.assertTrue(response.cache_control.public)
+        self.assertGreater(response.cache_control.max_age, 0)
+        response.close()
+
+        revalidated = self.client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(len([call for call in self.backend.calls if call[0].startswith("/map/")]), 1)
+
+    def test_invalid_tile_is_a_bad_request(self):
+        self.assertEqual(self.client.get("/weather/map/tiles/bogus/5/15/10.png").status_code, 400)
+        self.assertEqual(self.client.get("/weather/map/tiles/clouds_new/2/15/10.png").status_code, 400)
+        self.assertEqual(self.backend.calls, [])
+
+    def test_upstream_failure_is_a_bad_gateway(self):
+        response = self.client.get("/weather/map/tiles/clouds_new/5/15/11.png")
+
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("error", response.get_json())
+
+
+class TestWeatherMapRoutes(AppTestCase):
+
+    def test_weather_map_never_returns_the_api_key(self):
+        self.model.favorites = {1: [LONDON]}
+
+        response = self.client.get("/weather/map?user_id=1&city_name=London&criteria=clouds&zoom=5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(API_KEY, response.get_data(as_text=True))
+        weather_map = response.get_json()["weather_map"]
+        self.assertNotIn("tile_url", weather_map)
+        self.assertEqual(weather_map["proxy_url"], "/weather/map/tiles/clouds_new/5/15/10.png")
+
+    def test_weather_map_all_never_returns_the_api_key(self):
+        self.model.favorites = {1: [LONDON, {"city_name": "Sydney", "latitude": -33.9, "longitude": 151.2}]}
+
+        response = self.client.get("/weather/map/all?user_id=1&criteria=clouds&min_zoom=4&max_zoom=5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(API_KEY, response.get_data(as_text=True))
+        tiles = response.get_json()["weather_map"]["tiles"]
+        self.assertEqual(len(tiles), 4)
+        self.assertEqual(tiles[0], {"zoom": 4, "x": 7, "y": 5, "proxy_url": "/weather/map/tiles/clouds_new/4/7/5.png"})
+
+
+if __name__ == "__main__":
+    unittest.main()
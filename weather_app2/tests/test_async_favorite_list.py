@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from weather_app.models.async_favorite_list_model import AsyncFavoriteListModel
+from weather_app.utils.async_http_transport import AsyncHttpTransport, AsyncStubBackend
+from weather_app.utils.event_loop import BackgroundEventLoop
+from weather_app.utils.http_transport import TransportResponse
+
+
+class TestAsyncFavoriteListModel(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.backend = AsyncStubBackend({
+            "/geo/1.0/direct": lambda params: [{"lat": 51.5, "lon": -0.12}],
+            "/data/2.5/weather": lambda params: {"temp": 20, "lat": params["lat"]},
+            "/data/2.5/forecast": lambda params: {"list": []},
+        }, latency=0.1)
+        self.model = AsyncFavoriteListModel(
+            transport=AsyncHttpTransport(backend=self.backend, max_retries=0)
+        )
+
+    async def test_add_city_and_get_weather(self):
+        await self.model.add_city(1, "London", "key")
+
+        self.assertEqual(self.model.store.get(1, "London").latitude, 51.5)
+        self.assertEqual(await self.model.get_weather(1, "London", "key"), {"temp": 20, "lat": 51.5})
+        self.assertEqual(await self.model.get_forecast(1, "London", "key"), {"list": []})
+
+        with self.assertRaises(ValueError):
+            await self.model.add_city(1, "London", "key")
+        with self.assertRaises(ValueError):
+            await self.model.get_weather(1, "Paris", "key")
+
+    async def test_state_is_shared_with_sync_model(self):
+        self.model.model.favorites = {1: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}]}
+        await self.model.get_weather(1, "London", "key")
+
+        self.assertIsNotNone(self.model.model.response_cache.get("weather", 51.5, -0.12))
+        weather_map = await self.model.get_weather_map(1, "London", "clouds")
+        self.assertEqual(weather_map["layer"], "clouds_new")
+
+    async def test_store_and_geocode_cache_run_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def record(method):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+
+        for name in ("get", "add", "get_all"):
+            setattr(self.model.store, name, record(getattr(self.model.store, name)))
+        for name in ("get", "set"):
+            setattr(self.model.geocode_cache, name, record(getattr(self.model.geocode_cache, name)))
+
+        await self.model.add_city(1, "London", "key")
+        await self.model.get_weather(1, "London", "key")
+        await self.model.get_all_weather_partial(1, "key")
+        weather_map = await self.model.get_weather_map(1, "London", "clouds", zoom=3)
+
+        self.assertEqual(weather_map["zoom"], 3)
+        self.assertGreaterEqual(len(threads), 6)
+        self.assertNotIn(loop_thread, threads)
+
+    async def test_all_weather_runs_concurrently(self):
+        self.model.model.favorites = {1: [
+            {"city_name": f"City{i}", "latitude": float(i), "longitude": 0.0} for i in range(20)
+        ]}
+
+        started = time.perf_counter()
+        weather, errors = await self.model.get_all_weather_partial(1, "key", max_parallelism=20)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(weather), 20)
+        self.assertEqual(errors, {})
+        self.assertLess(elapsed, 1.0)  # 20 sequential calls would take 2 seconds
+
+    async def test_all_weather_reports_failures_and_timeouts(self):
+        self.backend._stub.routes["/data/2.5/weather"] = lambda params: (
+            TransportResponse(401, b"{}") if params["lat"] == 1.0 else {"temp": 20}
+        )
+        self.model.model.favorites = {1: [
+            {"city_name": "Good", "latitude": 0.0, "longitude": 0.0},
+            {"city_name": "Bad", "latitude": 1.0, "longitude": 0.0},
+        ]}
+
+        weather, errors = await self.model.get_all_weather_partial(1, "key")
+        self.assertEqual(list(weather), ["Good"])
+        self.assertIn("401", errors["Bad"])
+
+        self.backend.latency = 1.0
+        self.model.response_cache.invalidate()
+        weather, errors = await self.model.get_all_weather_partial(1, "key", deadline=0.2)
+        self.assertEqual(weather, {})
+        self.assertEqual(errors["Good"], "Timed out after 0.2s.")
+
+    async def test_identical_concurrent_calls_are_coalesced(self):
+        self.model.model.favorites = {
+            user_id: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}] for user_id in range(10)
+        }
+
+        results = await asyncio.gather(*(self.model.get_weather(user_id, "London", "key") for user_id in range(10)))
+
+        self.assertEqual(len(self.backend.calls), 1)
+        self.assertEqual(results, [{"temp": 20, "lat": 51.5}] * 10)
+
+    async def test_transport_bounds_concurrency(self):
+        transport = AsyncHttpTransport(backend=self.backend, max_concurrency=5)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(transport.get_json(transport.api_url("weather"), {"lat": i}) for i in range(10)))
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)  # two waves of five
+
+
+class TestBackgroundEventLoop(unittest.TestCase):
+
+    def test_run_and_close(self):
+        loop = BackgroundEventLoop()
+
+        async def answer():
+            await asyncio.sleep(0)
+            return 42
+
+        self.assertEqual(loop.run(answer(), timeout=5), 42)
+        loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.columnar import ColumnarForecast, project_weather
+
+
+def owm_entry(dt, temp, rain=None, description="light rain", pod="d", conditions=()):
+    entry = {
+        "dt": dt,
+        "main": {"temp": temp, "feels_like": temp - 1.5, "temp_min": temp, "temp_max": temp,
+                 "pressure": 1012, "sea_level": 1012, "grnd_level": 1008, "humidity": 81, "temp_kf": -0.52},
+        "weather": [{"id": 500 if rain else 804, "main": "Rain" if rain else "Clouds", "description": description,
+                     "icon": "10d"}] + list(conditions),
+        "clouds": {"all": 75},
+        "wind": {"speed": 4.12, "deg": 230, "gust": 7.35},
+        "visibility": 10000,
+        "pop": 0.42,
+        "sys": {"pod": pod},
+        "dt_txt": datetime.fromtimestamp(dt, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if rain is not None:
+        entry["rain"] = {"3h": rain}
+    return entry
+
+
+FORECAST = {
+    "cod": "200",
+    "cnt": 3,
+    "list": [
+        owm_entry(1700000000, 12.34, rain=0.27),
+        owm_entry(1700010800, 11.8, description="overcast clouds", pod="n"),
+        owm_entry(1700021600, 10.05, rain=1.5,
+                  conditions=[{"id": 701, "main": "Mist", "description": "mist", "icon": "50d"}]),
+    ],
+    "city": {"name": "London", "timezone": 0},
+}
+
+
+class TestColumnarForecast(unittest.TestCase):
+
+    def setUp(self):
+        self.forecast = ColumnarForecast.from_owm(FORECAST)
+
+    def test_round_trip_matches_upstream_payload(self):
+        self.assertEqual(self.forecast.to_owm(), FORECAST)
+
+    def test_round_trip_keeps_values(self):
+        rebuilt = self.forecast.to_owm()
+        self.assertEqual(rebuilt["city"], FORECAST["city"])
+        self.assertEqual(rebuilt["cnt"], 3)
+        for original, entry in zip(FORECAST["list"], rebuilt["list"]):
+            self.assertEqual(entry["main"], original["main"])
+            self.assertEqual(entry["wind"], original["wind"])
+            self.assertEqual(entry["weather"], original["weather"])
+            self.assertEqual(entry.get("rain"), original.get("rain"))
+        self.assertEqual(rebuilt["list"][0]["dt_txt"], "2023-11-14 22:13:20")
+
+    def test_project_fields_and_window(self):
+        projected = self.forecast.project(["temp", "rain", "weather_id", "weather_description", "pod"],
+                                          start=1700010800)
+        self.assertEqual(projected, {
+            "city": FORECAST["city"],
+            "dt": [1700010800, 1700021600],
+            "temp": [11.8, 10.05],
+            "rain": [None, 1.5],
+            "weather_id": [804, 500],
+            "weather_description": ["overcast clouds", "light rain"],
+            "pod": ["n", "d"],
+        })
+        self.assertEqual(self.forecast.project(["temp"], start=1700000001, end=1700010800)["dt"], [])
+
+    def test_unknown_field_raises_error(self):
+        with self.assertRaises(ValueError):
+            self.forecast.project(["temp", "ozone"])
+
+    def test_columns_are_compact(self):
+        self.assertEqual(len(self.forecast), 3)
+        self.assertEqual(self.forecast.nbytes, 3 * (8 + 4 * 17 + 2 * 2))
+
+    def test_project_weather(self):
+        current = dict(owm_entry(1700000000, 12.34), rain={"1h": 0.5})
+        self.assertEqual(project_weather(current, ["temp", "humidity", "rain"]),
+                         {"dt": 1700000000, "temp": 12.34, "humidity": 81, "rain": 0.5})
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_model_caches_forecast_in_columnar_form(self, mock_api_call):
+        mock_api_call.return_value = FORECAST
+        model = FavoriteListModel()
+        model.favorites = {1: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}]}
+
+        full = model.get_forecast(1, "London", "key")
+        projected = model.get_forecast(1, "London", "key", fields=["pop"], end=1700010800)
+
+        self.assertEqual(full, FORECAST)
+        self.assertEqual(projected["pop"], [0.42])
+        self.assertIsInstance(model.response_cache.get("forecast", 51.5, -0.12), ColumnarForecast)
+        mock_api_call.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import gzip
+import json
+import unittest
+import zlib
+
+import msgpack
+
+from weather_app.utils.encoding import MSGPACK_MIMETYPE, compress, encode
+
+
+PAYLOAD = {"all_weather": {"London": {"main": {"temp": 281.5, "humidity": 81}, "name": "London"}}, "errors": {}}
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_json_and_msgpack_round_trip(self):
+        self.assertEqual(json.loads(encode(PAYLOAD)), PAYLOAD)
+        self.assertEqual(msgpack.unpackb(encode(PAYLOAD, MSGPACK_MIMETYPE)), PAYLOAD)
+        self.assertEqual(msgpack.unpackb(encode(PAYLOAD, "application/x-msgpack")), PAYLOAD)
+
+    def test_unsupported_media_type_raises_error(self):
+        with self.assertRaises(ValueError):
+            encode(PAYLOAD, "text/csv")
+
+    def test_compress_above_threshold(self):
+        body = encode(PAYLOAD) * 100
+        gzipped, coding = compress(body, "gzip", min_bytes=1024)
+        self.assertEqual(coding, "gzip")
+        self.assertEqual(gzip.decompress(gzipped), body)
+        deflated, coding = compress(body, "deflate", min_bytes=1024)
+        self.assertEqual(coding, "deflate")
+        self.assertEqual(zlib.decompress(deflated), body)
+
+    def test_small_or_unaccepted_bodies_are_not_compressed(self):
+        body = encode(PAYLOAD)
+        self.assertEqual(compress(body, "gzip", min_bytes=len(body) + 1), (body, None))
+        self.assertEqual(compress(body * 100, None), (body * 100, None))
+        self.assertEqual(compress(body * 100, "br"), (body * 100, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
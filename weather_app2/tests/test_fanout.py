@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.fanout import fan_out
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_collects_results_and_errors_in_task_order(self):
+        def square(n):
+            if n == 2:
+                raise RuntimeError("boom")
+            return n * n
+
+        results, errors = fan_out(square, {"a": (1,), "b": (2,), "c": (3,)})
+
+        self.assertEqual(results, {"a": 1, "c": 9})
+        self.assertEqual(errors, {"b": "boom"})
+
+    def test_respects_max_parallelism(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def work(_):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return True
+
+        results, _ = fan_out(work, {i: (i,) for i in range(8)}, max_parallelism=2)
+
+        self.assertEqual(len(results), 8)
+        self.assertLessEqual(state["peak"], 2)
+
+    def test_deadline_returns_partial_results(self):
+        def work(delay):
+            time.sleep(delay)
+            return delay
+
+        results, errors = fan_out(work, {"fast": (0,), "slow": (1,)}, deadline=0.2)
+
+        self.assertEqual(results, {"fast": 0})
+        self.assertIn("Timed out", errors["slow"])
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_get_all_weather_partial_reports_failed_cities(self, mock_api_call):
+        def api_call(endpoint, params, api_key):
+            if params["lat"] == 30.0:
+                raise RuntimeError("API call failed: 500")
+            return {"weather": "sunny"}
+
+        mock_api_call.side_effect = api_call
+        model = FavoriteListModel()
+        model.favorites = {
+            1: [
+                {"city_name": "TestCity", "latitude": 10.0, "longitude": 20.0},
+                {"city_name": "AnotherCity", "latitude": 30.0, "longitude": 40.0},
+            ]
+        }
+
+        weather_data, errors = model.get_all_weather_partial(1, "test_api_key")
+
+        self.assertEqual(weather_data, {"TestCity": {"weather": "sunny"}})
+        self.assertEqual(list(errors), ["AnotherCity"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,7 +11,7 @@ class TestFavoriteListModel(unittest.TestCase):
         self.city_name = "TestCity"
         self.api_key = "test_api_key"
 
-    @patch("favorite_list_model.FavoriteListModel._make_geo_api_call")
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_geo_api_call")
     def test_add_city(self, mock_geo_api_call):
         # Mock geocoding API response
         mock_geo_api_call.return_value = [{"lat": 10.0, "lon": 20.0}]
@@ -25,7 +25,7 @@ class TestFavoriteListModel(unittest.TestCase):
         self.assertEqual(favorites[0]["latitude"], 10.0)
         self.assertEqual(favorites[0]["longitude"], 20.0)
 
-    @patch("favorite_list_model.FavoriteListModel._make_geo_api_call")
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_geo_api_call")
     def test_add_duplicate_city_raises_error(self, mock_geo_api_call):
         mock_geo_api_call.return_value = [{"lat": 10.0, "lon": 20.0}]
 
@@ -34,6 +34,23 @@ class TestFavoriteListModel(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.model.add_city(self.user_id, self.city_name, self.api_key)
 
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_geo_api_call")
+    def test_add_cities(self, mock_geo_api_call):
+        mock_geo_api_call.side_effect = lambda city_name, api_key: (
+            [] if city_name == "Atlantis" else [{"lat": 10.0, "lon": 20.0}]
+        )
+        self.model.favorites = {self.user_id: [{"city_name": "Paris", "latitude": 48.85, "longitude": 2.35}]}
+
+        results = self.model.add_cities(
+            self.user_id, [self.city_name, "Paris", "testcity ", "Atlantis", "AnotherCity"], self.api_key
+        )
+
+        self.assertEqual([result["status"] for result in results], ["added", "exists", "duplicate", "error", "added"])
+        self.assertIn("No coordinates", results[3]["error"])
+        self.assertEqual(mock_geo_api_call.call_count, 3)
+        favorites = [favorite["city_name"] for favorite in self.model.get_all_favorites(self.user_id)]
+        self.assertEqual(favorites, ["Paris", self.city_name, "AnotherCity"])
+
     def test_remove_city(self):
         self.model.favorites = {
             self.user_id: [{"city_name": self.city_name, "latitude": 10.0, "longitude": 20.0}]
@@ -62,7 +79,7 @@ class TestFavoriteListModel(unittest.TestCase):
         self.assertEqual(favorites[0]["city_name"], self.city_name)
         self.assertEqual(favorites[1]["city_name"], "AnotherCity")
 
-    @patch("favorite_list_model.FavoriteListModel._make_api_call")
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
     def test_get_weather(self, mock_api_call):
         # Mock weather API response
         mock_api_call.return_value = {"weather": "sunny"}
@@ -74,7 +91,7 @@ class TestFavoriteListModel(unittest.TestCase):
         weather = self.model.get_weather(self.user_id, self.city_name, self.api_key)
         self.assertEqual(weather, {"weather": "sunny"})
 
-    @patch("favorite_list_model.FavoriteListModel._make_api_call")
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
     def test_get_all_weather(self, mock_api_call):
         # Mock weather API response
         mock_api_call.return_value = {"weather": "sunny"}
@@ -91,7 +108,7 @@ class TestFavoriteListModel(unittest.TestCase):
         self.assertIn(self.city_name, weather_data)
         self.assertIn("AnotherCity", weather_data)
 
-    @patch("favorite_list_model.FavoriteListModel._make_api_call")
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
     def test_get_air_pollution(self, mock_api_call):
         # Mock air pollution API response
         mock_api_call.return_value = {"pollution": "low"}
@@ -111,5 +128,34 @@ class TestFavoriteListModel(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.model.get_weather(self.user_id, "NonExistentCity", self.api_key)
 
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_get_weather_batch_deduplicates_locations(self, mock_api_call):
+        mock_api_call.return_value = {"weather": "sunny"}
+
+        self.model.favorites = {
+            1: [{"city_name": self.city_name, "latitude": 10.0, "longitude": 20.0}],
+            2: [{"city_name": self.city_name, "latitude": 10.0, "longitude": 20.0}],
+            3: [{"city_name": "AnotherCity", "latitude": 30.0, "longitude": 40.0}],
+        }
+
+        results = self.model.get_weather_batch(
+            [(1, self.city_name), (2, self.city_name), (3, "AnotherCity"), (1, "NonExistentCity")], self.api_key
+        )
+
+        self.assertEqual(mock_api_call.call_count, 2)
+        self.assertEqual([result["status"] for result in results], ["ok", "ok", "ok", "not_found"])
+        self.assertEqual(results[1], {"user_id": 2, "city_name": self.city_name, "status": "ok",
+                                      "weather": {"weather": "sunny"}})
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_get_weather_batch_reports_upstream_errors(self, mock_api_call):
+        mock_api_call.side_effect = RuntimeError("API call failed: 500")
+
+        self.model.favorites = {self.user_id: [{"city_name": self.city_name, "latitude": 10.0, "longitude": 20.0}]}
+
+        results = self.model.get_weather_batch([(self.user_id, self.city_name)], self.api_key)
+        self.assertEqual(results[0]["status"], "error")
+        self.assertIn("500", results[0]["error"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.models.favorites_store import FavoriteCity, InMemoryFavoritesStore, SqliteFavoritesStore
+from weather_app.utils.sql_utils import get_pool
+
+
+class FavoritesStoreContract:
+    """Behaviour shared by every favorites store."""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+
+    def test_add_and_get(self):
+        self.assertTrue(self.store.add(1, "London", 51.5, -0.12))
+        self.assertEqual(self.store.get(1, "London"), FavoriteCity("London", 51.5, -0.12))
+        self.assertIsNone(self.store.get(2, "London"))
+
+    def test_duplicate_add_is_rejected(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        self.assertFalse(self.store.add(1, "London", 51.5, -0.12))
+        self.assertEqual(len(self.store.get_all(1)), 1)
+
+    def test_get_all_keeps_insertion_order(self):
+        self.store.add(1, "Paris", 48.85, 2.35)
+        self.store.add(1, "London", 51.5, -0.12)
+        self.assertEqual([fav.city_name for fav in self.store.get_all(1)], ["Paris", "London"])
+
+    def test_add_many_reports_duplicates(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        added = self.store.add_many(1, [("Paris", 48.85, 2.35), ("London", 51.5, -0.12)])
+        self.assertEqual(added, [True, False])
+
+    def test_remove(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        self.assertTrue(self.store.remove(1, "London"))
+        self.assertFalse(self.store.remove(1, "London"))
+        self.assertEqual(self.store.get_all(1), [])
+
+    def test_distinct_locations_across_users(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        self.store.add(2, "London", 51.5, -0.12)
+        self.store.add(2, "Paris", 48.85, 2.35)
+        self.assertEqual(self.store.distinct_locations(), {(51.5, -0.12), (48.85, 2.35)})
+
+    def test_load_replaces_contents(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        self.store.load({2: [{"city_name": "Paris", "latitude": 48.85, "longitude": 2.35}]})
+        self.assertEqual(self.store.snapshot(), {2: [{"city_name": "Paris", "latitude": 48.85, "longitude": 2.35}]})
+
+
+class TestInMemoryFavoritesStore(FavoritesStoreContract, unittest.TestCase):
+
+    def make_store(self):
+        return InMemoryFavoritesStore()
+
+    def test_records_are_slotted(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        favorite = self.store.get(1, "London")
+        self.assertFalse(hasattr(favorite, "__dict__"))
+        self.assertEqual(favorite.to_dict(), {"city_name": "London", "latitude": 51.5, "longitude": -0.12})
+
+    def test_remove_keeps_order_of_remaining_favorites(self):
+        for i in range(5):
+            self.store.add(1, f"City{i}", float(i), float(i))
+        self.store.remove(1, "City2")
+        self.assertEqual([fav.city_name for fav in self.store.get_all(1)], ["City0", "City1", "City3", "City4"])
+
+
+class TestSqliteFavoritesStore(FavoritesStoreContract, unittest.TestCase):
+
+    def make_store(self):
+        return SqliteFavoritesStore()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_patcher = patch("weather_app.utils.sql_utils.DB_PATH", os.path.join(self.tmp_dir.name, "test.db"))
+        self.db_patcher.start()
+        super().setUp()
+
+    def tearDown(self):
+        get_pool().close()
+        self.db_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_favorites_survive_a_new_store(self):
+        self.store.add(1, "London", 51.5, -0.12)
+        self.assertEqual(len(SqliteFavoritesStore().get_all(1)), 1)
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_geo_api_call")
+    def test_model_api_is_unchanged(self, mock_geo_api_call):
+        mock_geo_api_call.return_value = [{"lat": 10.0, "lon": 20.0}]
+        model = FavoriteListModel(store=self.store)
+
+        model.add_city(1, "TestCity", "test_api_key")
+        with self.assertRaises(ValueError):
+            model.add_city(1, "TestCity", "test_api_key")
+        self.assertEqual(model.get_all_favorites(1),
+                         [{"city_name": "TestCity", "latitude": 10.0, "longitude": 20.0}])
+
+        model.remove_city(1, "TestCity")
+        with self.assertRaises(ValueError):
+            model.remove_city(1, "TestCity")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.cache import TTLCache
+from weather_app.utils.geocode_cache import GeocodeCache, normalize_city_name
+from weather_app.utils.sql_utils import get_pool
+
+from helpers import FakeClock
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("key", "value")
+        self.assertEqual(cache.get("key"), "value")
+
+        clock.now = 6
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+class TestGeocodeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_patcher = patch("weather_app.utils.sql_utils.DB_PATH", os.path.join(self.tmp_dir.name, "test.db"))
+        self.db_patcher.start()
+
+    def tearDown(self):
+        get_pool().close()
+        self.db_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_normalize_city_name(self):
+        self.assertEqual(normalize_city_name("  los   ANGELES "), "los angeles")
+
+    def test_persistent_tier_survives_new_instance(self):
+        GeocodeCache().set("London", 51.5, -0.12)
+
+        cache = GeocodeCache()
+        self.assertEqual(cache.get("london"), (51.5, -0.12))
+        self.assertEqual(cache.stats()["persistent_hits"], 1)
+
+        # The second lookup is promoted to the in-memory tier.
+        cache.get("LONDON")
+        self.assertEqual(cache.stats()["memory_hits"], 1)
+
+    def test_miss_is_counted(self):
+        cache = GeocodeCache()
+        self.assertIsNone(cache.get("Atlantis"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_geo_api_call")
+    def test_repeat_geocodes_do_not_call_api(self, mock_geo_api_call):
+        mock_geo_api_call.return_value = [{"lat": 34.05, "lon": -118.24}]
+        model = FavoriteListModel(geocode_cache=GeocodeCache())
+
+        model.add_city(1, "Los Angeles", "test_api_key")
+        model.add_city(2, "los angeles", "test_api_key")
+
+        mock_geo_api_call.assert_called_once()
+        self.assertEqual(model.get_all_favorites(2)[0]["latitude"], 34.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.columnar import ColumnarForecast
+from weather_app.utils.http_cache import CacheValidator, data_timestamp
+
+
+class TestCacheValidator(unittest.TestCase):
+
+    def test_timestamps_come_from_upstream_data(self):
+        self.assertEqual(data_timestamp({"dt": 1700000000}), 1700000000)
+        self.assertEqual(data_timestamp({"list": [{"dt": 1700000000}, {"dt": 1700003600}]}), 1700003600)
+        self.assertIsNone(data_timestamp({"weather": "sunny"}))
+        forecast = ColumnarForecast.from_owm({"list": [{"dt": 1700010800}, {"dt": 1700021600}]}, fetched_at=1700009000)
+        self.assertEqual(data_timestamp(forecast), 1700000000)
+        forecast = ColumnarForecast.from_owm({"list": [{"dt": 1900000000}]}, fetched_at=1700000000)
+        self.assertEqual(data_timestamp(forecast), 1700000000)
+
+    def test_etag_changes_with_data_only(self):
+        first = CacheValidator.from_entries("weather", [("London", {"dt": 1}, 300.5), ("Paris", {"dt": 5}, 100.2)])
+        reordered = CacheValidator.from_entries("weather", [("Paris", {"dt": 5}, 50), ("London", {"dt": 1}, 10)])
+        updated = CacheValidator.from_entries("weather", [("London", {"dt": 2}, 300), ("Paris", {"dt": 5}, 100)])
+
+        self.assertEqual(first.etag, reordered.etag)
+        self.assertNotEqual(first.etag, updated.etag)
+        self.assertEqual((first.last_modified, first.max_age), (5, 100))
+
+    def test_etag_changes_with_variant(self):
+        entries = [("London", {"dt": 1}, 300)]
+        full = CacheValidator.from_entries("weather", entries, ("/weather", None))
+        projected = CacheValidator.from_entries("weather", entries, ("/weather", "temp"))
+        self.assertNotEqual(full.etag, projected.etag)
+        self.assertEqual(full.etag, CacheValidator.from_entries("weather", entries, ("/weather", None)).etag)
+
+    def test_stale_or_untimestamped_entries(self):
+        self.assertEqual(CacheValidator.from_entries("weather", [("London", {"dt": 1}, -20)]).max_age, 0)
+        self.assertIsNone(CacheValidator.from_entries("weather", [("London", {"weather": "sunny"}, 300)]))
+        self.assertIsNone(CacheValidator.from_entries("weather", []))
+
+    def test_forecast_etag_follows_content(self):
+        payload = {"list": [{"dt": 1900000000, "main": {"temp": 280.1}}]}
+        same = ColumnarForecast.from_owm(payload, fetched_at=1), ColumnarForecast.from_owm(payload, fetched_at=2)
+        changed = ColumnarForecast.from_owm({"list": [{"dt": 1900000000, "main": {"temp": 281.0}}]})
+        self.assertEqual(same[0].fingerprint, same[1].fingerprint)
+        self.assertNotEqual(same[0].fingerprint, changed.fingerprint)
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_model_validator_reads_cache_only(self, mock_api_call):
+        mock_api_call.return_value = {"dt": 1700000000}
+        model = FavoriteListModel()
+        model.favorites = {1: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}]}
+
+        self.assertIsNone(model.get_cache_validator("weather", 1, "London"))
+        model.get_weather(1, "London", "key")
+        validator = model.get_cache_validator("weather", 1, "London")
+
+        self.assertEqual(validator.last_modified, 1700000000)
+        self.assertGreater(validator.max_age, 0)
+        self.assertEqual(model.get_cache_validator("weather", 1).etag, validator.etag)
+        self.assertEqual(mock_api_call.call_count, 1)
+        with self.assertRaises(ValueError):
+            model.get_cache_validator("weather", 1, "Paris")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.http_transport import HttpTransport, StubBackend, TransportError, TransportResponse
+
+
+class FlakyBackend(StubBackend):
+    """Fails with the given outcomes before answering normally."""
+
+    def __init__(self, routes, failures):
+        super().__init__(routes)
+        self.failures = list(failures)
+
+    def get(self, url, params, timeout):
+        if self.failures:
+            failure = self.failures.pop(0)
+            self.calls.append(url)
+            if isinstance(failure, Exception):
+                raise failure
+            return TransportResponse(failure, b"")
+        return super().get(url, params, timeout)
+
+
+class TestHttpTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.sleeps = []
+        self.routes = {"/data/2.5/weather": lambda params: {"weather": "sunny", "lat": params["lat"]}}
+
+    def _transport(self, backend, max_retries=2):
+        return HttpTransport(backend=backend, max_retries=max_retries, backoff_factor=0.1,
+                             sleep=self.sleeps.append)
+
+    def test_get_json_from_stub(self):
+        transport = self._transport(StubBackend(self.routes))
+        data = transport.get_json(transport.api_url("weather"), {"lat": 1.0})
+        self.assertEqual(data, {"weather": "sunny", "lat": 1.0})
+
+    def test_retries_transient_failures_with_backoff(self):
+        backend = FlakyBackend(self.routes, [TransportError("reset"), 503])
+        transport = self._transport(backend)
+
+        data = transport.get_json(transport.api_url("weather"), {"lat": 1.0})
+
+        self.assertEqual(data["weather"], "sunny")
+        self.assertEqual(self.sleeps, [0.1, 0.2])
+
+    def test_gives_up_after_max_retries(self):
+        backend = FlakyBackend(self.routes, [TransportError("timeout", timeout=True)] * 3)
+        transport = self._transport(backend)
+
+        with self.assertRaises(TransportError) as context:
+            transport.get(transport.api_url("weather"))
+        self.assertTrue(context.exception.timeout)
+        self.assertEqual(len(backend.calls), 3)
+
+    def test_client_errors_are_not_retried(self):
+        backend = StubBackend(self.routes)
+        transport = self._transport(backend)
+
+        with self.assertRaises(TransportError) as context:
+            transport.get(transport.api_url("unknown"))
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(len(backend.calls), 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_model_uses_injected_transport(self):
+        routes = {"/geo/1.0/direct": lambda params: [{"lat": 10.0, "lon": 20.0}]}
+        routes.update(self.routes)
+        backend = StubBackend(routes)
+        model = FavoriteListModel(transport=self._transport(backend))
+
+        model.add_city(1, "TestCity", "test_api_key")
+        weather = model.get_weather(1, "TestCity", "test_api_key")
+
+        self.assertEqual(weather["lat"], 10.0)
+        self.assertEqual([path for path, _ in backend.calls], ["/geo/1.0/direct", "/data/2.5/weather"])
+
+    def test_model_raises_runtime_error_on_upstream_failure(self):
+        model = FavoriteListModel(transport=self._transport(StubBackend(), max_retries=0))
+        with self.assertRaises(RuntimeError):
+            model._make_api_call("weather", {"lat": 1.0, "lon": 2.0}, "test_api_key")
+
+
+if __name__ == "__main__":
+    unittest.main()
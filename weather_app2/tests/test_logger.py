@@ -0,0 +1,73 @@
+import logging
+import queue
+import unittest
+
+from weather_app.utils.logger import (
+    NonBlockingQueueHandler, RateLimitFilter, SamplingFilter, TruncatingFilter, setup_logging, summarize
+)
+
+from helpers import FakeClock
+
+
+def make_record(name="weather_app.models.favorite_list_model", level=logging.INFO, msg="Cache hit for %s.", args=("x",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestLoggingPipeline(unittest.TestCase):
+
+    def test_sampling_applies_to_child_loggers_below_warning(self):
+        sampler = SamplingFilter({"weather_app.models": 0.0, "weather_app.models.user_model": 1.0})
+        self.assertFalse(sampler.filter(make_record()))
+        self.assertTrue(sampler.filter(make_record(name="weather_app.models.user_model")))
+        self.assertTrue(sampler.filter(make_record(name="weather_app.utils.fanout")))
+        self.assertTrue(sampler.filter(make_record(level=logging.ERROR)))
+        self.assertEqual(sampler.sampled_out, 1)
+
+    def test_rate_limit_per_template_reports_suppressed(self):
+        clock = FakeClock()
+        limiter = RateLimitFilter(rate=1, burst=2, clock=clock)
+        results = [limiter.filter(make_record()) for _ in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertTrue(limiter.filter(make_record(msg="Another message %s.")))
+        self.assertTrue(limiter.filter(make_record(level=logging.WARNING)))
+
+        clock.now += 1
+        record = make_record()
+        self.assertTrue(limiter.filter(record))
+        self.assertIn("3 similar messages suppressed", record.getMessage())
+        self.assertEqual(limiter.rate_limited, 3)
+
+    def test_rate_limit_keeps_most_recent_templates(self):
+        limiter = RateLimitFilter(rate=1, burst=1, clock=FakeClock(), max_templates=2)
+        for msg in ("First %s.", "Second %s.", "First %s.", "Third %s."):
+            limiter.filter(make_record(msg=msg))
+
+        self.assertEqual([template for _, template in limiter._buckets], ["First %s.", "Third %s."])
+        # The forgotten template starts again with a full bucket
+        self.assertTrue(limiter.filter(make_record(msg="Second %s.")))
+
+    def test_large_arguments_are_summarized(self):
+        self.assertEqual(summarize(list(range(100)), max_items=20), "<list of 100 items>")
+        self.assertEqual(summarize({"a": 1}), "{'a': 1}")
+        self.assertEqual(summarize("x" * 30, max_chars=10), "xxxxxxxxxx... (20 more characters)")
+        self.assertEqual(summarize(42), 42)
+
+        record = make_record(msg="Payload %s for %d", args=({"list": list(range(50))}, 7))
+        TruncatingFilter(max_chars=20, max_items=20).filter(record)
+        self.assertEqual(record.getMessage(), "Payload {'list': [0, 1, 2, 3... (180 more characters) for 7")
+
+    def test_full_queue_drops_records(self):
+        handler = NonBlockingQueueHandler(queue.Queue(1), fallback=logging.NullHandler())
+        handler.handle(make_record())
+        handler.handle(make_record())
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_setup_installs_one_handler(self):
+        handler = setup_logging()
+        self.assertIs(setup_logging(), handler)
+        self.assertEqual(sum(h is handler for h in logging.getLogger().handlers), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
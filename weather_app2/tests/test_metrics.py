@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from weather_app.utils.http_transport import TransportError
+from weather_app.utils.metrics import UPSTREAM_REQUESTS, MetricsRegistry, track_upstream
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counter_merges_thread_shards(self):
+        counter = MetricsRegistry().counter("test_total", "Test counter.", ("route",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc("/weather")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc("/forecast", amount=2)
+
+        self.assertEqual(counter.values(), {("/weather",): 4000, ("/forecast",): 2})
+        # Shards of the exited threads are folded in and still counted
+        self.assertEqual(counter.values()[("/weather",)], 4000)
+
+    def test_dead_shards_are_retired_without_a_scrape(self):
+        counter = MetricsRegistry().counter("test_total", "Test counter.")
+        for _ in range(20):
+            thread = threading.Thread(target=counter.inc)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(counter._shards._shards), 1)
+        self.assertEqual(counter.values(), {(): 20})
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = MetricsRegistry().histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        value = histogram.values()[()]
+        self.assertEqual(value["buckets"], {0.1: 2, 1.0: 3, float("inf"): 4})
+        self.assertEqual(value["count"], 4)
+        self.assertAlmostEqual(value["sum"], 3.65)
+
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test counter.", ("route",)).inc('/a"b')
+        registry.histogram("test_seconds", "Test histogram.", buckets=(1.0,)).observe(0.5)
+        registry.callback("test_ratio", "Test gauge.", ("cache",), lambda: {("tile",): 0.25})
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE test_total counter", lines)
+        self.assertIn('test_total{route="/a\\"b"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="1.0"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 1', lines)
+        self.assertIn("test_seconds_count 1", lines)
+        self.assertIn("# TYPE test_ratio gauge", lines)
+        self.assertIn('test_ratio{cache="tile"} 0.25', lines)
+
+    def test_registering_twice_returns_the_same_metric(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter.")
+        self.assertIs(registry.counter("test_total", "Test counter."), counter)
+        with self.assertRaises(ValueError):
+            registry.histogram("test_total", "Test histogram.")
+
+    def test_track_upstream_outcomes(self):
+        before = UPSTREAM_REQUESTS.values()
+        with track_upstream("test"):
+            pass
+        with self.assertRaises(TransportError):
+            with track_upstream("test"):
+                raise TransportError("timed out", timeout=True)
+        with self.assertRaises(RuntimeError):
+            with track_upstream("test"):
+                raise RuntimeError("bad response")
+
+        after = UPSTREAM_REQUESTS.values()
+        for outcome in ("ok", "timeout", "error"):
+            self.assertEqual(after[("test", outcome)] - before.get(("test", outcome), 0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
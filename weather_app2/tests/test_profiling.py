@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from weather_app.utils.profiling import RequestProfiler
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_triggers(self):
+        profiler = RequestProfiler(self.directory, token="secret", sample_rate=0.5, sample_routes=["/forecast"])
+        self.assertTrue(profiler.should_profile("/favorites", "secret"))
+        self.assertFalse(profiler.should_profile("/favorites", "wrong"))
+        with patch("weather_app.utils.profiling.random.random", return_value=0.1):
+            self.assertTrue(profiler.should_profile("/forecast"))
+            self.assertFalse(profiler.should_profile("/favorites"))
+        with patch("weather_app.utils.profiling.random.random", return_value=0.9):
+            self.assertFalse(profiler.should_profile("/forecast"))
+        self.assertFalse(RequestProfiler(self.directory, token="").should_profile("/favorites", ""))
+
+    def test_is_authorized(self):
+        profiler = RequestProfiler(self.directory, token="secret")
+        self.assertTrue(profiler.is_authorized("secret"))
+        self.assertFalse(profiler.is_authorized("wrong"))
+        self.assertFalse(profiler.is_authorized(None))
+        self.assertFalse(RequestProfiler(self.directory, token="").is_authorized(""))
+
+    def test_profile_is_written_listed_and_summarized(self):
+        profiler = RequestProfiler(self.directory)
+        active = profiler.start()
+        busy(10000)
+        name = profiler.finish(active, "/weather/all", "alice_1")
+
+        profiles = profiler.list_profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiles[0]["name"], name)
+        self.assertEqual((profiles[0]["route"], profiles[0]["user"]), ("weather-all", "alice-1"))
+
+        summary = profiler.summarize(name, top=50)
+        self.assertTrue(any("busy" in row["function"] for row in summary["functions"]))
+        with self.assertRaises(ValueError):
+            profiler.summarize("../" + name)
+        with self.assertRaises(ValueError):
+            profiler.summarize("1_x_y_5ms.prof")
+
+    def test_one_profile_at_a_time(self):
+        profiler = RequestProfiler(self.directory)
+        active = profiler.start()
+        self.assertIsNone(profiler.start())
+        profiler.finish(active, "/forecast", None)
+        active = profiler.start()
+        self.assertIsNotNone(active)
+        profiler.finish(active, "/forecast", None)
+        self.assertEqual(profiler.stats()["skipped_busy"], 1)
+
+    def test_oldest_profiles_are_rotated(self):
+        profiler = RequestProfiler(self.directory, max_files=2)
+        for i in range(4):
+            with patch("weather_app.utils.profiling.time.time", return_value=1700000000 + i):
+                profiler.finish(profiler.start(), "/forecast", str(i))
+
+        self.assertEqual([p["user"] for p in profiler.list_profiles()], ["3", "2"])
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
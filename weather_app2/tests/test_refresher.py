@@ -0,0 +1,114 @@
+import time
+import unittest
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.http_transport import HttpTransport, StubBackend, TransportResponse
+from weather_app.utils.refresher import WeatherRefresher
+from weather_app.utils.response_cache import ResponseCache
+
+from helpers import FakeClock
+
+
+class TestWeatherRefresher(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.backend = StubBackend({
+            "/data/2.5/weather": lambda params: {"temp": 20},
+            "/data/2.5/forecast": lambda params: {"list": []},
+        })
+        self.model = FavoriteListModel(
+            response_cache=ResponseCache(ttls={"weather": 600, "forecast": 1800}, stale_ttl=300, clock=self.clock),
+            transport=HttpTransport(backend=self.backend, max_retries=0),
+        )
+        self.model.favorites = {
+            1: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12},
+                {"city_name": "Paris", "latitude": 48.85, "longitude": 2.35}],
+            2: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}],
+        }
+        self.refresher = WeatherRefresher(self.model, "key", interval=60, jitter=0.0, max_calls=100)
+
+    def test_cycle_warms_every_distinct_location(self):
+        summary = self.refresher.run_once()
+
+        self.assertEqual(summary["refreshed"], 4)  # 2 locations x 2 cached endpoints
+        self.assertEqual(len(self.backend.calls), 4)
+        self.assertEqual(self.model.get_weather(2, "London", "key"), {"temp": 20})
+        self.assertEqual(len(self.backend.calls), 4)
+
+    def test_only_responses_about_to_expire_are_refreshed(self):
+        self.refresher.run_once()
+
+        self.clock.now += 570  # weather has 30s left, forecast 1230s
+        summary = self.refresher.run_once()
+
+        self.assertEqual(summary["refreshed"], 2)
+        self.assertEqual({path for path, _ in self.backend.calls[4:]}, {"/data/2.5/weather"})
+
+    def test_max_calls_defers_the_rest_and_lag_is_reported(self):
+        self.refresher.run_once()
+        self.clock.now += 700  # both weather entries have been stale for 100s
+
+        refresher = WeatherRefresher(self.model, "key", interval=60, jitter=0.0, max_calls=1)
+        summary = refresher.run_once()
+
+        self.assertEqual(summary["refreshed"], 1)
+        self.assertEqual(summary["deferred"], 1)
+        self.assertAlmostEqual(summary["lag"], 100.0)
+        self.assertEqual(refresher.stats()["max_lag"], summary["lag"])
+
+    def test_failures_are_counted(self):
+        self.backend.routes["/data/2.5/forecast"] = lambda params: TransportResponse(500, b"{}")
+        summary = self.refresher.run_once()
+
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(self.refresher.stats()["errors"], 2)
+
+    def test_start_and_stop(self):
+        self.refresher.start()
+        deadline = time.monotonic() + 5
+        while self.refresher.stats()["cycles"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.refresher.stop(timeout=5)
+
+        stats = self.refresher.stats()
+        self.assertEqual(stats["cycles"], 1)
+        self.assertFalse(stats["running"])
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.cache = ResponseCache(ttls={"weather": 600}, stale_ttl=300, clock=self.clock)
+
+    def test_stale_entries_are_only_returned_by_lookup(self):
+        self.cache.set("weather", 10.0, 20.0, {"temp": 20})
+        self.clock.now += 700
+
+        self.assertIsNone(self.cache.get("weather", 10.0, 20.0))
+        self.assertEqual(self.cache.lookup("weather", 10.0, 20.0), ({"temp": 20}, False))
+        self.assertAlmostEqual(self.cache.expires_in("weather", 10.0, 20.0), -100.0)
+
+        self.clock.now += 300
+        self.assertEqual(self.cache.lookup("weather", 10.0, 20.0), (None, False))
+
+    def test_model_serves_stale_data_and_revalidates(self):
+        responses = iter([{"temp": 20}, {"temp": 25}])
+        backend = StubBackend({"/data/2.5/weather": lambda params: next(responses)})
+        model = FavoriteListModel(response_cache=self.cache, transport=HttpTransport(backend=backend))
+        model.favorites = {1: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}]}
+
+        self.assertEqual(model.get_weather(1, "London", "key"), {"temp": 20})
+        self.clock.now += 700
+        self.assertEqual(model.get_weather(1, "London", "key"), {"temp": 20})
+
+        deadline = time.monotonic() + 5
+        while self.cache.get("weather", 51.5, -0.12) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(model.get_weather(1, "London", "key"), {"temp": 25})
+        self.assertEqual(len(backend.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(ttls={"weather": 600, "forecast": 1800}, maxsize=10)
+
+    def test_set_and_get(self):
+        self.cache.set("weather", 10.0, 20.0, {"weather": "sunny"})
+        self.assertEqual(self.cache.get("weather", 10.0, 20.0), {"weather": "sunny"})
+        self.assertIsNone(self.cache.get("forecast", 10.0, 20.0))
+
+    def test_uncached_endpoint_is_ignored(self):
+        self.cache.set("air_pollution", 10.0, 20.0, {"aqi": 1})
+        self.assertIsNone(self.cache.get("air_pollution", 10.0, 20.0))
+
+    def test_invalidate_by_location(self):
+        self.cache.set("weather", 10.0, 20.0, {"weather": "sunny"})
+        self.cache.set("forecast", 10.0, 20.0, {"forecast": []})
+        self.cache.set("weather", 30.0, 40.0, {"weather": "rain"})
+
+        self.assertEqual(self.cache.invalidate(latitude=10.0, longitude=20.0), 2)
+        self.assertIsNone(self.cache.get("weather", 10.0, 20.0))
+        self.assertIsNotNone(self.cache.get("weather", 30.0, 40.0))
+
+    def test_invalidate_by_endpoint(self):
+        self.cache.set("weather", 10.0, 20.0, {"weather": "sunny"})
+        self.cache.set("forecast", 10.0, 20.0, {"forecast": []})
+
+        self.assertEqual(self.cache.invalidate(endpoint="weather"), 1)
+        self.assertIsNotNone(self.cache.get("forecast", 10.0, 20.0))
+
+    def test_invalidate_requires_both_coordinates(self):
+        with self.assertRaises(ValueError):
+            self.cache.invalidate(latitude=10.0)
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_users_share_cached_weather(self, mock_api_call):
+        mock_api_call.return_value = {"weather": "sunny"}
+        model = FavoriteListModel()
+        model.favorites = {
+            1: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}],
+            2: [{"city_name": "London", "latitude": 51.5, "longitude": -0.12}],
+        }
+
+        model.get_weather(1, "London", "test_api_key")
+        model.get_weather(2, "London", "test_api_key")
+
+        mock_api_call.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from weather_app.utils.session_tokens import SessionManager
+from weather_app.utils.sql_utils import get_pool
+
+
+class TestSessionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_patcher = patch("weather_app.utils.sql_utils.DB_PATH", os.path.join(self.tmp_dir.name, "test.db"))
+        self.db_patcher.start()
+        self.sessions = SessionManager(secret="test-secret", ttl=60)
+
+    def tearDown(self):
+        get_pool().close()
+        self.db_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_issue_and_verify(self):
+        token = self.sessions.issue("alice")
+        self.assertEqual(self.sessions.verify(token), "alice")
+
+    def test_tampered_token_is_rejected(self):
+        session_id, expires, signature = self.sessions.issue("alice").split(".")
+        self.assertIsNone(self.sessions.verify(f"{session_id}.{int(expires) + 3600}.{signature}"))
+        self.assertIsNone(self.sessions.verify("not-a-token"))
+
+    def test_token_from_another_secret_is_rejected(self):
+        token = SessionManager(secret="other-secret").issue("alice")
+        self.assertIsNone(self.sessions.verify(token))
+
+    def test_expired_token_is_rejected(self):
+        sessions = SessionManager(secret="test-secret", ttl=1)
+        token = sessions.issue("alice")
+        with patch("weather_app.utils.session_tokens.time.time", return_value=time.time() + 2):
+            self.assertIsNone(sessions.verify(token))
+
+    def test_session_is_loaded_from_sqlite_on_cache_miss(self):
+        token = self.sessions.issue("alice")
+        # A second manager with the same secret models another worker or a restart.
+        self.assertEqual(SessionManager(secret="test-secret").verify(token), "alice")
+
+    def test_revoke(self):
+        token = self.sessions.issue("alice")
+        self.assertTrue(self.sessions.revoke(token))
+        self.assertIsNone(self.sessions.verify(token))
+        self.assertIsNone(SessionManager(secret="test-secret").verify(token))
+
+    def test_revoke_all(self):
+        tokens = [self.sessions.issue("alice"), self.sessions.issue("alice")]
+        other = self.sessions.issue("bob")
+
+        self.assertEqual(self.sessions.revoke_all("alice"), 2)
+        self.assertEqual([self.sessions.verify(token) for token in tokens], [None, None])
+        self.assertEqual(self.sessions.verify(other), "bob")
+
+
+if __name__ == "__main__":
+    unittest.main()
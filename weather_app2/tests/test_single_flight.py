@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.http_transport import HttpTransport, StubBackend
+from weather_app.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def _run_concurrently(self, target, count):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        self._run_concurrently(lambda: results.append(flight.do("key", slow)), 5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        errors = []
+
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        def caller():
+            try:
+                flight.do("key", failing)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        self._run_concurrently(caller, 3)
+
+        self.assertEqual(errors, ["upstream down"] * 3)
+        self.assertEqual(flight.stats()["executions"], 1)
+
+    def test_sequential_calls_execute_again(self):
+        flight = SingleFlight()
+        flight.do("key", lambda: 1)
+        self.assertEqual(flight.do("key", lambda: 2), 2)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_make_api_call_coalesces_identical_requests(self):
+        backend = StubBackend({"/data/2.5/weather": lambda params: {"weather": "sunny"}}, latency=0.1)
+        model = FavoriteListModel(transport=HttpTransport(backend=backend))
+
+        self._run_concurrently(
+            lambda: model._make_api_call("weather", {"lat": 10.0, "lon": 20.0}, "test_api_key"), 4
+        )
+
+        self.assertEqual(len(backend.calls), 1)
+        self.assertEqual(model.single_flight.stats()["coalesced"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
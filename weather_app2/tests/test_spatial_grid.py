@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.response_cache import ResponseCache
+from weather_app.utils.spatial_grid import SpatialGrid, geohash
+
+
+LOS_ANGELES = (34.0522, -118.2437)
+SANTA_MONICA = (34.0195, -118.4912)
+VENICE = (33.9850, -118.4695)
+
+
+class TestSpatialGrid(unittest.TestCase):
+
+    def test_geohash(self):
+        self.assertEqual(geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash(42.6, -5.6, 5), "ezs42")
+
+    def test_precision_per_endpoint(self):
+        grid = SpatialGrid({"weather": 4, "forecast": 6})
+
+        self.assertEqual(grid.cell("weather", *LOS_ANGELES), grid.cell("weather", *VENICE))
+        self.assertNotEqual(grid.cell("forecast", *LOS_ANGELES), grid.cell("forecast", *VENICE))
+        self.assertEqual(grid.cell("air_pollution", 10.00001, 20.0), (10.0, 20.0))  # no grid: rounding
+
+    def test_collapse_stats(self):
+        grid = SpatialGrid({"weather": 4, "forecast": 6})
+        stats = grid.collapse_stats([LOS_ANGELES, SANTA_MONICA, VENICE, (51.5, -0.12)])
+
+        self.assertEqual(stats["weather"]["locations"], 4)
+        self.assertEqual(stats["weather"]["cells"], 3)
+        self.assertEqual(stats["forecast"]["cells"], 4)
+        self.assertAlmostEqual(stats["weather"]["collapse_ratio"], 0.25)
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel._make_api_call")
+    def test_nearby_favorites_share_one_upstream_call(self, mock_api_call):
+        mock_api_call.return_value = {"weather": "sunny"}
+        model = FavoriteListModel(response_cache=ResponseCache(grid=SpatialGrid({"weather": 4})))
+        model.favorites = {
+            1: [{"city_name": "Los Angeles", "latitude": LOS_ANGELES[0], "longitude": LOS_ANGELES[1]}],
+            2: [{"city_name": "Venice", "latitude": VENICE[0], "longitude": VENICE[1]}],
+        }
+
+        model.get_weather(1, "Los Angeles", "key")
+        model.get_weather(2, "Venice", "key")
+        results = model.get_weather_batch([(1, "Los Angeles"), (2, "Venice")], "key")
+
+        mock_api_call.assert_called_once()
+        self.assertEqual([result["status"] for result in results], ["ok", "ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from weather_app.utils.sql_utils import ConnectionPool, get_db_connection, get_pool
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+        self.db_patcher = patch("weather_app.utils.sql_utils.DB_PATH", self.db_path)
+        self.db_patcher.start()
+
+    def tearDown(self):
+        get_pool().close()
+        self.db_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_connections_are_reused(self):
+        with get_db_connection() as first:
+            pass
+        with get_db_connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(get_pool().stats()["open"], 1)
+        self.assertEqual(get_pool().stats()["checkouts"], 2)
+
+    def test_pragmas_are_applied(self):
+        with get_db_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode;").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous;").fetchone()[0], 1)  # NORMAL
+            self.assertEqual(conn.execute("PRAGMA busy_timeout;").fetchone()[0], 5000)
+
+    def test_uncommitted_work_is_rolled_back_on_release(self):
+        with get_db_connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        with get_db_connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_checkout_times_out_when_pool_is_exhausted(self):
+        pool = ConnectionPool(self.db_path, size=1, timeout=0.05)
+        conn = pool.acquire()
+
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.acquire()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        self.assertEqual(pool.stats()["utilization"], 1.0)
+
+        pool.release(conn)
+        pool.close()
+
+    def test_waiting_checkout_gets_released_connection(self):
+        pool = ConnectionPool(self.db_path, size=1, timeout=1)
+        conn = pool.acquire()
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        pool.release(conn)
+        waiter.join()
+
+        self.assertIs(acquired[0], conn)
+        self.assertGreater(pool.stats()["max_wait_seconds"], 0)
+        pool.release(conn)
+        pool.close()
+
+    def test_connections_released_after_close_are_closed(self):
+        pool = ConnectionPool(self.db_path, size=2)
+        idle, in_use = pool.acquire(), pool.acquire()
+        pool.release(idle)
+        pool.close()
+
+        pool.release(in_use)
+        self.assertEqual(pool.stats()["open"], 0)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            in_use.execute("SELECT 1")
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.acquire()
+
+        shared = get_pool()
+        shared.close()
+        self.assertIsNot(get_pool(), shared)
+
+
+if __name__ == "__main__":
+    unittest.main()
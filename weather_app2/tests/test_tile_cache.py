@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.http_transport import HttpTransport, StubBackend, TransportResponse
+from weather_app.utils.tile_cache import TileCache
+
+
+class TestTileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = TileCache(directory=self.tmp_dir.name, max_bytes=100, default_ttl=60,
+                               layer_ttls={"precipitation_new": 10})
+        self.fetches = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _fetcher(self, content):
+        def fetch():
+            self.fetches.append(content)
+            return content
+        return fetch
+
+    def test_miss_then_hit(self):
+        entry = self.cache.get("clouds_new", 5, 1, 2, self._fetcher(b"tile"))
+        again = self.cache.get("clouds_new", 5, 1, 2, self._fetcher(b"other"))
+
+        self.assertEqual(self.fetches, [b"tile"])
+        self.assertEqual(again.digest, entry.digest)
+        with open(entry.path, "rb") as f:
+            self.assertEqual(f.read(), b"tile")
+
+    def test_identical_tiles_share_one_file(self):
+        first = self.cache.get("clouds_new", 5, 1, 2, self._fetcher(b"empty"))
+        second = self.cache.get("clouds_new", 5, 1, 3, self._fetcher(b"empty"))
+
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(self.cache.stats()["files"], 1)
+        self.assertEqual(self.cache.stats()["bytes"], 5)
+
+    def test_lru_eviction_deletes_unreferenced_files(self):
+        first = self.cache.get("clouds_new", 5, 0, 0, self._fetcher(b"a" * 40))
+        self.cache.get("clouds_new", 5, 0, 1, self._fetcher(b"b" * 40))
+        self.cache.get("clouds_new", 5, 0, 0, self._fetcher(b"unused"))  # touch, so (0, 1) is evicted next
+        self.cache.get("clouds_new", 5, 0, 2, self._fetcher(b"c" * 40))
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["bytes"], 80)
+        self.assertTrue(os.path.exists(first.path))
+        self.cache.get("clouds_new", 5, 0, 1, self._fetcher(b"b" * 40))
+        self.assertEqual(self.fetches.count(b"b" * 40), 2)
+
+    def test_layer_ttl(self):
+        self.cache.get("precipitation_new", 5, 0, 0, self._fetcher(b"rain"))
+        self.cache.get("clouds_new", 5, 0, 0, self._fetcher(b"cloud"))
+
+        with patch("weather_app.utils.tile_cache.time.time", return_value=time.time() + 30):
+            self.cache.get("precipitation_new", 5, 0, 0, self._fetcher(b"rain2"))
+            self.cache.get("clouds_new", 5, 0, 0, self._fetcher(b"cloud2"))
+
+        self.assertEqual(self.fetches, [b"rain", b"cloud", b"rain2"])
+
+    def test_directories_of_dead_processes_are_removed(self):
+        stale = os.path.join(self.tmp_dir.name, "worker-999999999")
+        os.makedirs(stale)
+        TileCache(directory=self.tmp_dir.name)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_fetch_tile_validates_and_downloads(self):
+        backend = StubBackend({
+            "/map/clouds_new/5/1/2.png": lambda params: TransportResponse(200, b"png", {"Content-Type": "image/png"}),
+        })
+        model = FavoriteListModel(transport=HttpTransport(backend=backend, max_retries=0))
+
+        self.assertEqual(model.fetch_tile("clouds_new", 5, 1, 2, "key"), b"png")
+        self.assertEqual(backend.calls, [("/map/clouds_new/5/1/2.png", {"appid": "key"})])
+        with self.assertRaises(ValueError):
+            model.fetch_tile("unknown", 5, 1, 2, "key")
+        with self.assertRaises(ValueError):
+            model.fetch_tile("clouds_new", 2, 4, 0, "key")
+        with self.assertRaises(RuntimeError):
+            model.fetch_tile("clouds_new", 5, 1, 3, "key")
+
+
+if __name__ == "__main__":
+    unittest.main()
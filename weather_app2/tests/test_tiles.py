@@ -0,0 +1,86 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.favorite_list_model import FavoriteListModel
+from weather_app.utils.tiles import TileIndex, covering_tiles, latlon_to_tile, latlon_to_tiles
+
+
+class TestTiles(unittest.TestCase):
+
+    def test_scalar_tile_math(self):
+        self.assertEqual(latlon_to_tile(0.0, 0.0, 1), (1, 1))
+        self.assertEqual(latlon_to_tile(51.5, -0.12, 5), (15, 10))
+        self.assertEqual(latlon_to_tile(90.0, 180.0, 3), (7, 0))  # clamped to the grid
+
+    def test_vectorized_path_matches_scalar_path(self):
+        rng = random.Random(42)
+        coordinates = [(rng.uniform(-85, 85), rng.uniform(-180, 180)) for _ in range(500)]
+        zooms = [0, 3, 5, 10, 18]
+
+        x, y = latlon_to_tiles([lat for lat, _ in coordinates], [lon for _, lon in coordinates], zooms)
+
+        self.assertEqual(x.shape, (len(zooms), len(coordinates)))
+        for i, zoom in enumerate(zooms):
+            for j, (lat, lon) in enumerate(coordinates):
+                self.assertEqual((x[i, j], y[i, j]), latlon_to_tile(lat, lon, zoom))
+
+    def test_covering_tiles_are_deduplicated(self):
+        tiles = covering_tiles([51.5, 51.51, -33.9], [-0.12, -0.13, 151.2], [4, 5])
+        self.assertEqual(tiles, sorted(set(tiles)))
+        self.assertEqual(len(tiles), 4)  # London's two favorites share a tile at each zoom
+
+    def test_tile_index_precomputes_and_falls_back(self):
+        index = TileIndex(zooms=(5,))
+        index.add(51.5, -0.12)
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get(51.5, -0.12, 5), (15, 10))
+        self.assertEqual(index.get(51.5, -0.12, 7), latlon_to_tile(51.5, -0.12, 7))
+        with self.assertRaises(ValueError):
+            index.get(51.5, -0.12, 30)
+
+    def test_tile_index_evicts_least_recently_used(self):
+        index = TileIndex(zooms=(5,), maxsize=2)
+        index.add(51.5, -0.12)
+        index.add(48.85, 2.35)
+        index.get(51.5, -0.12, 5)
+        index.add(-33.9, 151.2)
+
+        self.assertEqual(len(index), 2)
+        self.assertEqual(list(index._tiles), [(51.5, -0.12), (-33.9, 151.2)])
+        self.assertEqual(index.get(48.85, 2.35, 5), latlon_to_tile(48.85, 2.35, 5))
+
+    @patch("weather_app.models.favorite_list_model.FavoriteListModel.get_city_coordinates")
+    def test_bulk_add_indexes_only_inserted_favorites(self, mock_coordinates):
+        mock_coordinates.side_effect = lambda city_name, api_key: {"London": (51.5, -0.12),
+                                                                   "Paris": (48.85, 2.35)}[city_name]
+        model = FavoriteListModel()
+        # Paris is added by a concurrent request between the check and the insert
+        with patch.object(model.store, "add_many", return_value=[True, False]):
+            model.add_cities(1, ["London", "Paris"], "key")
+
+        self.assertEqual(list(model.tiles._tiles), [(51.5, -0.12)])
+
+    def test_weather_map_all(self):
+        model = FavoriteListModel()
+        model.favorites = {1: [
+            {"city_name": "London", "latitude": 51.5, "longitude": -0.12},
+            {"city_name": "Westminster", "latitude": 51.49, "longitude": -0.13},
+            {"city_name": "Sydney", "latitude": -33.9, "longitude": 151.2},
+        ]}
+
+        weather_map = model.get_weather_map_all(1, "clouds", min_zoom=4, max_zoom=5)
+
+        self.assertEqual(weather_map["layer"], "clouds_new")
+        self.assertEqual(weather_map["zooms"], [4, 5])
+        self.assertEqual(len(weather_map["tiles"]), 4)
+        self.assertEqual(weather_map["tiles"][0], {"zoom": 4, "x": 7, "y": 5})
+        with self.assertRaises(ValueError):
+            model.get_weather_map_all(1, "clouds", min_zoom=6, max_zoom=5)
+        with self.assertRaises(ValueError):
+            model.get_weather_map_all(1, "fog")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from weather_app.models.user_model import UserModel
+from weather_app.utils.password_hasher import PasswordHasher
+from weather_app.utils.sql_utils import get_db_connection, get_pool
+
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "sql", "create_user_table.sql")
+
+
+class TestUserModel(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_patcher = patch("weather_app.utils.sql_utils.DB_PATH", os.path.join(self.tmp_dir.name, "test.db"))
+        self.db_patcher.start()
+        with open(SCHEMA_PATH) as schema, get_db_connection() as conn:
+            conn.executescript(schema.read())
+
+        # A cheap work factor keeps the tests fast; workers=0 hashes inline.
+        self.hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=0)
+        self.model = UserModel(hasher=self.hasher)
+
+    def tearDown(self):
+        get_pool().close()
+        self.db_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def _stored_hash(self, username):
+        with get_db_connection() as conn:
+            return conn.execute("SELECT hashed_password FROM users WHERE username = ?", (username,)).fetchone()[0]
+
+    def test_create_account_and_login(self):
+        self.model.create_account("alice", "secret")
+
+        self.assertTrue(self.model.login("alice", "secret"))
+        self.assertFalse(self.model.login("alice", "wrong"))
+        self.assertFalse(self.model.login("bob", "secret"))
+
+    def test_duplicate_account_raises_error(self):
+        self.model.create_account("alice", "secret")
+        with self.assertRaises(ValueError):
+            self.model.create_account("alice", "secret")
+
+    def test_update_password(self):
+        self.model.create_account("alice", "secret")
+        self.model.update_password("alice", "new-secret")
+
+        self.assertFalse(self.model.login("alice", "secret"))
+        self.assertTrue(self.model.login("alice", "new-secret"))
+
+    def test_update_password_for_unknown_user_raises_error(self):
+        with self.assertRaises(ValueError):
+            self.model.update_password("bob", "new-secret")
+
+    def test_get_user_id(self):
+        self.model.create_account("alice", "secret")
+        self.model.create_account("bob", "secret")
+
+        self.assertEqual(self.model.get_user_id("alice"), 1)
+        self.assertEqual(self.model.get_user_id("bob"), 2)
+        self.assertIsNone(self.model.get_user_id("carol"))
+        with patch("weather_app.models.user_model.get_db_connection") as mock_connection:
+            self.assertEqual(self.model.get_user_id("alice"), 1)
+        mock_connection.assert_not_called()
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        UserModel(hasher=PasswordHasher(method="pbkdf2:sha256:500", workers=0)).create_account("alice", "secret")
+        self.assertTrue(self._stored_hash("alice").startswith("pbkdf2:sha256:500$"))
+
+        self.assertTrue(self.model.login("alice", "secret"))
+
+        self.assertTrue(self._stored_hash("alice").startswith("pbkdf2:sha256:1000$"))
+        self.assertTrue(self.model.login("alice", "secret"))
+
+    def test_failed_login_does_not_rehash(self):
+        UserModel(hasher=PasswordHasher(method="pbkdf2:sha256:500", workers=0)).create_account("alice", "secret")
+        self.model.login("alice", "wrong")
+        self.assertTrue(self._stored_hash("alice").startswith("pbkdf2:sha256:500$"))
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def test_needs_rehash_resolves_default_parameters(self):
+        hasher = PasswordHasher(method="scrypt", workers=0)
+        self.assertFalse(hasher.needs_rehash("scrypt:32768:8:1$salt$hash"))
+        self.assertTrue(hasher.needs_rehash("pbkdf2:sha256:600000$salt$hash"))
+
+    def test_process_pool_round_trip(self):
+        hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=1)
+        try:
+            password_hash = hasher.hash("secret")
+            self.assertTrue(hasher.verify(password_hash, "secret"))
+            self.assertFalse(hasher.verify(password_hash, "wrong"))
+        finally:
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
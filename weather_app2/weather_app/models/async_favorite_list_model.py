@@ -0,0 +1,324 @@
+import asyncio
+import logging
+
+from weather_app.models.favorite_list_model import RESPONSE_DECODERS, FavoriteListModel
+from weather_app.utils.async_http_transport import AsyncHttpTransport
+from weather_app.utils.columnar import project_weather, validate_fields
+from weather_app.utils.fanout import FANOUT_DEADLINE, FANOUT_MAX_PARALLELISM
+from weather_app.utils.http_transport import TransportError
+from weather_app.utils.logger import configure_logger
+from weather_app.utils.metrics import track_upstream
+from weather_app.utils.tiles import DEFAULT_MAP_ZOOM
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class AsyncFavoriteListModel:
+    def __init__(self, model: FavoriteListModel = None, transport: AsyncHttpTransport = None):
+        """Initialize the asyncio counterpart of ``FavoriteListModel``.
+
+        The async model shares its favorites store, geocode cache and response
+        cache with a ``FavoriteListModel``, so both views of the data stay
+        consistent and warm each other's caches. Only the upstream calls
+        differ: they are awaited on a non-blocking transport, so a waiting
+        request costs a suspended coroutine instead of a thread.
+
+        The favorites store and the geocode cache may be backed by SQLite,
+        whose calls block on disk and on the database lock, so they run on
+        the default executor via ``asyncio.to_thread`` and never stall the
+        shared event loop. The response cache is a plain in-memory lookup
+        and stays on the loop.
+
+        Parameters
+        ----------
+        model : FavoriteListModel, optional
+            The synchronous model whose store and caches are shared. Defaults
+            to a new model with in-memory storage.
+        transport : AsyncHttpTransport, optional
+            The non-blocking transport used for every OpenWeatherMap call.
+            It must only be used from one event loop.
+        """
+        self.model = model if model is not None else FavoriteListModel()
+        self.store = self.model.store
+        self.geocode_cache = self.model.geocode_cache
+        self.response_cache = self.model.response_cache
+        self.transport = transport if transport is not None else AsyncHttpTransport()
+        self._in_flight = {}  # Structure: {key: asyncio.Task}; coalesces identical upstream calls
+
+    async def _coalesce(self, key, factory):
+        """Await ``factory()`` for ``key``, or join the identical call already in flight.
+
+        The shared task is shielded, so a caller that is cancelled (for
+        example by a deadline) does not cancel it for the other waiters.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+
+            def forget(finished):
+                self._in_flight.pop(key, None)
+                if not finished.cancelled():
+                    finished.exception()  # Mark the error as retrieved even if every waiter left
+
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
+
+    async def _make_api_call(self, endpoint: str, params: dict, api_key: str) -> dict:
+        """Await a data API call, sharing it with identical calls in flight.
+
+        Raises
+        ------
+        RuntimeError
+            If the API call fails (e.g., network issues, invalid API key, or non-200 HTTP status).
+        """
+        url = self.transport.api_url(endpoint)
+        params["appid"] = api_key
+
+        async def call():
+            try:
+                with track_upstream(endpoint):
+                    data = await self.transport.get_json(url, params)
+                logger.info("API call to %s successful.", endpoint)
+                return data
+            except TransportError as e:
+                logger.error("API call failed: %s", e)
+                raise RuntimeError(f"API call failed: {e}")
+
+        return await self._coalesce((url, tuple(sorted(params.items()))), call)
+
+    async def _fetch(self, endpoint: str, latitude: float, longitude: float, api_key: str) -> dict:
+        """Fetch an endpoint for a location from the response cache, revalidating stale entries in the background."""
+        data, fresh = self.response_cache.lookup(endpoint, latitude, longitude)
+        if data is not None:
+            if fresh:
+                logger.debug("Response cache hit for %s at (%s, %s).", endpoint, latitude, longitude)
+            else:
+                logger.info("Serving stale %s at (%s, %s) while revalidating.", endpoint, latitude, longitude)
+                task = asyncio.ensure_future(self.refresh(endpoint, latitude, longitude, api_key))
+                task.add_done_callback(self._log_revalidation_error)
+            return data
+
+        return await self.refresh(endpoint, latitude, longitude, api_key)
+
+    async def refresh(self, endpoint: str, latitude: float, longitude: float, api_key: str) -> dict:
+        """Fetch an endpoint for a location upstream and store it in the response cache.
+
+        Raises
+        ------
+        RuntimeError
+            If the API call fails.
+        """
+        async def call():
+            data = await self._make_api_call(endpoint, {"lat": latitude, "lon": longitude}, api_key)
+            if endpoint in RESPONSE_DECODERS:
+                data = RESPONSE_DECODERS[endpoint](data)
+            self.response_cache.set(endpoint, latitude, longitude, data)
+            return data
+
+        # Nearby favorites in the same grid cell share one upstream call, made for the first caller's coordinates
+        return await self._coalesce(self.response_cache.make_key(endpoint, latitude, longitude), call)
+
+    @staticmethod
+    def _log_revalidation_error(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Revalidation failed: %s", task.exception())
+
+    async def _make_geo_api_call(self, city_name: str, api_key: str) -> list:
+        """Await a geocoding API call, sharing it with identical lookups in flight.
+
+        Raises
+        ------
+        RuntimeError
+            If the geocoding API call fails.
+        """
+        url = self.transport.geo_url("direct")
+        params = {
+            "q": city_name,
+            "limit": 1,
+            "appid": api_key
+        }
+
+        async def call():
+            try:
+                with track_upstream("geocoding"):
+                    data = await self.transport.get_json(url, params)
+                logger.info("Geocoding API call successful for city %s: %d results.", city_name, len(data))
+                return data
+            except TransportError as e:
+                logger.error("Geocoding API call failed: %s", e)
+                raise RuntimeError(f"Geocoding API call failed: {e}")
+
+        return await self._coalesce((url, tuple(sorted(params.items()))), call)
+
+    async def get_city_coordinates(self, city_name: str, api_key: str):
+        """Get the latitude and longitude for a city, consulting the geocode cache first.
+
+        Returns
+        -------
+        tuple
+            A tuple containing the latitude and longitude as floats (lat, lon).
+
+        Raises
+        ------
+        ValueError
+            If no data, or incomplete data, is returned for the given city.
+        """
+        cached = await asyncio.to_thread(self.geocode_cache.get, city_name)
+        if cached is not None:
+            logger.debug("Geocode cache hit for city %s.", city_name)
+            return cached
+
+        data = await self._make_geo_api_call(city_name, api_key)
+        if not data:
+            logger.error("No coordinates found for city %s.", city_name)
+            raise ValueError(f"No coordinates found for city {city_name}.")
+        lat = data[0].get("lat")
+        lon = data[0].get("lon")
+        if lat is None or lon is None:
+            logger.error("Incomplete data returned for city %s.", city_name)
+            raise ValueError(f"Incomplete coordinate data for city {city_name}.")
+        await asyncio.to_thread(self.geocode_cache.set, city_name, lat, lon)
+        return lat, lon
+
+    async def add_city(self, user_id: int, city_name: str, api_key: str):
+        """Add a city to the user's favorites, geocoding it without blocking.
+
+        Raises
+        ------
+        ValueError
+            If the city is already in the user's favorites or cannot be geocoded.
+        """
+        if await asyncio.to_thread(self.store.get, user_id, city_name) is not None:
+            logger.error("City %s already exists in favorites for user ID %d.", city_name, user_id)
+            raise ValueError(f"City {city_name} is already in favorites.")
+
+        latitude, longitude = await self.get_city_coordinates(city_name, api_key)
+
+        if not await asyncio.to_thread(self.store.add, user_id, city_name, latitude, longitude):
+            logger.error("City %s already exists in favorites for user ID %d.", city_name, user_id)
+            raise ValueError(f"City {city_name} is already in favorites.")
+        self.model.tiles.add(latitude, longitude)
+        logger.info("City %s added to favorites for user ID %d.", city_name, user_id)
+
+    async def get_weather(self, user_id: int, city_name: str, api_key: str, fields=None):
+        """Fetch current weather for a specific favorite city, optionally projected to ``fields``.
+
+        Raises
+        ------
+        ValueError
+            If the city is not found in the user's list of favorites or a field is unknown.
+        """
+        if fields is not None:
+            fields = validate_fields(fields)
+        favorite = await asyncio.to_thread(self.model._get_favorite, user_id, city_name)
+        weather_data = await self._fetch("weather", favorite.latitude, favorite.longitude, api_key)
+        return weather_data if fields is None else project_weather(weather_data, fields)
+
+    async def get_all_weather(self, user_id: int, api_key: str, max_parallelism: int = None,
+                              deadline: float = None):
+        """Fetch weather for all favorite cities of a user, leaving out cities that fail.
+
+        Returns
+        -------
+        dict
+            Weather data keyed by city name for the cities that succeeded.
+        """
+        weather_data, errors = await self.get_all_weather_partial(user_id, api_key, max_parallelism, deadline)
+        for city_name, error in errors.items():
+            logger.error("Failed to retrieve weather for city %s for user ID %d: %s", city_name, user_id, error)
+        return weather_data
+
+    async def get_all_weather_partial(self, user_id: int, api_key: str, max_parallelism: int = None,
+                                      deadline: float = None):
+        """Fetch weather for all favorite cities concurrently, reporting per-city errors.
+
+        Behaves like ``FavoriteListModel.get_all_weather_partial`` but runs
+        each city as a coroutine rather than on the shared thread pool.
+
+        Parameters
+        ----------
+        user_id : int
+            The unique identifier of the user.
+        api_key : str
+            The API key required to authenticate the weather API requests.
+        max_parallelism : int, optional
+            The maximum number of cities fetched at once. Defaults to
+            ``FANOUT_MAX_PARALLELISM``.
+        deadline : float, optional
+            The overall time budget for the call, in seconds. Defaults to
+            ``FANOUT_DEADLINE``.
+
+        Returns
+        -------
+        tuple
+            ``(weather_data, errors)`` keyed by city name, in favorites order.
+        """
+        max_parallelism = max(1, max_parallelism or FANOUT_MAX_PARALLELISM)
+        deadline = FANOUT_DEADLINE if deadline is None else deadline
+        semaphore = asyncio.Semaphore(max_parallelism)
+
+        async def fetch(favorite):
+            async with semaphore:
+                return await self._fetch("weather", favorite.latitude, favorite.longitude, api_key)
+
+        favorites = await asyncio.to_thread(self.store.get_all, user_id)
+        tasks = {favorite.city_name: asyncio.ensure_future(fetch(favorite)) for favorite in favorites}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=deadline)
+
+        weather_data, errors = {}, {}
+        for city_name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                errors[city_name] = f"Timed out after {deadline:g}s."
+            elif task.exception() is not None:
+                errors[city_name] = str(task.exception())
+            else:
+                weather_data[city_name] = task.result()
+
+        logger.info("Retrieved weather for %d of %d favorites for user ID %d.",
+                    len(weather_data), len(tasks), user_id)
+        return weather_data, errors
+
+    async def get_weather_map(self, user_id: int, city_name: str, criteria: str, zoom: int = DEFAULT_MAP_ZOOM) -> dict:
+        """Return the weather map tile for a favorite city; see ``FavoriteListModel.get_weather_map``.
+
+        No upstream call is made; the favorite lookup runs off the event loop.
+        """
+        return await asyncio.to_thread(self.model.get_weather_map, user_id, city_name, criteria, zoom)
+
+    async def get_forecast(self, user_id: int, city_name: str, api_key: str, fields=None,
+                           start: int = None, end: int = None):
+        """Fetch the weather forecast for a specific favorite city; see ``FavoriteListModel.get_forecast``.
+
+        Raises
+        ------
+        ValueError
+            If the city is not found in the user's list of favorites or a field is unknown.
+        """
+        if fields is not None:
+            fields = validate_fields(fields)
+        favorite = await asyncio.to_thread(self.model._get_favorite, user_id, city_name)
+        forecast = await self._fetch("forecast", favorite.latitude, favorite.longitude, api_key)
+        logger.info("Retrieved forecast for city %s for user ID %d: %d entries.", city_name, user_id, len(forecast))
+        return forecast.to_response(fields, start, end)
+
+    async def get_air_pollution(self, user_id: int, city_name: str, api_key: str):
+        """Fetch air pollution data for a specific favorite city.
+
+        Raises
+        ------
+        ValueError
+            If the city is not found in the user's list of favorites.
+        """
+        favorite = await asyncio.to_thread(self.model._get_favorite, user_id, city_name)
+        air_pollution_data = await self._fetch("air_pollution", favorite.latitude, favorite.longitude, api_key)
+        logger.info("Retrieved air pollution data for city %s for user ID %d.", city_name, user_id)
+        return air_pollution_data
+
+    async def close(self):
+        """Release the transport's pooled connections."""
+        await self.transport.close()
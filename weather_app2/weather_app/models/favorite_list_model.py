@@ -1,18 +1,80 @@
 import logging
-import requests
+import threading
+
+from weather_app.models.favorites_store import FavoriteCity, InMemoryFavoritesStore
+from weather_app.utils.columnar import ColumnarForecast, project_weather, validate_fields
+from weather_app.utils.fanout import fan_out, get_executor
+from weather_app.utils.geocode_cache import GeocodeCache, normalize_city_name
+from weather_app.utils.http_cache import CacheValidator
+from weather_app.utils.http_transport import HttpTransport, TransportError
+from weather_app.utils.logger import configure_logger
+from weather_app.utils.metrics import track_upstream
+from weather_app.utils.response_cache import ResponseCache
+from weather_app.utils.single_flight import SingleFlight
+from weather_app.utils.tiles import CRITERIA_TO_LAYER, DEFAULT_MAP_ZOOM, TileIndex, covering_tiles, validate_zoom
 
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+configure_logger(logger)
 
+# Responses of these endpoints are converted before they are cached. A forecast
+# is about 40 nested entries; its columnar form is a fraction of the size.
+RESPONSE_DECODERS = {"forecast": ColumnarForecast.from_owm}
 
 class FavoriteListModel:
-    def __init__(self):
-        """Initialize the model with in-memory storage for favorite cities."""
-        self.favorites = {}  # Structure: {user_id: [{"city_name": str, "latitude": float, "longitude": float}]}
+    def __init__(self, geocode_cache: GeocodeCache = None, response_cache: ResponseCache = None,
+                 transport: HttpTransport = None, store=None):
+        """Initialize the model with storage for favorite cities.
+
+        Parameters
+        ----------
+        geocode_cache : GeocodeCache, optional
+            The cache consulted before calling the geocoding API. Defaults to
+            a memory-only cache; pass a persistent one to share geocodes
+            across workers and restarts.
+        response_cache : ResponseCache, optional
+            The cache of weather, forecast and air pollution responses shared
+            by all users. Defaults to a cache with the standard per-endpoint TTLs.
+        transport : HttpTransport, optional
+            The pooled HTTP transport used for every OpenWeatherMap call. 
+            Defaults to a transport with keep-alive connections to the real service.
+        store : InMemoryFavoritesStore or SqliteFavoritesStore, optional
+            Where favorites are kept. Defaults to process-local memory; pass a 
+            ``SqliteFavoritesStore`` to persist them in the application database.
+        """
+        self.store = store if store is not None else InMemoryFavoritesStore()
+        self.geocode_cache = geocode_cache if geocode_cache is not None else GeocodeCache(persistent=False)
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        self.transport = transport if transport is not None else HttpTransport()
+        self.single_flight = SingleFlight()  # Coalesces identical upstream calls that are in flight at once
+        self._revalidating = set()  # Response cache keys being refreshed in the background
+        self._revalidating_lock = threading.Lock()
+        self.tiles = TileIndex()  # Map tiles of favorited locations, precomputed when they are added
+
+    @property
+    def favorites(self) -> dict:
+        """All favorites as ``{user_id: [{"city_name": str, "latitude": float, "longitude": float}]}``.
+
+        This is a snapshot of the whole store, meant for fixtures and 
+        administration; request handlers should use the per-user methods. 
+        Assigning a dictionary of the same shape replaces the store's contents.
+        """
+        return self.store.snapshot()
+
+    @favorites.setter
+    def favorites(self, favorites: dict):
+        self.store.load(favorites)
+
+    def _get_favorite(self, user_id: int, city_name: str) -> FavoriteCity:
+        """Return a user's favorite city, raising ValueError if it is not a favorite."""
+        favorite = self.store.get(user_id, city_name)
+        if favorite is None:
+            logger.error("City %s not found in favorites for user ID %d.", city_name, user_id)
+            raise ValueError(f"City {city_name} is not in favorites.")
+        return favorite
 
     def add_city(self, user_id: int, city_name: str, api_key: str):
-        """Add a city to the user's favorites in memory.
+        """Add a city to the user's favorites.
 
         This method checks if a city is already in the user's favorites and, 
         if not, retrieves its coordinates using a geocoding API and adds it 
@@ -32,24 +94,90 @@ class FavoriteListModel:
         ValueError
             If the city is already in the user's favorites.
         """
-        if user_id not in self.favorites:
-            self.favorites[user_id] = []
-
-        # Check if the city already exists in the user's favorites
-        for favorite in self.favorites[user_id]:
-            if favorite["city_name"] == city_name:
-                logger.error("City %s already exists in favorites for user ID %d.", city_name, user_id)
-                raise ValueError(f"City {city_name} is already in favorites.")
+        # Check if the city already exists in the user's favorites before geocoding it
+        if self.store.get(user_id, city_name) is not None:
+            logger.error("City %s already exists in favorites for user ID %d.", city_name, user_id)
+            raise ValueError(f"City {city_name} is already in favorites.")
 
         # Get the coordinates from the geocoding API
         latitude, longitude = self.get_city_coordinates(city_name, api_key)
 
-        # Add the city to the favorites
-        self.favorites[user_id].append({"city_name": city_name, "latitude": latitude, "longitude": longitude})
+        # Add the city to the favorites; the store rejects a concurrent duplicate
+        if not self.store.add(user_id, city_name, latitude, longitude):
+            logger.error("City %s already exists in favorites for user ID %d.", city_name, user_id)
+            raise ValueError(f"City {city_name} is already in favorites.")
+        self.tiles.add(latitude, longitude)
         logger.info("City %s added to favorites for user ID %d.", city_name, user_id)
 
+    def add_cities(self, user_id: int, city_names: list, api_key: str, max_parallelism: int = None,
+                   deadline: float = None) -> list:
+        """Add many cities to the user's favorites at once.
+
+        Names are deduplicated (ignoring case and whitespace, keeping the 
+        first spelling), cities the user already has are skipped, and the 
+        remaining ones are geocoded concurrently, with the geocode cache 
+        answering the ones seen before. All successfully geocoded cities are 
+        then inserted in a single transaction.
+
+        Parameters
+        ----------
+        user_id : int
+            The unique identifier of the user.
+        city_names : list of str
+            The names of the cities to add.
+        api_key : str
+            The API key used for the geocoding service.
+        max_parallelism : int, optional
+            The maximum number of geocoding calls in flight at once.
+        deadline : float, optional
+            The overall time budget for geocoding, in seconds.
+
+        Returns
+        -------
+        list of dict
+            One item per requested name, in request order, with ``city_name`` 
+            and ``status``: ``"added"``, ``"exists"`` if it was already a 
+            favorite, ``"duplicate"`` if it repeats an earlier name in the 
+            request, or ``"error"`` with an ``error`` message if it could not 
+            be geocoded.
+        """
+        items = []
+        seen = set()
+        tasks = {}  # Structure: {city_name: args for get_city_coordinates}
+        for city_name in city_names:
+            item = {"city_name": city_name}
+            normalized = normalize_city_name(city_name)
+            if normalized in seen:
+                item["status"] = "duplicate"
+            elif self.store.get(user_id, city_name) is not None:
+                item["status"] = "exists"
+            else:
+                tasks[city_name] = (city_name, api_key)
+            seen.add(normalized)
+            items.append(item)
+
+        coordinates, errors = fan_out(self.get_city_coordinates, tasks, max_parallelism, deadline)
+
+        new_favorites = [(city_name, lat, lon) for city_name, (lat, lon) in coordinates.items()]
+        added = dict(zip(coordinates, self.store.add_many(user_id, new_favorites))) if new_favorites else {}
+        self.tiles.add_many([(lat, lon) for city_name, lat, lon in new_favorites if added[city_name]])
+
+        for item in items:
+            city_name = item["city_name"]
+            if "status" in item:
+                continue
+            if city_name in errors:
+                item.update(status="error", error=errors[city_name])
+            else:
+                # A concurrent request may have added the city after it was checked
+                item["status"] = "added" if added[city_name] else "exists"
+
+        logger.info("Bulk added %d of %d cities to favorites for user ID %d.",
+                    sum(added.values()), len(items), user_id)
+        return items
+
     def remove_city(self, user_id: int, city_name: str):
-        """Remove a city from the user's favorites in memory.
+        """Remove a city from the user's favorites.
 
         This method removes a city from the user's list of favorite cities 
         if it exists. If the city is not found, it raises an error.
@@ -66,14 +194,9 @@ class FavoriteListModel:
         ValueError
             If the city is not found in the user's list of favorites.
         """
-        if user_id not in self.favorites or not any(fav["city_name"] == city_name for fav in self.favorites[user_id]):
+        if not self.store.remove(user_id, city_name):
             logger.error("City %s not found in favorites for user ID %d.", city_name, user_id)
             raise ValueError(f"City {city_name} is not in favorites.")
-
-        # Remove the city from the favorites
-        self.favorites[user_id] = [
-            fav for fav in self.favorites[user_id] if fav["city_name"] != city_name
-        ]
         logger.info("City %s removed from favorites for user ID %d.", city_name, user_id)
 
     def get_all_favorites(self, user_id: int):
@@ -94,8 +217,8 @@ class FavoriteListModel:
             of a favorite city (e.g., city name, latitude, longitude).
 
         """
-        favorites = self.favorites.get(user_id, [])
-        logger.info("Retrieved favorites for user ID %d: %s", user_id, favorites)
+        favorites = [favorite.to_dict() for favorite in self.store.get_all(user_id)]
+        logger.info("Retrieved %d favorites for user ID %d.", len(favorites), user_id)
         return favorites
 
     def _make_api_call(self, endpoint: str, params: dict, api_key: str) -> dict:
@@ -103,7 +226,8 @@ class FavoriteListModel:
 
         This method constructs and executes an API request to the specified endpoint 
         with the provided parameters and API key. It handles errors gracefully and 
-        logs the results of the API call.
+        logs the results of the API call. Concurrent calls with the same URL and 
+        parameters share a single upstream request and its result or error.
 
         Parameters
         ----------
@@ -124,26 +248,107 @@ class FavoriteListModel:
         RuntimeError
             If the API call fails (e.g., network issues, invalid API key, or non-200 HTTP status).
         """
-        base_url = "https://api.openweathermap.org/data/2.5"
-        url = f"{base_url}/{endpoint}"
+        url = self.transport.api_url(endpoint)
         params["appid"] = api_key
 
-        try:
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            logger.info("API call to %s successful: %s", endpoint, data)
+        def call():
+            try:
+                with track_upstream(endpoint):
+                    data = self.transport.get_json(url, params)
+                logger.info("API call to %s successful.", endpoint)
+                return data
+            except TransportError as e:
+                logger.error("API call failed: %s", e)
+                raise RuntimeError(f"API call failed: {e}")
+
+        return self.single_flight.do((url, tuple(sorted(params.items()))), call)
+
+    def _fetch(self, endpoint: str, latitude: float, longitude: float, api_key: str) -> dict:
+        """Fetch an endpoint for a location, serving it from the response cache when possible.
+
+        A stale cached response is returned immediately and refreshed in the 
+        background, so only a location that is not cached at all waits for 
+        the upstream call.
+
+        Parameters
+        ----------
+        endpoint : str
+            The API endpoint to be called (e.g., 'weather', 'forecast').
+        latitude : float
+            The latitude of the location.
+        longitude : float
+            The longitude of the location.
+        api_key : str
+            The API key required to authenticate the request.
+
+        Returns
+        -------
+        dict
+            The parsed JSON response, possibly shared with other callers.
+        """
+        data, fresh = self.response_cache.lookup(endpoint, latitude, longitude)
+        if data is not None:
+            if fresh:
+                logger.debug("Response cache hit for %s at (%s, %s).", endpoint, latitude, longitude)
+            else:
+                logger.info("Serving stale %s at (%s, %s) while revalidating.", endpoint, latitude, longitude)
+                self._revalidate(endpoint, latitude, longitude, api_key)
             return data
-        except requests.exceptions.RequestException as e:
-            logger.error("API call failed: %s", e)
-            raise RuntimeError(f"API call failed: {e}")
+
+        return self.refresh(endpoint, latitude, longitude, api_key)
+
+    def refresh(self, endpoint: str, latitude: float, longitude: float, api_key: str) -> dict:
+        """Fetch an endpoint for a location upstream and store it in the response cache.
+
+        Unlike ``_fetch`` this ignores any cached response; it is used to 
+        revalidate stale entries and by the background refresher.
+
+        Returns
+        -------
+        dict or ColumnarForecast
+            The freshly fetched response, decoded as in ``RESPONSE_DECODERS``.
+
+        Raises
+        ------
+        RuntimeError
+            If the API call fails.
+        """
+        def call():
+            data = self._make_api_call(endpoint, {"lat": latitude, "lon": longitude}, api_key)
+            if endpoint in RESPONSE_DECODERS:
+                data = RESPONSE_DECODERS[endpoint](data)
+            self.response_cache.set(endpoint, latitude, longitude, data)
+            return data
+
+        # Nearby favorites in the same grid cell share one upstream call, made for the first caller's coordinates
+        return self.single_flight.do(self.response_cache.make_key(endpoint, latitude, longitude), call)
+
+    def _revalidate(self, endpoint: str, latitude: float, longitude: float, api_key: str):
+        """Refresh a stale response on the shared worker pool, at most once at a time per key."""
+        key = self.response_cache.make_key(endpoint, latitude, longitude)
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def revalidate():
+            try:
+                self.refresh(endpoint, latitude, longitude, api_key)
+            except RuntimeError as e:
+                logger.warning("Revalidation of %s at (%s, %s) failed: %s", endpoint, latitude, longitude, e)
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        get_executor().submit(revalidate)
     
     def _make_geo_api_call(self, city_name: str, api_key: str) -> list:
         """Helper function to make API calls to the geocoding endpoint.
 
         This method queries the geocoding API to retrieve location details (e.g., 
         latitude and longitude) for a given city. It returns the API response as 
-        a list of matching locations.
+        a list of matching locations. Concurrent lookups of the same city share 
+        a single upstream request.
 
         Parameters
         ----------
@@ -164,29 +369,31 @@ class FavoriteListModel:
             If the geocoding API call fails (e.g., network issues, invalid API key, 
             or non-200 HTTP status).
         """
-        base_url = "http://api.openweathermap.org/geo/1.0"
-        url = f"{base_url}/direct"
+        url = self.transport.geo_url("direct")
         params = {
             "q": city_name,
             "limit": 1,
             "appid": api_key
         }
 
-        try:
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            logger.info("Geocoding API call successful for city %s: %s", city_name, data)
-            return data
-        except requests.exceptions.RequestException as e:
-            logger.error("Geocoding API call failed: %s", e)
-            raise RuntimeError(f"Geocoding API call failed: {e}")
+        def call():
+            try:
+                with track_upstream("geocoding"):
+                    data = self.transport.get_json(url, params)
+                logger.info("Geocoding API call successful for city %s: %d results.", city_name, len(data))
+                return data
+            except TransportError as e:
+                logger.error("Geocoding API call failed: %s", e)
+                raise RuntimeError(f"Geocoding API call failed: {e}")
+
+        return self.single_flight.do((url, tuple(sorted(params.items()))), call)
 
     def get_city_coordinates(self, city_name: str, api_key: str):
         """Get the latitude and longitude for a given city using the geocoding API.
 
         This method retrieves the geographical coordinates (latitude and longitude) 
-        for a given city name by making a call to the geocoding API.
+        for a given city name. The geocode cache is consulted first, and the 
+        geocoding API is only called (and its answer cached) on a miss.
 
         Parameters
         ----------
@@ -208,6 +415,11 @@ class FavoriteListModel:
         ValueError
             If the returned data does not include latitude or longitude.
         """
+        cached = self.geocode_cache.get(city_name)
+        if cached is not None:
+            logger.debug("Geocode cache hit for city %s.", city_name)
+            return cached
+
         data = self._make_geo_api_call(city_name, api_key)
         if not data:
             logger.error("No coordinates found for city %s.", city_name)
@@ -217,9 +429,46 @@ class FavoriteListModel:
         if lat is None or lon is None:
             logger.error("Incomplete data returned for city %s.", city_name)
             raise ValueError(f"Incomplete coordinate data for city {city_name}.")
+        self.geocode_cache.set(city_name, lat, lon)
         return lat, lon
 
-    def get_weather(self, user_id: int, city_name: str, api_key: str):
+    def get_cache_validator(self, endpoint: str, user_id: int, city_name: str = None, variant=None):
+        """Return HTTP validators for the cached responses behind a read.
+
+        No upstream call is made and the cache statistics are not affected, 
+        so routes can answer conditional requests before doing any work.
+
+        Parameters
+        ----------
+        endpoint : str
+            The API endpoint (e.g., 'weather', 'forecast').
+        user_id : int
+            The unique identifier of the user.
+        city_name : str, optional
+            A favorite city. If omitted, all of the user's favorites are covered.
+        variant : hashable, optional
+            What else selects the response body; see ``CacheValidator.from_entries``.
+
+        Returns
+        -------
+        CacheValidator or None
+            None if any of the responses is not cached or carries no timestamp.
+
+        Raises
+        ------
+        ValueError
+            If ``city_name`` is given and is not in the user's favorites.
+        """
+        favorites = [self._get_favorite(user_id, city_name)] if city_name is not None else self.store.get_all(user_id)
+        entries = []
+        for favorite in favorites:
+            cached = self.response_cache.peek(endpoint, favorite.latitude, favorite.longitude)
+            if cached is None:
+                return None
+            entries.append((favorite.city_name,) + cached)
+        return CacheValidator.from_entries(endpoint, entries, variant)
+
+    def get_weather(self, user_id: int, city_name: str, api_key: str, fields=None):
         """Fetch current weather for a specific city.
 
         This method retrieves the current weather data for a city from the user's 
@@ -234,6 +483,9 @@ class FavoriteListModel:
             The name of the city for which weather data is requested.
         api_key : str
             The API key required to authenticate the weather API request.
+        fields : iterable of str, optional
+            Field names from ``weather_app.utils.columnar.FIELDS``. When given,
+            only ``dt`` and these fields are returned, flattened.
 
         Returns
         -------
@@ -244,25 +496,22 @@ class FavoriteListModel:
         Raises
         ------
         ValueError
-            If the city is not found in the user's list of favorites.
+            If the city is not found in the user's list of favorites or a field is unknown.
         """
-        favorites = self.favorites.get(user_id, [])
-        for favorite in favorites:
-            if favorite["city_name"] == city_name:
-                return self._make_api_call(
-                    "weather",
-                    {"lat": favorite["latitude"], "lon": favorite["longitude"]},
-                    api_key
-                )
-
-        logger.error("City %s not found in favorites for user ID %d.", city_name, user_id)
-        raise ValueError(f"City {city_name} is not in favorites.")
-
-    def get_all_weather(self, user_id: int, api_key: str):
+        if fields is not None:
+            fields = validate_fields(fields)
+        favorite = self._get_favorite(user_id, city_name)
+        weather_data = self._fetch("weather", favorite.latitude, favorite.longitude, api_key)
+        return weather_data if fields is None else project_weather(weather_data, fields)
+
+    def get_all_weather(self, user_id: int, api_key: str, max_parallelism: int = None,
+                        deadline: float = None):
         """Fetch weather data for all favorite cities of a user.
 
         This method retrieves the current weather data for all cities in the 
-        user's list of favorite cities using the OpenWeatherMap API.
+        user's list of favorite cities using the OpenWeatherMap API. Cities are 
+        fetched concurrently; cities that fail or miss the deadline are logged 
+        and left out of the result.
 
         Parameters
         ----------
@@ -270,6 +519,10 @@ class FavoriteListModel:
             The unique identifier of the user.
         api_key : str
             The API key required to authenticate the weather API requests.
+        max_parallelism : int, optional
+            The maximum number of cities fetched at once.
+        deadline : float, optional
+            The overall time budget for the call, in seconds.
 
         Returns
         -------
@@ -279,25 +532,126 @@ class FavoriteListModel:
             information such as temperature, humidity, and weather conditions.
 
         """
-        favorites = self.favorites.get(user_id, [])
-        weather_data = {}
+        weather_data, errors = self.get_all_weather_partial(user_id, api_key, max_parallelism, deadline)
+        for city_name, error in errors.items():
+            logger.error("Failed to retrieve weather for city %s for user ID %d: %s", city_name, user_id, error)
+        return weather_data
 
-        for favorite in favorites:
-            weather_data[favorite["city_name"]] = self._make_api_call(
-                "weather",
-                {"lat": favorite["latitude"], "lon": favorite["longitude"]},
-                api_key
-            )
+    def get_all_weather_partial(self, user_id: int, api_key: str, max_parallelism: int = None,
+                                deadline: float = None):
+        """Fetch weather for all favorite cities concurrently, reporting per-city errors.
 
-        logger.info("Retrieved weather for all favorites for user ID %d.", user_id)
-        return weather_data
+        Cities are fetched on the shared fan-out pool with at most 
+        ``max_parallelism`` requests in flight, so the call takes about as long 
+        as the slowest city rather than the sum of all of them.
+
+        Parameters
+        ----------
+        user_id : int
+            The unique identifier of the user.
+        api_key : str
+            The API key required to authenticate the weather API requests.
+        max_parallelism : int, optional
+            The maximum number of cities fetched at once. Defaults to 
+            ``FANOUT_MAX_PARALLELISM``.
+        deadline : float, optional
+            The overall time budget for the call, in seconds. Defaults to 
+            ``FANOUT_DEADLINE``.
+
+        Returns
+        -------
+        tuple
+            ``(weather_data, errors)``: weather keyed by city name for the cities 
+            that succeeded, and an error message keyed by city name for the 
+            cities that failed or timed out.
+        """
+        favorites = self.store.get_all(user_id)
+        tasks = {
+            favorite.city_name: ("weather", favorite.latitude, favorite.longitude, api_key)
+            for favorite in favorites
+        }
+
+        weather_data, errors = fan_out(self._fetch, tasks, max_parallelism, deadline)
+
+        logger.info("Retrieved weather for %d of %d favorites for user ID %d.",
+                    len(weather_data), len(tasks), user_id)
+        return weather_data, errors
     
-    def get_weather_map(self, user_id: int, city_name: str, criteria: str, api_key: str) -> dict:
+    def get_weather_batch(self, pairs: list, api_key: str, max_parallelism: int = None,
+                          deadline: float = None) -> list:
+        """Fetch current weather for many ``(user_id, city_name)`` pairs at once.
+
+        Pairs are resolved to their favorites' coordinates and collapsed to 
+        unique locations (as the response cache rounds them), so a city 
+        favorited by many of the requested users is fetched only once. The 
+        unique locations are fetched concurrently and the results fanned back 
+        out to every pair.
+
+        Parameters
+        ----------
+        pairs : list of tuple
+            The ``(user_id, city_name)`` pairs to fetch.
+        api_key : str
+            The API key required to authenticate the weather API requests.
+        max_parallelism : int, optional
+            The maximum number of locations fetched at once.
+        deadline : float, optional
+            The overall time budget for the call, in seconds.
+
+        Returns
+        -------
+        list of dict
+            One item per pair, in request order, with ``user_id``, 
+            ``city_name`` and ``status``: ``"ok"`` with the ``weather``, 
+            ``"not_found"`` if the city is not in the user's favorites, or 
+            ``"error"`` with an ``error`` message if the upstream call failed.
+        """
+        items = []
+        keys = []  # The location key of each item, or None if the pair is not a favorite
+        tasks = {}  # Structure: {location key: args for _fetch}
+        for user_id, city_name in pairs:
+            item = {"user_id": user_id, "city_name": city_name}
+            favorite = self.store.get(user_id, city_name)
+            key = None
+            if favorite is None:
+                item.update(status="not_found", error=f"City {city_name} is not in favorites.")
+            else:
+                key = self.response_cache.make_key("weather", favorite.latitude, favorite.longitude)
+                tasks.setdefault(key, ("weather", favorite.latitude, favorite.longitude, api_key))
+            items.append(item)
+            keys.append(key)
+
+        results, errors = fan_out(self._fetch, tasks, max_parallelism, deadline)
+
+        for item, key in zip(items, keys):
+            if key is None:
+                continue
+            if key in results:
+                item.update(status="ok", weather=results[key])
+            else:
+                item.update(status="error", error=errors[key])
+
+        logger.info("Batch weather for %d pairs resolved to %d locations (%d failed).",
+                    len(items), len(tasks), len(errors))
+        return items
+
+    def _layer_for(self, criteria: str) -> str:
+        """Return the tile layer for a weather criterion, raising ValueError if it is not supported."""
+        if criteria not in CRITERIA_TO_LAYER:
+            allowed_criteria = list(CRITERIA_TO_LAYER)
+            logger.error("Invalid criteria %s requested.", criteria)
+            raise ValueError(f"Invalid criteria: {criteria}. Allowed criteria are {allowed_criteria}.")
+        return CRITERIA_TO_LAYER[criteria]
+
+    def get_weather_map(self, user_id: int, city_name: str, criteria: str, zoom: int = DEFAULT_MAP_ZOOM) -> dict:
         """
         Fetch a weather layer tile for a city in the user's favorites based on the given criteria.
 
-        This method retrieves the URL for a weather map tile corresponding to a specific city 
+        This method locates the weather map tile corresponding to a specific city 
         and weather criterion. The tile can be used to display weather conditions visually on a map.
+        Tile coordinates at the precomputed zoom levels are looked up rather than recomputed.
+        No tile URL is built here: the OpenWeatherMap URL carries the API key, so 
+        tiles are only downloaded through ``fetch_tile``.
 
         Parameters
         ----------
@@ -312,8 +666,8 @@ class FavoriteListModel:
             - "sea_level_pressure"
             - "wind_speed"
             - "temperature".
-        api_key : str
-            The API key required to authenticate the request to the weather map service.
+        zoom : int, optional
+            The zoom level of the tile. Defaults to ``DEFAULT_MAP_ZOOM``.
 
         Returns
         -------
@@ -324,60 +678,115 @@ class FavoriteListModel:
             - "zoom": The zoom level used for the tile.
             - "x": The X coordinate of the tile.
             - "y": The Y coordinate of the tile.
-            - "tile_url": The URL to fetch the weather map tile.
         """
-        favorites = self.favorites.get(user_id, [])
-        for favorite in favorites:
-            if favorite["city_name"] == city_name:
-                allowed_criteria = ["clouds", "precipitation", "sea_level_pressure", "wind_speed", "temperature"]
-                if criteria not in allowed_criteria:
-                    logger.error("Invalid criteria %s requested for city %s by user ID %d.", criteria, city_name, user_id)
-                    raise ValueError(f"Invalid criteria: {criteria}. Allowed criteria are {allowed_criteria}.")
-
-                criteria_to_layer = {
-                    "clouds": "clouds_new",
-                    "precipitation": "precipitation_new",
-                    "sea_level_pressure": "pressure_new",
-                    "wind_speed": "wind_new",
-                    "temperature": "temp_new"
-                }
-
-                layer = criteria_to_layer[criteria]
-
-                # Choose a zoom level. This can be adjusted as needed.
-                z = 5
-
-                # Convert latitude/longitude to tile coordinates for the chosen zoom level.
-                import math
-                latitude = favorite["latitude"]
-                longitude = favorite["longitude"]
-                lat_rad = math.radians(latitude)
-                n = 2 ** z  # number of tiles at this zoom level
-
-                x = (longitude + 180.0) / 360.0 * n
-                y = (1.0 - math.log(math.tan(lat_rad) + (1.0 / math.cos(lat_rad))) / math.pi) / 2.0 * n
-
-                # Convert to int and clamp to valid range [0, 2^z - 1]
-                x = int(min(max(x, 0), n - 1))
-                y = int(min(max(y, 0), n - 1))
-
-                tile_url = f"https://tile.openweathermap.org/map/{layer}/{z}/{x}/{y}.png?appid={api_key}"
-
-                logger.info("Weather map tile URL for city %s (user ID %d, %s): %s", city_name, user_id, criteria, tile_url)
-
-                return {
-                    "criteria": criteria,
-                    "layer": layer,
-                    "zoom": z,
-                    "x": x,
-                    "y": y,
-                    "tile_url": tile_url
-                }
-
-        logger.error("City %s not found in favorites for user ID %d.", city_name, user_id)
-        raise ValueError(f"City {city_name} is not in favorites.")
+        favorite = self._get_favorite(user_id, city_name)
+        layer = self._layer_for(criteria)
+
+        x, y = self.tiles.get(favorite.latitude, favorite.longitude, zoom)
+
+        logger.info("Weather map tile for city %s (user ID %d, %s): %s/%d/%d/%d",
+                    city_name, user_id, criteria, layer, zoom, x, y)
+
+        return {
+            "criteria": criteria,
+            "layer": layer,
+            "zoom": zoom,
+            "x": x,
+            "y": y,
+        }
+
+    def get_weather_map_all(self, user_id: int, criteria: str, min_zoom: int = DEFAULT_MAP_ZOOM,
+                            max_zoom: int = None) -> dict:
+        """Return the tiles covering all of a user's favorites for a layer and a range of zoom levels.
+
+        All favorites are projected in one vectorized pass per call, and 
+        favorites that fall in the same tile share one entry.
+
+        Parameters
+        ----------
+        user_id : int
+            The unique identifier of the user.
+        criteria : str
+            The weather criterion for the map layer (see ``get_weather_map``).
+        min_zoom : int, optional
+            The lowest zoom level. Defaults to ``DEFAULT_MAP_ZOOM``.
+        max_zoom : int, optional
+            The highest zoom level. Defaults to ``min_zoom``.
+
+        Returns
+        -------
+        dict
+            ``criteria``, ``layer``, the list of ``zooms`` and the sorted, 
+            deduplicated ``tiles``, each with ``zoom``, ``x`` and ``y``.
+
+        Raises
+        ------
+        ValueError
+            If the criteria or zoom range is invalid.
+        """
+        layer = self._layer_for(criteria)
+        max_zoom = min_zoom if max_zoom is None else max_zoom
+        validate_zoom(min_zoom)
+        validate_zoom(max_zoom)
+        if min_zoom > max_zoom:
+            raise ValueError(f"Invalid zoom range: {min_zoom} is greater than {max_zoom}.")
+
+        favorites = self.store.get_all(user_id)
+        zooms = list(range(min_zoom, max_zoom + 1))
+        tiles = covering_tiles([favorite.latitude for favorite in favorites],
+                               [favorite.longitude for favorite in favorites], zooms)
+
+        logger.info("Computed %d tiles covering %d favorites for user ID %d at zooms %d-%d.",
+                    len(tiles), len(favorites), user_id, min_zoom, max_zoom)
+        return {
+            "criteria": criteria,
+            "layer": layer,
+            "zooms": zooms,
+            "tiles": [{"zoom": z, "x": x, "y": y} for z, x, y in tiles],
+        }
     
-    def get_forecast(self, user_id: int, city_name: str, api_key: str):
+    def fetch_tile(self, layer: str, z: int, x: int, y: int, api_key: str) -> bytes:
+        """Download a weather map tile image from OpenWeatherMap.
+
+        Parameters
+        ----------
+        layer : str
+            The tile layer, such as ``clouds_new``.
+        z, x, y : int
+            The zoom level and tile coordinates.
+        api_key : str
+            The API key required by the tile service.
+
+        Returns
+        -------
+        bytes
+            The PNG image.
+
+        Raises
+        ------
+        ValueError
+            If the layer is unknown or the tile coordinates are out of range.
+        RuntimeError
+            If the download fails.
+        """
+        if layer not in CRITERIA_TO_LAYER.values():
+            raise ValueError(f"Invalid layer: {layer}. Allowed layers are {list(CRITERIA_TO_LAYER.values())}.")
+        validate_zoom(z)
+        if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Invalid tile: ({x}, {y}) is outside the grid at zoom {z}.")
+
+        url = self.transport.tile_url(layer, z, x, y)
+        try:
+            with track_upstream("tile"):
+                response = self.transport.get(url, {"appid": api_key})
+        except TransportError as e:
+            logger.error("Tile download failed: %s", e)
+            raise RuntimeError(f"Tile download failed: {e}")
+        logger.info("Downloaded tile %s/%d/%d/%d (%d bytes).", layer, z, x, y, len(response.content))
+        return response.content
+
+    def get_forecast(self, user_id: int, city_name: str, api_key: str, fields=None,
+                     start: int = None, end: int = None):
         """Fetch the weather forecast for a specific city.
 
         This method retrieves the weather forecast data for a city from the 
@@ -392,32 +801,30 @@ class FavoriteListModel:
             The name of the city for which the weather forecast is requested.
         api_key : str
             The API key required to authenticate the weather API request.
+        fields : iterable of str, optional
+            Field names from ``weather_app.utils.columnar.FIELDS`` to return.
+        start, end : int, optional
+            Unix timestamps; only forecast entries with ``start <= dt < end`` are returned.
 
         Returns
         -------
         dict
-            The weather forecast data for the specified city as returned by the API. 
-            This includes details like temperature, humidity, precipitation, and other 
-            weather conditions over a specified time period.
+            The weather forecast data for the specified city in the shape returned 
+            by the API. If ``fields``, ``start`` or ``end`` is given, the forecast 
+            is returned in columnar form instead: ``city``, ``dt`` and one list per 
+            field (all fields if ``fields`` is not given).
 
         Raises
         ------
         ValueError
-            If the city is not found in the user's list of favorites.
+            If the city is not found in the user's list of favorites or a field is unknown.
         """
-        favorites = self.favorites.get(user_id, [])
-        for favorite in favorites:
-            if favorite["city_name"] == city_name:
-                forecast_data = self._make_api_call(
-                    "forecast",
-                    {"lat": favorite["latitude"], "lon": favorite["longitude"]},
-                    api_key
-                )
-                logger.info("Retrieved forecast for city %s for user ID %d: %s", city_name, user_id, forecast_data)
-                return forecast_data
-
-        logger.error("City %s not found in favorites for user ID %d.", city_name, user_id)
-        raise ValueError(f"City {city_name} is not in favorites.")
+        if fields is not None:
+            fields = validate_fields(fields)
+        favorite = self._get_favorite(user_id, city_name)
+        forecast = self._fetch("forecast", favorite.latitude, favorite.longitude, api_key)
+        logger.info("Retrieved forecast for city %s for user ID %d: %d entries.", city_name, user_id, len(forecast))
+        return forecast.to_response(fields, start, end)
 
     def get_air_pollution(self, user_id: int, city_name: str, api_key: str):
         """Fetch air pollution data for a city in the user's favorites.
@@ -448,16 +855,7 @@ class FavoriteListModel:
         ValueError
             If the city is not found in the user's list of favorites.
         """
-        favorites = self.favorites.get(user_id, [])
-        for favorite in favorites:
-            if favorite["city_name"] == city_name:
-                air_pollution_data = self._make_api_call(
-                    "air_pollution",
-                    {"lat": favorite["latitude"], "lon": favorite["longitude"]},
-                    api_key
-                )
-                logger.info("Retrieved air pollution data for city %s for user ID %d: %s", city_name, user_id, air_pollution_data)
-                return air_pollution_data
-
-        logger.error("City %s not found in favorites for user ID %d.", city_name, user_id)
-        raise ValueError(f"City {city_name} is not in favorites.")
\ No newline at end of file
+        favorite = self._get_favorite(user_id, city_name)
+        air_pollution_data = self._fetch("air_pollution", favorite.latitude, favorite.longitude, api_key)
+        logger.info("Retrieved air pollution data for city %s for user ID %d.", city_name, user_id)
+        return air_pollution_data
\ No newline at end of file
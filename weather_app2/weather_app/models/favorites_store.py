@@ -0,0 +1,235 @@
+import logging
+import threading
+
+from weather_app.utils.logger import configure_logger
+from weather_app.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class FavoriteCity:
+    """A compact record for one favorite city.
+
+    Uses ``__slots__`` so that each favorite costs a fixed handful of
+    pointers rather than a per-instance dictionary.
+    """
+
+    __slots__ = ("city_name", "latitude", "longitude")
+
+    def __init__(self, city_name: str, latitude: float, longitude: float):
+        self.city_name = city_name
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def to_dict(self) -> dict:
+        """Return the favorite in its JSON shape."""
+        return {"city_name": self.city_name, "latitude": self.latitude, "longitude": self.longitude}
+
+    def __eq__(self, other):
+        if not isinstance(other, FavoriteCity):
+            return NotImplemented
+        return (self.city_name, self.latitude, self.longitude) == (other.city_name, other.latitude, other.longitude)
+
+    def __repr__(self):
+        return f"FavoriteCity({self.city_name!r}, {self.latitude!r}, {self.longitude!r})"
+
+
+class InMemoryFavoritesStore:
+    """Process-local favorites storage.
+
+    Each user's favorites are an insertion-ordered dictionary keyed by city
+    name, so lookups, additions and removals are O(1) regardless of how many
+    favorites the user has. Favorites are lost on restart and not shared
+    between workers. Used by default and in tests.
+    """
+
+    def __init__(self):
+        self._favorites = {}  # Structure: {user_id: {city_name: FavoriteCity}}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, city_name: str):
+        """Return the ``FavoriteCity`` for a user's city, or None if it is not a favorite."""
+        return self._favorites.get(user_id, {}).get(city_name)
+
+    def get_all(self, user_id: int) -> list:
+        """Return the user's ``FavoriteCity`` records in insertion order."""
+        return list(self._favorites.get(user_id, {}).values())
+
+    def add(self, user_id: int, city_name: str, latitude: float, longitude: float) -> bool:
+        """Add a favorite. Returns False if the user already has the city."""
+        return self.add_many(user_id, [(city_name, latitude, longitude)])[0]
+
+    def add_many(self, user_id: int, favorites: list) -> list:
+        """Add several ``(city_name, latitude, longitude)`` favorites at once.
+
+        Returns
+        -------
+        list
+            One boolean per favorite, False where the city was already present.
+        """
+        with self._lock:
+            user_favorites = self._favorites.setdefault(user_id, {})
+            added = []
+            for city_name, latitude, longitude in favorites:
+                is_new = city_name not in user_favorites
+                if is_new:
+                    user_favorites[city_name] = FavoriteCity(city_name, latitude, longitude)
+                added.append(is_new)
+            return added
+
+    def remove(self, user_id: int, city_name: str) -> bool:
+        """Remove a favorite. Returns False if the user does not have the city."""
+        with self._lock:
+            return self._favorites.get(user_id, {}).pop(city_name, None) is not None
+
+    def distinct_locations(self) -> set:
+        """Return the distinct ``(latitude, longitude)`` pairs across all users."""
+        with self._lock:
+            user_favorites = [list(favorites.values()) for favorites in self._favorites.values()]
+        return {(fav.latitude, fav.longitude) for favorites in user_favorites for fav in favorites}
+
+    def snapshot(self) -> dict:
+        """Return every user's favorites as ``{user_id: [favorite dict, ...]}``."""
+        with self._lock:
+            users = list(self._favorites.items())
+        return {user_id: [fav.to_dict() for fav in list(favorites.values())] for user_id, favorites in users}
+
+    def load(self, favorites: dict):
+        """Replace all stored favorites with ``{user_id: [favorite dict, ...]}``."""
+        loaded = {
+            user_id: {
+                fav["city_name"]: FavoriteCity(fav["city_name"], fav["latitude"], fav["longitude"])
+                for fav in favs
+            }
+            for user_id, favs in favorites.items()
+        }
+        with self._lock:
+            self._favorites = loaded
+
+
+class SqliteFavoritesStore:
+    """Favorites storage in the application's SQLite database.
+
+    Favorites are rows of a ``favorites`` table with a unique index on
+    ``(user_id, city_name)``. Every lookup is an indexed query, the data
+    survives restarts and is shared by all workers, and the process no
+    longer holds the whole user base in memory. Statements are fixed SQL
+    strings, so sqlite3's statement cache reuses their prepared form.
+    """
+
+    _CREATE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS favorites ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "user_id INTEGER NOT NULL, "
+        "city_name TEXT NOT NULL, "
+        "latitude REAL NOT NULL, "
+        "longitude REAL NOT NULL)"
+    )
+    _CREATE_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_favorites_user_city ON favorites (user_id, city_name)"
+    _SELECT_ONE = "SELECT city_name, latitude, longitude FROM favorites WHERE user_id = ? AND city_name = ?"
+    _SELECT_USER = "SELECT city_name, latitude, longitude FROM favorites WHERE user_id = ? ORDER BY id"
+    _INSERT = "INSERT OR IGNORE INTO favorites (user_id, city_name, latitude, longitude) VALUES (?, ?, ?, ?)"
+    _DELETE = "DELETE FROM favorites WHERE user_id = ? AND city_name = ?"
+
+    def __init__(self):
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_table(self):
+        """Create the table and its index on first use."""
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            with get_db_connection() as conn:
+                conn.execute(self._CREATE_TABLE)
+                conn.execute(self._CREATE_INDEX)
+                conn.commit()
+            self._table_ready = True
+
+    def get(self, user_id: int, city_name: str):
+        """Return the ``FavoriteCity`` for a user's city, or None if it is not a favorite."""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            row = conn.execute(self._SELECT_ONE, (user_id, city_name)).fetchone()
+        return FavoriteCity(*row) if row else None
+
+    def get_all(self, user_id: int) -> list:
+        """Return the user's ``FavoriteCity`` records in insertion order."""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            rows = conn.execute(self._SELECT_USER, (user_id,)).fetchall()
+        return [FavoriteCity(*row) for row in rows]
+
+    def add(self, user_id: int, city_name: str, latitude: float, longitude: float) -> bool:
+        """Add a favorite. Returns False if the user already has the city."""
+        return self.add_many(user_id, [(city_name, latitude, longitude)])[0]
+
+    def add_many(self, user_id: int, favorites: list) -> list:
+        """Add several ``(city_name, latitude, longitude)`` favorites in one transaction.
+
+        Returns
+        -------
+        list
+            One boolean per favorite, False where the city was already present.
+        """
+        self._ensure_table()
+        with get_db_connection() as conn:
+            try:
+                added = [
+                    conn.execute(self._INSERT, (user_id, city_name, latitude, longitude)).rowcount == 1
+                    for city_name, latitude, longitude in favorites
+                ]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return added
+
+    def remove(self, user_id: int, city_name: str) -> bool:
+        """Remove a favorite. Returns False if the user does not have the city."""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            removed = conn.execute(self._DELETE, (user_id, city_name)).rowcount == 1
+            conn.commit()
+        return removed
+
+    def distinct_locations(self) -> set:
+        """Return the distinct ``(latitude, longitude)`` pairs across all users."""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            rows = conn.execute("SELECT DISTINCT latitude, longitude FROM favorites").fetchall()
+        return {(row[0], row[1]) for row in rows}
+
+    def snapshot(self) -> dict:
+        """Return every user's favorites as ``{user_id: [favorite dict, ...]}``."""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                "SELECT user_id, city_name, latitude, longitude FROM favorites ORDER BY id"
+            ).fetchall()
+        snapshot = {}
+        for row in rows:
+            snapshot.setdefault(row[0], []).append(FavoriteCity(*row[1:]).to_dict())
+        return snapshot
+
+    def load(self, favorites: dict):
+        """Replace all stored favorites with ``{user_id: [favorite dict, ...]}``."""
+        self._ensure_table()
+        rows = [
+            (user_id, fav["city_name"], fav["latitude"], fav["longitude"])
+            for user_id, favs in favorites.items()
+            for fav in favs
+        ]
+        with get_db_connection() as conn:
+            try:
+                conn.execute("DELETE FROM favorites")
+                conn.executemany(self._INSERT, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        logger.info("Loaded %d favorites for %d users.", len(rows), len(favorites))
@@ -1,13 +1,34 @@
 import logging
 import os
-from werkzeug.security import generate_password_hash, check_password_hash
+from weather_app.utils.cache import TTLCache
+from weather_app.utils.password_hasher import PasswordHasher
+from weather_app.utils.session_tokens import SessionManager
 from weather_app.utils.sql_utils import get_db_connection
 from weather_app.utils.logger import configure_logger
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
+USER_ID_CACHE_SIZE = int(os.getenv("USER_ID_CACHE_SIZE", "10000"))  # Usernames whose id is kept in memory
+
 class UserModel:
+    def __init__(self, hasher: PasswordHasher = None, sessions: SessionManager = None):
+        """Initialize the model.
+
+        Parameters
+        ----------
+        hasher : PasswordHasher, optional
+            Hashes and verifies passwords off the request thread. Defaults to 
+            a process pool sized by ``PASSWORD_HASH_WORKERS``.
+        sessions : SessionManager, optional
+            Issues and verifies session tokens. Defaults to a manager 
+            configured from the ``SESSION_*`` environment variables.
+        """
+        self.hasher = hasher if hasher is not None else PasswordHasher()
+        self.sessions = sessions if sessions is not None else SessionManager()
+        # An account's id never changes; the cache only bounds how many are held
+        self._user_ids = TTLCache(maxsize=USER_ID_CACHE_SIZE, ttl=3600.0)
+
     def create_account(self, username: str, password: str):
         """Create a new user account with a hashed password.
 
@@ -27,8 +48,10 @@ class UserModel:
         ------
         ValueError
             If account creation fails due to a database error or any other reason.
+        RuntimeError
+            If the password hashing queue is full.
         """
-        hashed_password = generate_password_hash(password)
+        hashed_password = self.hasher.hash(password)
         with get_db_connection() as conn:
             cursor = conn.cursor()
             try:
@@ -45,7 +68,9 @@ class UserModel:
 
         This method authenticates a user by verifying the provided password 
         against the hashed password stored in the database for the given username. 
-        If the credentials match, the user is logged in successfully.
+        If the credentials match, the user is logged in successfully. A stored 
+        hash made with outdated parameters is transparently replaced by one 
+        using the configured work factor.
 
         Parameters
         ----------
@@ -58,14 +83,21 @@ class UserModel:
         -------
         bool
             True if the login is successful (credentials match); otherwise, False.
+
+        Raises
+        ------
+        RuntimeError
+            If the password hashing queue is full.
         """
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT hashed_password FROM users WHERE username = ?", (username,))
             row = cursor.fetchone()
 
-        if row and check_password_hash(row[0], password):
+        if row and self.hasher.verify(row[0], password):
             logger.info("User %s logged in successfully", username)
+            if self.hasher.needs_rehash(row[0]):
+                self._rehash_password(username, row[0], password)
             return True
 
         logger.error("Login failed for user %s", username)
@@ -75,8 +107,8 @@ class UserModel:
         """Update the user's password.
 
         This method updates the password for a specified user by hashing the 
-        new password and storing it in the database. The change is logged for 
-        auditing purposes.
+        new password and storing it in the database. All of the user's 
+        existing sessions are revoked. The change is logged for auditing purposes.
 
         Parameters
         ----------
@@ -85,11 +117,116 @@ class UserModel:
         new_password : str
             The new plaintext password to replace the old password. It will be 
             securely hashed before being stored.
+
+        Raises
+        ------
+        ValueError
+            If there is no such user or the update fails due to a database error.
+        RuntimeError
+            If the password hashing queue is full.
         """
-        hashed_password = generate_password_hash(new_password)
+        hashed_password = self.hasher.hash(new_password)
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("UPDATE users SET hashed_password = ? WHERE username = ?",
-                           (hashed_password, username))
-            conn.commit()
+            try:
+                cursor.execute("UPDATE users SET hashed_password = ? WHERE username = ?",
+                               (hashed_password, username))
+                conn.commit()
+            except Exception as e:
+                logger.error("Failed to update password for user %s: %s", username, e)
+                raise ValueError(f"Failed to update password: {e}")
+            if cursor.rowcount == 0:
+                logger.error("Password update for unknown user %s", username)
+                raise ValueError(f"User {username} not found")
             logger.info("Password updated for user %s", username)
+        self.sessions.revoke_all(username)
+
+    def get_user_id(self, username: str):
+        """Return the id of the account ``username``.
+
+        Ids are cached in memory, so the authorization check on every request 
+        does not cost a query.
+
+        Parameters
+        ----------
+        username : str
+            The username of the account.
+
+        Returns
+        -------
+        int or None
+            The user id, or None if there is no such account.
+        """
+        user_id = self._user_ids.get(username)
+        if user_id is None:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            user_id = row[0]
+            self._user_ids.set(username, user_id)
+        return user_id
+
+    def create_session(self, username: str) -> str:
+        """Issue a signed, expiring session token for a logged-in user.
+
+        Parameters
+        ----------
+        username : str
+            The username the session belongs to.
+
+        Returns
+        -------
+        str
+            The session token to send as ``Authorization: Bearer <token>``.
+        """
+        return self.sessions.issue(username)
+
+    def authenticate_token(self, token: str):
+        """Return the username for a session token.
+
+        Verification checks the signature and expiry and then the in-memory 
+        session cache, so it does not cost a password hash.
+
+        Parameters
+        ----------
+        token : str
+            The session token presented by the client.
+
+        Returns
+        -------
+        str or None
+            The username, or None if the token is invalid, expired or revoked.
+        """
+        return self.sessions.verify(token)
+
+    def revoke_session(self, token: str) -> bool:
+        """Revoke a session token, e.g. on logout.
+
+        Parameters
+        ----------
+        token : str
+            The session token to revoke.
+
+        Returns
+        -------
+        bool
+            True if a session was revoked, False if the token was not valid.
+        """
+        return self.sessions.revoke(token)
+
+    def _rehash_password(self, username: str, old_hash: str, password: str):
+        """Replace an outdated password hash after a successful login.
+
+        The update only applies if the stored hash is still ``old_hash``, so a 
+        concurrent password change is never overwritten.
+        """
+        new_hash = self.hasher.hash(password)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET hashed_password = ? WHERE username = ? AND hashed_password = ?",
+                           (new_hash, username, old_hash))
+            conn.commit()
+        logger.info("Password hash upgraded for user %s", username)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+
+import httpx
+
+from weather_app.utils.http_transport import (
+    HTTP_CONNECT_TIMEOUT, HTTP_MAX_RETRIES, HTTP_POOL_MAXSIZE, HTTP_READ_TIMEOUT, HTTP_RETRY_BACKOFF,
+    OWM_API_BASE_URL, OWM_GEO_BASE_URL, OWM_TILE_BASE_URL,
+    HttpTransport, StubBackend, TransportError, TransportResponse,
+)
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Upper bound on upstream requests in flight from one event loop.
+ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "500"))
+
+
+class HttpxBackend:
+    """Non-blocking backend built on a pooled ``httpx.AsyncClient``.
+
+    The client is created lazily inside the event loop that first uses it,
+    and the backend must keep being used from that loop.
+
+    Parameters
+    ----------
+    max_connections : int
+        The maximum number of open connections.
+    max_keepalive_connections : int
+        The maximum number of idle keep-alive connections.
+    """
+
+    def __init__(self, max_connections: int = ASYNC_MAX_CONCURRENCY,
+                 max_keepalive_connections: int = HTTP_POOL_MAXSIZE):
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections)
+        self._client = None
+
+    async def get(self, url: str, params: dict, timeout: tuple) -> TransportResponse:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits)
+        try:
+            response = await self._client.get(
+                url, params=params, timeout=httpx.Timeout(timeout[1], connect=timeout[0])
+            )
+        except httpx.TimeoutException as e:
+            raise TransportError(str(e) or "Request timed out", timeout=True) from e
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class AsyncStubBackend:
+    """Asynchronous counterpart of ``StubBackend`` for tests and benchmarks.
+
+    Latency is simulated with ``asyncio.sleep`` so that concurrent requests
+    overlap instead of blocking the loop.
+    """
+
+    def __init__(self, routes: dict = None, latency: float = 0.0):
+        self._stub = StubBackend(routes)
+        self.latency = latency
+
+    @property
+    def calls(self) -> list:
+        return self._stub.calls
+
+    async def get(self, url: str, params: dict, timeout: tuple) -> TransportResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._stub.get(url, params, timeout)
+
+    async def close(self):
+        pass
+
+
+class AsyncHttpTransport(HttpTransport):
+    """Non-blocking HTTP transport for OpenWeatherMap calls.
+
+    Shares the URL building and retry policy of ``HttpTransport`` but awaits
+    its backend, and caps the number of requests in flight with a semaphore
+    so that thousands of concurrent callers cannot open thousands of sockets.
+
+    Parameters
+    ----------
+    backend : object, optional
+        An object with ``async get(url, params, timeout)`` and ``async close()``.
+        Defaults to an ``HttpxBackend``.
+    max_concurrency : int
+        The maximum number of upstream requests in flight at once.
+    """
+
+    def __init__(self, backend=None, api_base_url: str = OWM_API_BASE_URL, geo_base_url: str = OWM_GEO_BASE_URL,
+                 tile_base_url: str = OWM_TILE_BASE_URL, connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT, max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_factor: float = HTTP_RETRY_BACKOFF, max_concurrency: int = ASYNC_MAX_CONCURRENCY):
+        super().__init__(
+            backend=backend if backend is not None else HttpxBackend(max_connections=max_concurrency),
+            api_base_url=api_base_url, geo_base_url=geo_base_url, tile_base_url=tile_base_url,
+            connect_timeout=connect_timeout, read_timeout=read_timeout, max_retries=max_retries,
+            backoff_factor=backoff_factor,
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def get(self, url: str, params: dict = None) -> TransportResponse:
+        """Perform a GET without blocking the event loop, retrying transient failures.
+
+        Raises
+        ------
+        TransportError
+            If the last attempt failed or returned an error status.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.backend.get(url, params, self.timeout)
+                if response.status_code < 400:
+                    return response
+                error = TransportError(f"{response.status_code} Error for url: {url}",
+                                       status_code=response.status_code)
+                retryable = response.status_code in self.RETRY_STATUSES
+            except TransportError as e:
+                error = e
+                retryable = True
+
+            if not retryable or attempt >= self.max_retries:
+                raise error
+            delay = self.backoff_factor * (2 ** attempt)
+            logger.warning("Retrying %s in %.2fs after error: %s", url, delay, error)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get_json(self, url: str, params: dict = None):
+        """Perform a GET and decode the JSON body.
+
+        Raises
+        ------
+        TransportError
+            If the request fails or the body is not valid JSON.
+        """
+        response = await self.get(url, params)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise TransportError(f"Invalid JSON from {url}: {e}", status_code=response.status_code) from e
+
+    async def close(self):
+        """Release the backend's pooled connections."""
+        await self.backend.close()
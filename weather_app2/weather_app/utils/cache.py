@@ -0,0 +1,115 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+
+    Entries are kept in access order; once ``maxsize`` is exceeded the least
+    recently used entry is evicted. Expired entries are dropped lazily when
+    they are looked up or when they reach the LRU end of the cache.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries held in memory.
+    ttl : float
+        The default number of seconds an entry stays valid.
+    clock : callable, optional
+        A zero-argument function returning the current time in seconds.
+        Defaults to ``time.monotonic``; tests may inject a fake clock.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer.")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # Structure: {key: (expires_at, value)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` or ``default`` if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        """Return ``(seconds_left, value)`` for ``key``, or None if absent or expired.
+
+        Unlike ``get`` this neither refreshes the entry's LRU position nor
+        counts as a hit or miss, so background inspection does not skew the stats.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - self._clock()
+        return (remaining, entry[1]) if remaining > 0 else None
+
+    def set(self, key, value, ttl: float = None):
+        """Store ``value`` under ``key`` for ``ttl`` seconds (defaults to the cache TTL)."""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key) -> bool:
+        """Remove ``key`` from the cache. Returns True if an entry was removed."""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_where(self, predicate) -> int:
+        """Remove every entry whose key satisfies ``predicate``.
+
+        Returns
+        -------
+        int
+            The number of entries removed.
+        """
+        with self._lock:
+            doomed = [key for key in self._data if predicate(key)]
+            for key in doomed:
+                del self._data[key]
+            return len(doomed)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
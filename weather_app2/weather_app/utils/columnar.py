@@ -0,0 +1,236 @@
+from datetime import datetime, timezone
+import hashlib
+import time
+
+import numpy as np
+
+
+# Numeric fields and where they live in an OpenWeatherMap entry. Rain and snow
+# are 3-hour totals in forecasts and 1-hour totals in current weather.
+NUMERIC_FIELDS = {
+    "temp": ("main", "temp"),
+    "feels_like": ("main", "feels_like"),
+    "temp_min": ("main", "temp_min"),
+    "temp_max": ("main", "temp_max"),
+    "pressure": ("main", "pressure"),
+    "sea_level": ("main", "sea_level"),
+    "grnd_level": ("main", "grnd_level"),
+    "humidity": ("main", "humidity"),
+    "temp_kf": ("main", "temp_kf"),
+    "wind_speed": ("wind", "speed"),
+    "wind_deg": ("wind", "deg"),
+    "wind_gust": ("wind", "gust"),
+    "clouds": ("clouds", "all"),
+    "visibility": ("visibility",),
+    "pop": ("pop",),
+    "rain": ("rain", "3h"),
+    "snow": ("snow", "3h"),
+}
+# Fields that are whole numbers upstream and are returned as integers.
+INTEGER_FIELDS = frozenset({"pressure", "sea_level", "grnd_level", "humidity", "wind_deg", "clouds", "visibility"})
+# Fields taken from the first ``weather`` condition of an entry.
+TEXT_FIELDS = {
+    "weather_id": "id",
+    "weather_main": "main",
+    "weather_description": "description",
+    "weather_icon": "icon",
+}
+# Text fields stored as codes into a small vocabulary, and where they live in an entry.
+CODED_FIELDS = {"pod": ("sys", "pod")}
+FIELDS = tuple(NUMERIC_FIELDS) + tuple(TEXT_FIELDS) + tuple(CODED_FIELDS)
+CURRENT_WEATHER_PATHS = dict(NUMERIC_FIELDS, rain=("rain", "1h"), snow=("snow", "1h"))
+
+
+def _lookup(entry: dict, path: tuple):
+    for key in path:
+        if not isinstance(entry, dict):
+            return None
+        entry = entry.get(key)
+    return entry
+
+
+def _number(value, field: str):
+    """Convert a stored float32 back to the value OpenWeatherMap sent."""
+    if np.isnan(value):
+        return None
+    # float32 keeps about 7 significant digits; OpenWeatherMap sends at most 2 decimals
+    return int(value) if field in INTEGER_FIELDS else round(float(value), 4)
+
+
+def validate_fields(fields) -> tuple:
+    """Return ``fields`` as a tuple, raising ValueError for unknown names."""
+    fields = tuple(fields)
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Invalid fields: {', '.join(unknown)}. Allowed fields are {list(FIELDS)}.")
+    return fields
+
+
+def project_weather(payload: dict, fields) -> dict:
+    """Flatten a current weather response to ``dt`` plus the requested fields."""
+    fields = validate_fields(fields)
+    projected = {"dt": payload.get("dt")}
+    condition = (payload.get("weather") or [{}])[0]
+    for field in fields:
+        if field in TEXT_FIELDS:
+            projected[field] = condition.get(TEXT_FIELDS[field])
+        elif field in CODED_FIELDS:
+            projected[field] = _lookup(payload, CODED_FIELDS[field])
+        else:
+            projected[field] = _lookup(payload, CURRENT_WEATHER_PATHS[field])
+    return projected
+
+
+class ColumnarForecast:
+    """A 5-day / 3-hour forecast held as one typed array per field.
+
+    The upstream payload is about 40 nested dictionaries; here every numeric
+    field is a ``float32`` array (NaN where the value is absent), timestamps
+    are an ``int64`` array, and text fields are ``int16`` codes into a small
+    vocabulary. An entry's full list of weather conditions is an ``int16``
+    code into the distinct condition lists of the forecast, of which there
+    are only a handful. That takes a small fraction of the memory, selecting
+    fields or a time window is array slicing, and ``to_owm`` gives back
+    every key of the documented entry shape.
+    """
+
+    __slots__ = ("meta", "dt", "columns", "codes", "vocabulary", "conditions", "condition_sets",
+                 "fetched_at", "fingerprint")
+
+    def __init__(self, meta: dict, dt, columns: dict, codes: dict, vocabulary: list, conditions,
+                 condition_sets: list, fetched_at: float = None):
+        self.meta = meta  # the top-level keys other than ``list``, such as ``city``
+        self.dt = dt
+        self.columns = columns
+        self.codes = codes
+        self.vocabulary = vocabulary
+        # Structure: condition_sets[conditions[i]] is entry i's ``weather`` list as tuples of (key, value) pairs
+        self.conditions = conditions
+        self.condition_sets = condition_sets
+        # A forecast has no issue time of its own; its HTTP date is never later than when it was fetched
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        # Digest of the stored values; it changes only when the forecast itself does
+        digest = hashlib.sha1(dt.tobytes())
+        for array in list(columns.values()) + list(codes.values()) + [conditions]:
+            digest.update(array.tobytes())
+        digest.update(repr((vocabulary, condition_sets, meta)).encode())
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def from_owm(cls, payload: dict, fetched_at: float = None) -> "ColumnarForecast":
+        """Parse an OpenWeatherMap ``forecast`` response fetched at ``fetched_at`` (default now)."""
+        entries = payload.get("list") or []
+        dt = np.fromiter((entry.get("dt", 0) for entry in entries), dtype=np.int64, count=len(entries))
+        columns = {}
+        for field, path in NUMERIC_FIELDS.items():
+            values = [_lookup(entry, path) for entry in entries]
+            columns[field] = np.array([np.nan if value is None else value for value in values], dtype=np.float32)
+
+        vocabulary = []
+        index = {}
+        codes = {}
+        for field, path in CODED_FIELDS.items():
+            field_codes = np.empty(len(entries), dtype=np.int16)
+            for i, entry in enumerate(entries):
+                value = _lookup(entry, path)
+                if value not in index:
+                    index[value] = len(vocabulary)
+                    vocabulary.append(value)
+                field_codes[i] = index[value]
+            codes[field] = field_codes
+
+        condition_sets = []
+        condition_index = {}
+        conditions = np.empty(len(entries), dtype=np.int16)
+        for i, entry in enumerate(entries):
+            conditions_key = tuple(tuple(condition.items()) for condition in entry.get("weather") or [])
+            if conditions_key not in condition_index:
+                condition_index[conditions_key] = len(condition_sets)
+                condition_sets.append(conditions_key)
+            conditions[i] = condition_index[conditions_key]
+
+        meta = {key: value for key, value in payload.items() if key != "list"}
+        return cls(meta, dt, columns, codes, vocabulary, conditions, condition_sets, fetched_at)
+
+    def __len__(self):
+        return len(self.dt)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays."""
+        return self.dt.nbytes + sum(array.nbytes for array in self.columns.values()) + \
+            sum(array.nbytes for array in self.codes.values()) + self.conditions.nbytes
+
+    def _window(self, start: int = None, end: int = None) -> slice:
+        """Return the slice of entries with ``start <= dt < end``; timestamps are sorted upstream."""
+        lo = 0 if start is None else int(np.searchsorted(self.dt, start, side="left"))
+        hi = len(self.dt) if end is None else int(np.searchsorted(self.dt, end, side="left"))
+        return slice(lo, max(lo, hi))
+
+    def _values(self, field: str, window: slice) -> list:
+        if field in self.codes:
+            return [self.vocabulary[code] for code in self.codes[field][window].tolist()]
+        if field in TEXT_FIELDS:
+            key = TEXT_FIELDS[field]
+            return [dict(self.condition_sets[code][0]).get(key) if self.condition_sets[code] else None
+                    for code in self.conditions[window].tolist()]
+        return [_number(value, field) for value in self.columns[field][window]]
+
+    def project(self, fields=None, start: int = None, end: int = None) -> dict:
+        """Return selected fields over a time window in columnar form.
+
+        Parameters
+        ----------
+        fields : iterable of str, optional
+            The fields to include. Defaults to all of ``FIELDS``.
+        start, end : int, optional
+            Unix timestamps; only entries with ``start <= dt < end`` are kept.
+
+        Returns
+        -------
+        dict
+            ``city``, ``dt`` (list of timestamps) and one list per field.
+
+        Raises
+        ------
+        ValueError
+            If a field is unknown.
+        """
+        fields = FIELDS if fields is None else validate_fields(fields)
+        window = self._window(start, end)
+        projected = {"city": self.meta.get("city", {}), "dt": self.dt[window].tolist()}
+        for field in fields:
+            projected[field] = self._values(field, window)
+        return projected
+
+    def to_response(self, fields=None, start: int = None, end: int = None) -> dict:
+        """Return ``to_owm()``, or ``project(...)`` if any argument is given."""
+        if fields is None and start is None and end is None:
+            return self.to_owm()
+        return self.project(fields, start, end)
+
+    def to_owm(self) -> dict:
+        """Rebuild the OpenWeatherMap response from the stored fields.
+
+        Every key of a documented forecast entry is restored, including all
+        weather conditions; ``dt_txt`` is derived from ``dt``. Keys upstream
+        may add beyond those are not kept.
+        """
+        window = slice(None)
+        values = {field: self._values(field, window) for field in tuple(NUMERIC_FIELDS) + tuple(CODED_FIELDS)}
+        conditions = self.conditions.tolist()
+        entries = []
+        for i, dt in enumerate(self.dt.tolist()):
+            entry = {"dt": dt}
+            for field, path in list(NUMERIC_FIELDS.items()) + list(CODED_FIELDS.items()):
+                value = values[field][i]
+                if value is None:
+                    continue
+                target = entry
+                for key in path[:-1]:
+                    target = target.setdefault(key, {})
+                target[path[-1]] = value
+            entry["weather"] = [dict(condition) for condition in self.condition_sets[conditions[i]]]
+            entry["dt_txt"] = datetime.fromtimestamp(dt, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            entries.append(entry)
+        return dict(self.meta, list=entries)
@@ -0,0 +1,69 @@
+import gzip
+import os
+import zlib
+
+import msgpack
+import orjson
+
+
+# Bodies smaller than this are sent uncompressed; below about a kilobyte the
+# gzip header and the CPU time cost more than the bytes saved.
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+# zlib level 1-9. Level 6 gets most of level 9's ratio on JSON at a fraction of the time.
+RESPONSE_COMPRESSION_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "6"))
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def encode_json(data) -> bytes:
+    """Serialize to compact UTF-8 JSON with orjson."""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+def encode_msgpack(data) -> bytes:
+    """Serialize to MessagePack."""
+    return msgpack.packb(data, use_bin_type=True)
+
+
+# Media types a client may ask for in ``Accept``, most preferred first.
+# ``application/x-msgpack`` is the unregistered name many clients still send.
+ENCODERS = {
+    JSON_MIMETYPE: encode_json,
+    MSGPACK_MIMETYPE: encode_msgpack,
+    "application/x-msgpack": encode_msgpack,
+}
+
+# Content codings a client may ask for in ``Accept-Encoding``, most preferred first.
+# HTTP ``deflate`` is the zlib format, which is what ``zlib.compress`` produces.
+COMPRESSORS = {
+    "gzip": lambda body, level: gzip.compress(body, compresslevel=level, mtime=0),
+    "deflate": lambda body, level: zlib.compress(body, level),
+}
+
+
+def encode(data, mimetype: str = JSON_MIMETYPE) -> bytes:
+    """Serialize ``data`` to one of the media types in ``ENCODERS``.
+
+    Raises
+    ------
+    ValueError
+        If the media type is not supported.
+    """
+    if mimetype not in ENCODERS:
+        raise ValueError(f"Unsupported media type: {mimetype}. Supported types are {list(ENCODERS)}.")
+    return ENCODERS[mimetype](data)
+
+
+def compress(body: bytes, coding: str = None, min_bytes: int = RESPONSE_COMPRESSION_MIN_BYTES,
+             level: int = RESPONSE_COMPRESSION_LEVEL) -> tuple:
+    """Compress a body with a content coding from ``COMPRESSORS`` if it is large enough.
+
+    Returns
+    -------
+    tuple
+        ``(body, coding)``; ``coding`` is None if the body was left as is.
+    """
+    if coding not in COMPRESSORS or len(body) < min_bytes:
+        return body, None
+    return COMPRESSORS[coding](body, level), coding
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import threading
+
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class BackgroundEventLoop:
+    """An asyncio event loop running forever on a daemon thread.
+
+    Flask runs each ``async def`` view in a short-lived event loop of its
+    own, which cannot keep pooled connections or in-flight requests alive
+    between requests. Coroutines submitted here all share one long-lived
+    loop instead, so every request reuses the same connection pool and
+    concurrency limits, and waiting on OpenWeatherMap costs a suspended
+    coroutine rather than a blocked thread.
+    """
+
+    def __init__(self, name: str = "asyncio-loop"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    started = threading.Event()
+
+                    def run():
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(started.set)
+                        loop.run_forever()
+
+                    self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+                    self._thread.start()
+                    started.wait()
+                    self._loop = loop
+                    logger.info("Started background event loop %s.", self.name)
+        return self._loop
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop and return a ``concurrent.futures.Future``."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the loop and block until it finishes, returning its result."""
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro):
+        """Await a coroutine on the loop from another event loop, such as an async Flask view."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self):
+        """Stop the loop and wait for its thread to exit."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
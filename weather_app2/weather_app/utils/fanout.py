@@ -0,0 +1,107 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+import os
+import threading
+import time
+
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Size of the process-wide worker pool shared by every fan-out.
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "32"))
+# Default number of tasks a single request may have in flight at once.
+FANOUT_MAX_PARALLELISM = int(os.getenv("FANOUT_MAX_PARALLELISM", "8"))
+# Default overall deadline, in seconds, for a single fan-out.
+FANOUT_DEADLINE = float(os.getenv("FANOUT_DEADLINE", "10"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+    return _executor
+
+
+def fan_out(func, tasks: dict, max_parallelism: int = None, deadline: float = None, executor=None):
+    """Run ``func`` once per task concurrently and collect partial results.
+
+    At most ``max_parallelism`` tasks are in flight at a time, so a single
+    request cannot monopolize the shared pool. Tasks that raise are reported
+    individually, and tasks still pending when the deadline expires are
+    reported as timed out instead of failing the whole call.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call for each task.
+    tasks : dict
+        Maps a task key to the tuple of positional arguments for ``func``.
+    max_parallelism : int, optional
+        The maximum number of tasks in flight. Defaults to ``FANOUT_MAX_PARALLELISM``.
+    deadline : float, optional
+        The overall time budget in seconds. Defaults to ``FANOUT_DEADLINE``.
+    executor : Executor, optional
+        The pool to run tasks on. Defaults to the shared pool.
+
+    Returns
+    -------
+    tuple
+        ``(results, errors)``: two dicts keyed by task key, in task order,
+        holding the return values of the tasks that succeeded and an error
+        message for the tasks that failed or timed out.
+    """
+    max_parallelism = max(1, max_parallelism or FANOUT_MAX_PARALLELISM)
+    deadline = FANOUT_DEADLINE if deadline is None else deadline
+    executor = executor or get_executor()
+    expires_at = time.monotonic() + deadline
+
+    results = {}
+    errors = {}
+    in_flight = {}  # Structure: {future: task key}
+    queued = iter(tasks.items())
+
+    def submit_next() -> bool:
+        for key, args in queued:
+            in_flight[executor.submit(func, *args)] = key
+            return True
+        return False
+
+    for _ in range(max_parallelism):
+        if not submit_next():
+            break
+
+    while in_flight:
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = in_flight.pop(future)
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+            submit_next()
+
+    timed_out = list(in_flight.values()) + [key for key, _ in queued]
+    for future in in_flight:
+        future.cancel()
+    for key in timed_out:
+        errors[key] = f"Timed out after {deadline:g}s."
+    if timed_out:
+        logger.error("Fan-out deadline of %ss expired with %d of %d tasks unfinished.",
+                     deadline, len(timed_out), len(tasks))
+
+    ordered_results = {key: results[key] for key in tasks if key in results}
+    ordered_errors = {key: errors[key] for key in tasks if key in errors}
+    return ordered_results, ordered_errors
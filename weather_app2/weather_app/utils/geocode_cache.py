@@ -0,0 +1,220 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from weather_app.utils.cache import TTLCache
+from weather_app.utils.logger import configure_logger
+from weather_app.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Geocodes practically never change, so the defaults favour long-lived entries.
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "10000"))
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+GEOCODE_CACHE_MAX_PERSISTENT = int(os.getenv("GEOCODE_CACHE_MAX_PERSISTENT", "500000"))
+
+
+def normalize_city_name(city_name: str) -> str:
+    """Normalize a city name into a cache key.
+
+    Unicode is NFKC-normalized, case is folded and runs of whitespace are
+    collapsed, so " los  Angeles" and "Los Angeles" share one entry.
+
+    Parameters
+    ----------
+    city_name : str
+        The city name as supplied by the user.
+
+    Returns
+    -------
+    str
+        The normalized key.
+    """
+    normalized = unicodedata.normalize("NFKC", city_name)
+    return " ".join(normalized.casefold().split())
+
+
+class GeocodeCache:
+    """Two-tier cache for geocoding results.
+
+    Lookups are served from an in-process LRU first and then from a
+    ``geocode_cache`` table in the application's SQLite database, which
+    survives restarts and is shared by every worker. Only when both tiers
+    miss does the caller need to go upstream.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries held in the in-memory tier.
+    ttl : float
+        The number of seconds an entry stays valid in either tier.
+    persistent : bool
+        Whether to use the SQLite tier at all.
+    max_persistent_entries : int
+        Upper bound on rows kept in the SQLite tier. The oldest rows are
+        pruned once the bound is exceeded.
+    """
+
+    _PRUNE_EVERY = 100  # writes between two pruning passes over the SQLite tier
+
+    def __init__(self, maxsize: int = GEOCODE_CACHE_SIZE, ttl: float = GEOCODE_CACHE_TTL,
+                 persistent: bool = True, max_persistent_entries: int = GEOCODE_CACHE_MAX_PERSISTENT):
+        self.ttl = ttl
+        self.persistent = persistent
+        self.max_persistent_entries = max_persistent_entries
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._writes_since_prune = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def get(self, city_name: str):
+        """Return the cached ``(lat, lon)`` for a city, or None on a miss.
+
+        Parameters
+        ----------
+        city_name : str
+            The city name to look up. It is normalized before the lookup.
+
+        Returns
+        -------
+        tuple or None
+            The cached coordinates, or None if neither tier has a valid entry.
+        """
+        key = normalize_city_name(city_name)
+        coordinates = self._memory.get(key)
+        if coordinates is not None:
+            self._count("memory_hits")
+            return coordinates
+
+        coordinates = self._persistent_get(key)
+        if coordinates is not None:
+            self._count("persistent_hits")
+            self._memory.set(key, coordinates)
+            return coordinates
+
+        self._count("misses")
+        return None
+
+    def set(self, city_name: str, latitude: float, longitude: float):
+        """Store the coordinates for a city in both tiers.
+
+        Parameters
+        ----------
+        city_name : str
+            The city name the coordinates belong to.
+        latitude : float
+            The latitude returned by the geocoding API.
+        longitude : float
+            The longitude returned by the geocoding API.
+        """
+        key = normalize_city_name(city_name)
+        self._memory.set(key, (latitude, longitude))
+        self._persistent_set(key, latitude, longitude)
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        if not self._ensure_table():
+            return
+        try:
+            with get_db_connection() as conn:
+                conn.execute("DELETE FROM geocode_cache")
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Failed to clear persistent geocode cache: %s", e)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for both tiers."""
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            hits = self.memory_hits + self.persistent_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory": self._memory.stats(),
+                "persistent": self.persistent,
+            }
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _ensure_table(self) -> bool:
+        """Create the SQLite table on first use; disable the tier if that fails."""
+        if not self.persistent:
+            return False
+        if self._table_ready:
+            return True
+        try:
+            with get_db_connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                    "city_key TEXT PRIMARY KEY, "
+                    "latitude REAL NOT NULL, "
+                    "longitude REAL NOT NULL, "
+                    "fetched_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_geocode_cache_fetched_at ON geocode_cache (fetched_at)"
+                )
+                conn.commit()
+            self._table_ready = True
+        except sqlite3.Error as e:
+            logger.error("Persistent geocode cache unavailable, using memory only: %s", e)
+            self.persistent = False
+        return self._table_ready
+
+    def _persistent_get(self, key: str):
+        if not self._ensure_table():
+            return None
+        try:
+            with get_db_connection() as conn:
+                row = conn.execute(
+                    "SELECT latitude, longitude FROM geocode_cache WHERE city_key = ? AND fetched_at > ?",
+                    (key, time.time() - self.ttl),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Persistent geocode cache lookup failed for %s: %s", key, e)
+            return None
+        return (row[0], row[1]) if row else None
+
+    def _persistent_set(self, key: str, latitude: float, longitude: float):
+        if not self._ensure_table():
+            return
+        with self._lock:
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= self._PRUNE_EVERY
+            if prune:
+                self._writes_since_prune = 0
+        try:
+            with get_db_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (city_key, latitude, longitude, fetched_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, latitude, longitude, time.time()),
+                )
+                if prune:
+                    self._prune(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Persistent geocode cache write failed for %s: %s", key, e)
+
+    def _prune(self, conn):
+        """Drop expired rows and the oldest rows beyond the configured bound."""
+        conn.execute("DELETE FROM geocode_cache WHERE fetched_at <= ?", (time.time() - self.ttl,))
+        conn.execute(
+            "DELETE FROM geocode_cache WHERE city_key IN ("
+            "SELECT city_key FROM geocode_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_persistent_entries,),
+        )
@@ -0,0 +1,94 @@
+import hashlib
+
+from weather_app.utils.columnar import ColumnarForecast
+
+
+def data_timestamp(data):
+    """Return the Unix time an OpenWeatherMap response was observed or fetched, or None.
+
+    Current weather carries the observation time in ``dt`` and air pollution
+    in the ``dt`` of each ``list`` entry. Forecast ``dt`` values are in the
+    future, so a forecast is dated one step before its first entry, the slot
+    it was issued in, and never later than it was fetched. Refetching an
+    unchanged forecast keeps its date.
+    """
+    if isinstance(data, ColumnarForecast):
+        if not len(data.dt):
+            return data.fetched_at
+        step = int(data.dt[1] - data.dt[0]) if len(data.dt) > 1 else 0
+        return min(int(data.dt[0]) - step, data.fetched_at)
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get("dt"), (int, float)):
+        return data["dt"]
+    timestamps = [entry.get("dt") for entry in data.get("list") or [] if isinstance(entry, dict)]
+    timestamps = [dt for dt in timestamps if isinstance(dt, (int, float))]
+    return max(timestamps) if timestamps else None
+
+
+def data_version(data):
+    """Return a value that changes whenever the content of a response does, or None."""
+    if isinstance(data, ColumnarForecast):
+        return data.fingerprint
+    return data_timestamp(data)
+
+
+class CacheValidator:
+    """HTTP validators for a read served from cached upstream responses.
+
+    Parameters
+    ----------
+    etag : str
+        An opaque tag that changes whenever any of the responses changes.
+    last_modified : int
+        The Unix time of the newest response.
+    max_age : int
+        Seconds until the first of the responses stops being fresh; 0 once
+        any of them is stale.
+    """
+
+    __slots__ = ("etag", "last_modified", "max_age")
+
+    def __init__(self, etag: str, last_modified: int, max_age: int):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+
+    @classmethod
+    def from_entries(cls, endpoint: str, entries, variant=None):
+        """Build validators from cached responses.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint the responses belong to.
+        entries : iterable of tuple
+            ``(name, data, expires_in)`` for every response behind the read,
+            where ``name`` identifies the favorite it was read for.
+        variant : hashable, optional
+            Whatever else selects the body built from the responses, such as
+            the route, a field projection or the encoding. Reads that differ
+            in it get different ETags.
+
+        Returns
+        -------
+        CacheValidator or None
+            None if there are no entries or a response carries no timestamp.
+        """
+        versions = []
+        timestamps = []
+        expires = []
+        for name, data, expires_in in entries:
+            version, timestamp = data_version(data), data_timestamp(data)
+            if version is None or timestamp is None:
+                return None
+            versions.append((name, version))
+            timestamps.append(timestamp)
+            expires.append(expires_in)
+        if not versions:
+            return None
+        etag = hashlib.sha1(repr((endpoint, variant, sorted(versions))).encode()).hexdigest()
+        return cls(etag, int(max(timestamps)), max(int(min(expires)), 0))
+
+    def __repr__(self):
+        return f"CacheValidator({self.etag!r}, {self.last_modified!r}, {self.max_age!r})"
@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+OWM_API_BASE_URL = os.getenv("OWM_API_BASE_URL", "https://api.openweathermap.org/data/2.5")
+OWM_GEO_BASE_URL = os.getenv("OWM_GEO_BASE_URL", "https://api.openweathermap.org/geo/1.0")
+OWM_TILE_BASE_URL = os.getenv("OWM_TILE_BASE_URL", "https://tile.openweathermap.org/map")
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))  # number of hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))  # keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "5"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.2"))
+
+
+class TransportError(RuntimeError):
+    """Raised when an upstream request fails after all retries.
+
+    Attributes
+    ----------
+    status_code : int or None
+        The HTTP status of the last attempt, or None if no response arrived.
+    timeout : bool
+        True if the last attempt timed out.
+    """
+
+    def __init__(self, message: str, status_code: int = None, timeout: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.timeout = timeout
+
+
+class TransportResponse:
+    """The parts of an HTTP response the application uses."""
+
+    __slots__ = ("status_code", "content", "headers")
+
+    def __init__(self, status_code: int, content: bytes, headers: dict = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        """Decode the body as JSON."""
+        return json.loads(self.content)
+
+
+class RequestsBackend:
+    """Backend that talks to the network through a pooled ``requests.Session``.
+
+    Parameters
+    ----------
+    pool_connections : int
+        The number of per-host connection pools to keep.
+    pool_maxsize : int
+        The maximum number of keep-alive connections kept per host.
+    """
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS, pool_maxsize: int = HTTP_POOL_MAXSIZE):
+        self.session = requests.Session()
+        # Retries are handled by HttpTransport so that every backend behaves the same way.
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, params: dict, timeout: tuple) -> TransportResponse:
+        try:
+            response = self.session.get(url, params=params, timeout=timeout)
+        except requests.exceptions.Timeout as e:
+            raise TransportError(str(e), timeout=True) from e
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    def close(self):
+        self.session.close()
+
+
+class StubBackend:
+    """In-process backend that serves canned responses instead of the network.
+
+    Routes map a URL path (for example ``/data/2.5/weather``) to a callable
+    that receives the query parameters and returns either a
+    ``TransportResponse``, raw bytes, or a JSON-serializable object. Unknown
+    paths answer 404. Every request is recorded in ``calls``.
+
+    Parameters
+    ----------
+    routes : dict
+        Maps URL paths to handler callables.
+    latency : float
+        Seconds to sleep before answering, to simulate a remote service.
+    """
+
+    def __init__(self, routes: dict = None, latency: float = 0.0):
+        self.routes = dict(routes or {})
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: dict, timeout: tuple) -> TransportResponse:
+        path = urlsplit(url).path
+        with self._lock:
+            self.calls.append((path, dict(params or {})))
+        if self.latency:
+            time.sleep(self.latency)
+
+        handler = self.routes.get(path)
+        if handler is None:
+            return TransportResponse(404, b'{"message": "not found"}')
+        result = handler(params or {})
+        if isinstance(result, TransportResponse):
+            return result
+        if isinstance(result, bytes):
+            return TransportResponse(200, result)
+        return TransportResponse(200, json.dumps(result).encode())
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Shared HTTP transport for all OpenWeatherMap traffic.
+
+    Owns the base URLs, timeouts and retry policy and delegates the actual
+    I/O to a pluggable backend: pooled keep-alive connections by default, or
+    a ``StubBackend`` in tests and benchmarks. GET requests are idempotent,
+    so connection errors, timeouts and 429/5xx responses are retried with
+    exponential backoff.
+
+    Parameters
+    ----------
+    backend : object, optional
+        An object with ``get(url, params, timeout)`` and ``close()``.
+        Defaults to a ``RequestsBackend`` sized by ``pool_connections`` and ``pool_maxsize``.
+    api_base_url, geo_base_url, tile_base_url : str
+        The base URLs of the weather, geocoding and tile services.
+    connect_timeout, read_timeout : float
+        Socket timeouts in seconds, per attempt.
+    max_retries : int
+        Number of retries after the first attempt.
+    backoff_factor : float
+        Retry ``n`` (0-based) sleeps ``backoff_factor * 2 ** n`` seconds.
+    pool_connections, pool_maxsize : int
+        Connection pool sizing for the default backend.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, backend=None, api_base_url: str = OWM_API_BASE_URL, geo_base_url: str = OWM_GEO_BASE_URL,
+                 tile_base_url: str = OWM_TILE_BASE_URL, connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT, max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_factor: float = HTTP_RETRY_BACKOFF, pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE, sleep=time.sleep):
+        self.backend = backend if backend is not None else RequestsBackend(pool_connections, pool_maxsize)
+        self.api_base_url = api_base_url.rstrip("/")
+        self.geo_base_url = geo_base_url.rstrip("/")
+        self.tile_base_url = tile_base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._sleep = sleep
+
+    def api_url(self, endpoint: str) -> str:
+        """Return the URL of a data endpoint such as ``weather`` or ``forecast``."""
+        return f"{self.api_base_url}/{endpoint}"
+
+    def geo_url(self, endpoint: str) -> str:
+        """Return the URL of a geocoding endpoint such as ``direct``."""
+        return f"{self.geo_base_url}/{endpoint}"
+
+    def tile_url(self, layer: str, z: int, x: int, y: int) -> str:
+        """Return the URL of a weather map tile, without the API key."""
+        return f"{self.tile_base_url}/{layer}/{z}/{x}/{y}.png"
+
+    def get(self, url: str, params: dict = None) -> TransportResponse:
+        """Perform a GET, retrying transient failures.
+
+        Returns
+        -------
+        TransportResponse
+            The first successful (status below 400) response.
+
+        Raises
+        ------
+        TransportError
+            If the last attempt failed or returned an error status.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.backend.get(url, params, self.timeout)
+                if response.status_code < 400:
+                    return response
+                error = TransportError(f"{response.status_code} Error for url: {url}",
+                                       status_code=response.status_code)
+                retryable = response.status_code in self.RETRY_STATUSES
+            except TransportError as e:
+                error = e
+                retryable = True
+
+            if not retryable or attempt >= self.max_retries:
+                raise error
+            delay = self.backoff_factor * (2 ** attempt)
+            logger.warning("Retrying %s in %.2fs after error: %s", url, delay, error)
+            self._sleep(delay)
+            attempt += 1
+
+    def get_json(self, url: str, params: dict = None):
+        """Perform a GET and decode the JSON body.
+
+        Raises
+        ------
+        TransportError
+            If the request fails or the body is not valid JSON.
+        """
+        response = self.get(url, params)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise TransportError(f"Invalid JSON from {url}: {e}", status_code=response.status_code) from e
+
+    def close(self):
+        """Release the backend's pooled connections."""
+        self.backend.close()
@@ -1,26 +1,254 @@
+import atexit
+from collections import OrderedDict
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+import time
 
-from flask import current_app, has_request_context
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Records waiting for the writer thread. When it falls behind, new records are
+# dropped (and counted) rather than blocking the request threads.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Logged arguments longer than this many characters are truncated; containers
+# with more than LOG_MAX_ITEMS items are summarized without being rendered.
+LOG_MAX_ARG_CHARS = int(os.getenv("LOG_MAX_ARG_CHARS", "512"))
+LOG_MAX_ITEMS = int(os.getenv("LOG_MAX_ITEMS", "20"))
+# Records below WARNING per message template and second, with bursts up to LOG_RATE_BURST. 0 disables.
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "50"))
+LOG_RATE_BURST = float(os.getenv("LOG_RATE_BURST", "100"))
+# Message templates tracked by the rate limit; the least recently logged are forgotten beyond this.
+LOG_RATE_MAX_TEMPLATES = int(os.getenv("LOG_RATE_MAX_TEMPLATES", "1024"))
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+def _parse_sampling(value: str) -> dict:
+    """Parse ``"logger=fraction,logger=fraction"`` into a dictionary."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, fraction = item.partition("=")
+        rates[name.strip()] = float(fraction)
+    return rates
+
+
+# Fraction of records below WARNING kept per logger (and its children), e.g.
+# "weather_app.utils.http_transport=0.1". Loggers not listed keep every record.
+LOG_SAMPLING = _parse_sampling(os.getenv("LOG_SAMPLING", ""))
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below WARNING from chosen loggers.
+
+    Parameters
+    ----------
+    rates : dict
+        The fraction of records to keep, by logger name. A logger's children
+        are sampled at its rate unless they have one of their own.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved = {}  # Structure: {logger name: rate}, so the prefix walk happens once per logger
+        self.sampled_out = 0
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """Limit how often each message template below WARNING is logged.
+
+    Every ``(logger, template)`` pair has a token bucket refilled at ``rate``
+    records per second up to ``burst``. When a message gets through after
+    some were suppressed, the number suppressed is appended to it. At most
+    ``max_templates`` buckets are kept; the least recently used is dropped
+    first, and a dropped template starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, clock=time.monotonic, max_templates: int = LOG_RATE_MAX_TEMPLATES):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_templates = max_templates
+        self._clock = clock
+        # Structure: {(logger name, template): [tokens, last refill, suppressed]}, in LRU order
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.rate_limited = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now, 0]
+                if len(self._buckets) > self.max_templates:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.rate_limited += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+
+_SCALARS = (int, float, bool, type(None))
+
+
+def summarize(value, max_chars: int = LOG_MAX_ARG_CHARS, max_items: int = LOG_MAX_ITEMS):
+    """Return ``value``, or a short description of it if it would render too long."""
+    if type(value) in _SCALARS:
+        return value
+    if isinstance(value, (dict, list, tuple, set, frozenset)):
+        if len(value) > max_items:
+            # Large containers are described without rendering them at all
+            return f"<{type(value).__name__} of {len(value)} items>"
+        value = repr(value)
+    elif not isinstance(value, (str, bytes)):
+        return value
+    if len(value) <= max_chars:
+        return value
+    return f"{value[:max_chars]!s}... ({len(value) - max_chars} more characters)"
+
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+class TruncatingFilter(logging.Filter):
+    """Replace oversized logging arguments with a truncated form or a summary."""
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+    def __init__(self, max_chars: int = LOG_MAX_ARG_CHARS, max_items: int = LOG_MAX_ITEMS):
+        super().__init__()
+        self.max_chars = max_chars
+        self.max_items = max_items
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+    def filter(self, record):
+        if isinstance(record.args, tuple) and record.args:
+            record.args = tuple(summarize(arg, self.max_chars, self.max_items) for arg in record.args)
+        elif isinstance(record.msg, str) and len(record.msg) > self.max_chars and not record.args:
+            record.msg = summarize(record.msg, self.max_chars, self.max_items)
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hand records to a writer thread without blocking or formatting in the caller.
+
+    Records are enqueued as they are; message interpolation and formatting
+    happen on the writer thread. A full queue drops the record and counts it.
+    In a forked child process, where the writer thread does not exist,
+    records are written synchronously to ``fallback`` instead.
+    """
+
+    def __init__(self, log_queue, fallback: logging.Handler):
+        super().__init__(log_queue)
+        self.fallback = fallback
+        self._pid = os.getpid()
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The queue never leaves the process, so the record needs no pickling-safe copy.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        if os.getpid() != self._pid:
+            self.fallback.handle(record)
+            return
+        super().emit(record)
+
+
+_setup_lock = threading.Lock()
+_handler = None
+_listener = None
+
+
+def setup_logging(level: str = LOG_LEVEL, stream=None) -> NonBlockingQueueHandler:
+    """Install the application's logging pipeline on the root logger, once per process.
+
+    Records pass the sampling, rate-limit and truncation filters on the
+    calling thread, then go through a bounded queue to a background thread
+    that formats them and writes them to ``stream`` (stderr by default).
+    Later calls return the installed handler unchanged.
+    """
+    global _handler, _listener
+    with _setup_lock:
+        if _handler is not None:
+            return _handler
+        writer = logging.StreamHandler(stream or sys.stderr)
+        writer.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE), fallback=writer)
+        # Cheapest filters first, so that dropped records cost as little as possible
+        handler.addFilter(SamplingFilter(LOG_SAMPLING))
+        handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_BURST))
+        handler.addFilter(TruncatingFilter())
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(handler)
+        _listener = logging.handlers.QueueListener(handler.queue, writer)
+        _listener.start()
+        atexit.register(_listener.stop)  # flush what is still queued on exit
+        _handler = handler
+        return handler
+
+
+def logging_stats() -> dict:
+    """Return the counters of the logging pipeline."""
+    if _handler is None:
+        return {"installed": False}
+    filters = {type(f).__name__: f for f in _handler.filters}
+    return {
+        "installed": True,
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped,
+        "sampled_out": filters["SamplingFilter"].sampled_out,
+        "rate_limited": filters["RateLimitFilter"].rate_limited,
+    }
+
+
+def configure_logger(logger):
+    """Make sure the logging pipeline is installed; ``logger`` logs through it via the root logger.
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    Handlers are installed once on the root logger rather than on every
+    module's logger, so calling this from each module costs nothing extra
+    and records are written once.
+    """
+    setup_logging()
+    logger.setLevel(logging.NOTSET)
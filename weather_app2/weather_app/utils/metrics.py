@@ -0,0 +1,283 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+
+# Upper bounds in seconds of the latency histogram buckets, from sub-millisecond
+# cache hits to upstream calls that run into the read timeout.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ThreadShards:
+    """Per-thread dictionaries of metric values, merged when they are read.
+
+    Each thread updates a dictionary only it writes to, so recording takes
+    no lock. The lock is taken once per thread to register its dictionary
+    and when the values are collected. Dictionaries of threads that have
+    exited are folded into ``_retired`` whenever a new thread registers, so
+    short-lived request threads do not accumulate even if nothing scrapes.
+    """
+
+    def __init__(self, merge):
+        self._merge = merge  # merge(into: dict, values: dict)
+        self._local = threading.local()
+        self._shards = []  # Structure: [(thread, {labels: value})]
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def local(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._retire_dead()
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _retire_dead(self):
+        """Fold the dictionaries of exited threads into ``_retired``; the caller holds the lock."""
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                self._merge(self._retired, values)
+        self._shards = alive
+
+    def collect(self) -> dict:
+        with self._lock:
+            self._retire_dead()
+            merged = {}
+            self._merge(merged, self._retired)
+            for _, values in self._shards:
+                # Copying the items is a single operation under the GIL, so the owner may keep writing
+                self._merge(merged, dict(list(values.items())))
+        return merged
+
+
+def _merge_counts(into: dict, values: dict):
+    for labels, value in values.items():
+        into[labels] = into.get(labels, 0) + value
+
+
+def _merge_buckets(into: dict, values: dict):
+    for labels, counts in values.items():
+        total = into.get(labels)
+        if total is None:
+            into[labels] = list(counts)
+        else:
+            for i, count in enumerate(counts):
+                total[i] += count
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_merge_counts)
+
+    def inc(self, *labels, amount: float = 1):
+        """Add ``amount`` to the count for the given label values."""
+        values = self._shards.local()
+        values[labels] = values.get(labels, 0) + amount
+
+    def values(self) -> dict:
+        """Return ``{label values: count}``."""
+        return self._shards.collect()
+
+    def render(self) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.values().items())]
+
+
+class Histogram:
+    """A distribution of observed values in cumulative buckets, per combination of label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(_merge_buckets)
+
+    def observe(self, value: float, *labels):
+        """Record one observation for the given label values."""
+        values = self._shards.local()
+        counts = values.get(labels)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the sum of the observations
+            counts = values[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def values(self) -> dict:
+        """Return ``{label values: {"buckets": {upper bound: cumulative count}, "sum": ..., "count": ...}}``."""
+        result = {}
+        for labels, counts in self._shards.collect().items():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                buckets[bound] = cumulative
+            result[labels] = {"buckets": buckets, "sum": counts[-1], "count": cumulative}
+        return result
+
+    def render(self) -> list:
+        lines = []
+        for labels, value in sorted(self.values().items()):
+            for bound, count in value["buckets"].items():
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(value['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {value['count']}")
+        return lines
+
+
+class CallbackMetric:
+    """A metric whose values are read from a callback when metrics are rendered.
+
+    Used to expose counters that other components already keep, such as
+    cache statistics, without recording anything twice.
+
+    Parameters
+    ----------
+    func : callable
+        Returns ``{label values: value}``, or a single number if there are no labels.
+    kind : str
+        The Prometheus type, ``"gauge"`` or ``"counter"``.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), func=None, kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.func = func
+        self.kind = kind
+
+    def values(self) -> dict:
+        value = self.func() if self.func is not None else {}
+        return value if isinstance(value, dict) else {(): value}
+
+    def render(self) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.values().items())]
+
+
+class MetricsRegistry:
+    """A named set of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} is already registered as a {existing.kind}.")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        """Return the counter called ``name``, creating it if needed."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        """Return the histogram called ``name``, creating it if needed."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: tuple = (), func=None,
+                 kind: str = "gauge") -> CallbackMetric:
+        """Return the callback metric called ``name``, creating it if needed; ``func`` replaces its callback."""
+        metric = self._register(CallbackMetric(name, documentation, labelnames, func, kind))
+        if func is not None:
+            metric.func = func
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "weather_app_http_requests_total", "HTTP requests handled, by method, route and status.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "weather_app_http_request_duration_seconds", "Time to handle an HTTP request, by method and route.",
+    ("method", "route"),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "weather_app_upstream_requests_total",
+    "OpenWeatherMap calls, by endpoint and outcome (ok, error or timeout).", ("endpoint", "outcome"),
+)
+UPSTREAM_REQUEST_SECONDS = REGISTRY.histogram(
+    "weather_app_upstream_request_duration_seconds",
+    "Time of OpenWeatherMap calls including retries, by endpoint.", ("endpoint",),
+)
+DB_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "weather_app_db_acquire_seconds", "Time spent waiting for a pooled database connection."
+)
+DB_CONNECTION_SECONDS = REGISTRY.histogram(
+    "weather_app_db_connection_seconds", "Time a pooled database connection is held."
+)
+DB_ERRORS = REGISTRY.counter("weather_app_db_errors_total", "Database errors raised while acquiring or using a connection.")
+
+
+@contextmanager
+def track_upstream(endpoint: str):
+    """Count and time one OpenWeatherMap call made inside the block.
+
+    The outcome is ``timeout`` if the block raises an exception with a true
+    ``timeout`` attribute (such as a ``TransportError``), ``error`` for any
+    other exception and ``ok`` otherwise.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except Exception as e:
+        outcome = "timeout" if getattr(e, "timeout", False) else "error"
+        raise
+    finally:
+        UPSTREAM_REQUESTS.inc(endpoint, outcome)
+        UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
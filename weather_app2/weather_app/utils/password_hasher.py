@@ -0,0 +1,117 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import os
+import threading
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# The werkzeug method string, which includes the work factor (e.g. "scrypt:32768:8:1"
+# or "pbkdf2:sha256:600000"). Hashes made with any other parameters are upgraded on login.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+
+
+def _hash_password(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+
+def _verify_password(password_hash: str, password: str) -> bool:
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Runs password hashing and verification on a dedicated process pool.
+
+    Hashing is deliberately slow. Running it in worker processes keeps it
+    off the request threads and out of the GIL, so a burst of logins cannot
+    starve other routes. The number of hashes waiting or running is bounded.
+    Once the bound is reached, callers wait up to ``queue_timeout`` seconds
+    and then get an error instead of piling up.
+
+    Parameters
+    ----------
+    method : str
+        The werkzeug hashing method, including its work factor.
+    workers : int
+        The number of worker processes. 0 hashes inline on the calling
+        thread, which is what the unit tests use.
+    queue_size : int
+        The number of hashes that may wait for a free worker.
+    queue_timeout : float
+        Seconds to wait for room in the queue before giving up.
+    """
+
+    def __init__(self, method: str = PASSWORD_HASH_METHOD, workers: int = PASSWORD_HASH_WORKERS,
+                 queue_size: int = PASSWORD_HASH_QUEUE_SIZE, queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._method_prefix = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # Spawned workers do not inherit the locks held by the threads of a running server.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            logger.error("Password hashing queue is full; rejecting request.")
+            raise RuntimeError("Server is busy, please try again later.")
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method.
+
+        Raises
+        ------
+        RuntimeError
+            If the hashing queue stays full for longer than the queue timeout.
+        """
+        return self._run(_hash_password, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Return True if ``password`` matches ``password_hash``.
+
+        Raises
+        ------
+        RuntimeError
+            If the hashing queue stays full for longer than the queue timeout.
+        """
+        return self._run(_verify_password, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Return True if the hash was made with different parameters than the configured ones."""
+        if self._method_prefix is None:
+            # werkzeug fills in defaults (e.g. "scrypt" -> "scrypt:32768:8:1"), so resolve
+            # the configured method to the exact prefix it writes.
+            self._method_prefix = _hash_password("", self.method).split("$", 1)[0]
+        return password_hash.split("$", 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,227 @@
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "weather_profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))  # oldest profiles are deleted beyond this
+# Requests carrying this value in the X-Profile-Token header are profiled. Empty disables the header.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_HEADER = "X-Profile-Token"
+# Fraction of requests to PROFILE_SAMPLE_ROUTES profiled without the header. 0 disables sampling.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_ROUTES = frozenset(filter(None, (route.strip() for route in os.getenv(
+    "PROFILE_SAMPLE_ROUTES", "/weather/all,/forecast,/async/weather/all,/async/forecast"
+).split(","))))
+
+# Structure: {millisecond timestamp}_{route}_{user}_{wall milliseconds}ms.prof
+_FILENAME = re.compile(r"^(\d+)_(.+)_(.+)_(\d+)ms\.prof$")
+_UNSAFE = re.compile(r"[^A-Za-z0-9.-]+")
+
+
+def _slug(value: str) -> str:
+    """Make ``value`` safe to use as part of a file name (underscores separate the name's fields)."""
+    return _UNSAFE.sub("-", str(value)).strip("-")[:64] or "-"
+
+
+class ActiveProfile:
+    """A profiler running for one request."""
+
+    __slots__ = ("profiler", "started")
+
+    def __init__(self, profiler: cProfile.Profile, started: float):
+        self.profiler = profiler
+        self.started = started
+
+
+class RequestProfiler:
+    """Profile selected requests with cProfile and keep the most recent dumps on disk.
+
+    A request is profiled when it carries the trusted token, or at random
+    with probability ``sample_rate`` if its route is one of
+    ``sample_routes``. Only one request is profiled at a time per process;
+    requests arriving while a profile is running are served unprofiled.
+    This keeps the overhead bounded and avoids profilers interfering with
+    each other (Python 3.12 and later allow only one at a time).
+
+    cProfile records the thread that started it, so for the async routes
+    the profile shows the request thread waiting on the event loop rather
+    than the upstream calls themselves.
+
+    Parameters
+    ----------
+    directory : str
+        Where profile files are written.
+    max_files : int
+        How many profiles to keep; the oldest are deleted first.
+    token : str
+        The value of the ``X-Profile-Token`` header that triggers profiling.
+        Empty disables the header.
+    sample_rate : float
+        The fraction of requests to ``sample_routes`` that are profiled.
+    sample_routes : iterable of str
+        The route patterns eligible for sampling.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES, token: str = PROFILE_TOKEN,
+                 sample_rate: float = PROFILE_SAMPLE_RATE, sample_routes=PROFILE_SAMPLE_ROUTES):
+        self.directory = directory
+        self.max_files = max_files
+        self.token = token
+        self.sample_rate = sample_rate
+        self.sample_routes = frozenset(sample_routes)
+        self._running = threading.Lock()  # held while a profile runs
+        self._stats_lock = threading.Lock()
+        self._stats = {"profiled": 0, "skipped_busy": 0, "written": 0, "deleted": 0}
+
+    def is_authorized(self, header_token: str = None) -> bool:
+        """Return True if ``header_token`` is the trusted token; always False when no token is set."""
+        return bool(self.token and header_token and hmac.compare_digest(header_token.encode(), self.token.encode()))
+
+    def should_profile(self, route: str, header_token: str = None) -> bool:
+        """Return True if a request to ``route`` with this header value should be profiled."""
+        if self.is_authorized(header_token):
+            return True
+        return self.sample_rate > 0 and route in self.sample_routes and random.random() < self.sample_rate
+
+    def start(self):
+        """Start profiling the calling thread.
+
+        Returns
+        -------
+        ActiveProfile or None
+            The running profile, or None if another request is already being profiled.
+        """
+        if not self._running.acquire(blocking=False):
+            self._count("skipped_busy")
+            return None
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        except Exception:
+            self._running.release()
+            raise
+        return ActiveProfile(profiler, time.perf_counter())
+
+    def finish(self, active: ActiveProfile, route: str, user) -> str:
+        """Stop ``active``, write it to the profile directory and rotate old files.
+
+        Returns
+        -------
+        str or None
+            The name of the profile file, or None if it could not be written.
+        """
+        try:
+            active.profiler.disable()
+        finally:
+            self._running.release()
+        wall_ms = int((time.perf_counter() - active.started) * 1000)
+        self._count("profiled")
+
+        name = f"{int(time.time() * 1000)}_{_slug(route)}_{_slug(user or 'anonymous')}_{wall_ms}ms.prof"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            active.profiler.dump_stats(os.path.join(self.directory, name))
+        except OSError as e:
+            logger.error("Could not write profile %s: %s", name, e)
+            return None
+        self._count("written")
+        logger.info("Profiled %s for %s in %d ms: %s", route, user or "anonymous", wall_ms, name)
+        self._rotate()
+        return name
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def _files(self) -> list:
+        """Return the names of the profiles on disk, newest first."""
+        try:
+            names = [name for name in os.listdir(self.directory) if _FILENAME.match(name)]
+        except FileNotFoundError:
+            return []
+        return sorted(names, reverse=True)
+
+    def _rotate(self):
+        for name in self._files()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self._count("deleted")
+            except FileNotFoundError:
+                pass  # already removed by another worker sharing the directory
+
+    def list_profiles(self, limit: int = 20) -> list:
+        """Return the most recent profiles, newest first.
+
+        Returns
+        -------
+        list of dict
+            ``name``, ``created`` (Unix time), ``route``, ``user``, ``wall_ms`` and ``bytes`` per profile.
+        """
+        profiles = []
+        for name in self._files()[:limit]:
+            created, route, user, wall_ms = _FILENAME.match(name).groups()
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append({
+                "name": name, "created": int(created) / 1000, "route": route, "user": user,
+                "wall_ms": int(wall_ms), "bytes": size,
+            })
+        return profiles
+
+    def summarize(self, name: str, top: int = 10, sort: str = "cumulative") -> dict:
+        """Return the ``top`` functions of a profile ordered by ``sort`` (``cumulative`` or ``tottime``).
+
+        Raises
+        ------
+        ValueError
+            If ``name`` is not a profile in the directory, or ``sort`` is not supported.
+        """
+        if sort not in ("cumulative", "tottime"):
+            raise ValueError(f"Unsupported sort order: {sort}")
+        # Only names produced by finish() are read, so a request cannot reach outside the directory
+        if not _FILENAME.match(name) or os.path.basename(name) != name:
+            raise ValueError(f"Profile {name} not found.")
+        path = os.path.join(self.directory, name)
+        try:
+            stats = pstats.Stats(path, stream=io.StringIO())
+        except (FileNotFoundError, EOFError):
+            raise ValueError(f"Profile {name} not found.")
+
+        index = 3 if sort == "cumulative" else 2  # Structure: (primitive calls, calls, tottime, cumtime, callers)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)[:top]
+        return {
+            "name": name,
+            "total_calls": stats.total_calls,
+            "total_time": round(stats.total_tt, 6),
+            "functions": [
+                {
+                    "function": f"{os.path.basename(filename)}:{line}({function})",
+                    "calls": calls,
+                    "total_time": round(tottime, 6),
+                    "cumulative_time": round(cumtime, 6),
+                }
+                for (filename, line, function), (_, calls, tottime, cumtime, _) in rows
+            ],
+        }
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return dict(stats, directory=self.directory, files=len(self._files()))
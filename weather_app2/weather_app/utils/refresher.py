@@ -0,0 +1,174 @@
+import logging
+import os
+import random
+import threading
+import time
+
+from weather_app.utils.fanout import fan_out
+from weather_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "60"))  # seconds between refresh cycles
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))  # +/- fraction of the interval
+REFRESH_MAX_CALLS = int(os.getenv("REFRESH_MAX_CALLS", "100"))  # upstream calls per cycle
+REFRESH_PARALLELISM = int(os.getenv("REFRESH_PARALLELISM", "4"))
+REFRESH_ENDPOINTS = ("weather", "forecast", "air_pollution")
+
+
+class WeatherRefresher:
+    """Keeps the response cache warm for every favorited location.
+
+    Each cycle walks the distinct coordinates across all users' favorites
+    and refreshes every endpoint response that is missing, stale, or would
+    go stale before the next cycle. Because each endpoint has its own TTL,
+    weather, forecast and air pollution fall due on their own staggered
+    cadences. The most overdue responses are refreshed first, and at most
+    ``max_calls`` upstream calls are made per cycle; the rest wait for the
+    next one. Cycles are spaced by ``interval`` plus or minus ``jitter`` so
+    that several workers do not refresh in lockstep.
+
+    Parameters
+    ----------
+    model : FavoriteListModel
+        The model whose store is walked and whose response cache is filled.
+    api_key : str
+        The API key used for the refresh calls.
+    interval : float
+        Seconds between cycles.
+    jitter : float
+        Random variation of the interval, as a fraction of it.
+    max_calls : int
+        The maximum number of upstream calls per cycle.
+    max_parallelism : int
+        The maximum number of refresh calls in flight at once.
+    endpoints : tuple of str
+        The endpoints kept warm.
+    """
+
+    def __init__(self, model, api_key: str, interval: float = REFRESH_INTERVAL, jitter: float = REFRESH_JITTER,
+                 max_calls: int = REFRESH_MAX_CALLS, max_parallelism: int = REFRESH_PARALLELISM,
+                 endpoints: tuple = REFRESH_ENDPOINTS):
+        self.model = model
+        self.api_key = api_key
+        self.interval = interval
+        self.jitter = jitter
+        self.max_calls = max_calls
+        self.max_parallelism = max_parallelism
+        self.endpoints = tuple(endpoint for endpoint in endpoints if model.response_cache.is_cacheable(endpoint))
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "cycles": 0,
+            "refreshed": 0,
+            "errors": 0,
+            "deferred": 0,
+            "last_cycle_at": None,
+            "last_duration": 0.0,
+            "max_duration": 0.0,
+            "total_duration": 0.0,
+            "last_lag": 0.0,
+            "max_lag": 0.0,
+        }
+
+    def _due(self) -> list:
+        """Return ``(seconds_left, endpoint, latitude, longitude)`` for every response due, most urgent first.
+
+        A response is due if it would stop being fresh before the next cycle
+        could run; missing responses sort first.
+        """
+        cache = self.model.response_cache
+        horizon = self.interval * (1 + self.jitter)
+        due = {}  # Keyed by cache key, so locations that round to the same entry are refreshed once
+        for latitude, longitude in self.model.store.distinct_locations():
+            for endpoint in self.endpoints:
+                remaining = cache.expires_in(endpoint, latitude, longitude)
+                if remaining is None:
+                    remaining = float("-inf")
+                elif remaining >= horizon:
+                    continue
+                due[cache.make_key(endpoint, latitude, longitude)] = (remaining, endpoint, latitude, longitude)
+        return sorted(due.values(), key=lambda item: item[0])
+
+    def run_once(self) -> dict:
+        """Run one refresh cycle and return its summary.
+
+        Returns
+        -------
+        dict
+            ``refreshed``, ``errors`` and ``deferred`` counts, the cycle
+            ``duration`` in seconds and the ``lag``: how many seconds the
+            most overdue refreshed response had already been stale.
+        """
+        started = time.monotonic()
+        due = self._due()
+        batch, deferred = due[:self.max_calls], len(due) - min(len(due), self.max_calls)
+        tasks = {
+            (endpoint, latitude, longitude): (endpoint, latitude, longitude, self.api_key)
+            for _, endpoint, latitude, longitude in batch
+        }
+        results, errors = fan_out(self.model.refresh, tasks, self.max_parallelism, deadline=self.interval)
+        for key, error in errors.items():
+            logger.warning("Refreshing %s at (%s, %s) failed: %s", *key, error)
+
+        # Missing responses have no meaningful lag; only count ones that were cached and went stale.
+        lag = max([-remaining for remaining, *_ in batch if remaining != float("-inf")] + [0.0])
+        duration = time.monotonic() - started
+        with self._lock:
+            stats = self._stats
+            stats["cycles"] += 1
+            stats["refreshed"] += len(results)
+            stats["errors"] += len(errors)
+            stats["deferred"] += deferred
+            stats["last_cycle_at"] = time.time()
+            stats["last_duration"] = duration
+            stats["max_duration"] = max(stats["max_duration"], duration)
+            stats["total_duration"] += duration
+            stats["last_lag"] = lag
+            stats["max_lag"] = max(stats["max_lag"], lag)
+
+        if tasks or deferred:
+            logger.info("Refresh cycle: %d refreshed, %d failed, %d deferred in %.2fs (lag %.1fs).",
+                        len(results), len(errors), deferred, duration, lag)
+        return {"refreshed": len(results), "errors": len(errors), "deferred": deferred,
+                "duration": duration, "lag": lag}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Refresh cycle failed.")
+            delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+            self._stop.wait(max(delay, 0.0))
+
+    def start(self):
+        """Start refreshing on a daemon thread. Does nothing if already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+            self._thread.start()
+        logger.info("Weather refresher started (interval %.0fs, up to %d calls per cycle).",
+                    self.interval, self.max_calls)
+
+    def stop(self, timeout: float = None):
+        """Stop the refresher and wait for the current cycle to finish."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        """Return cycle counters plus refresh duration and lag statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_duration"] = stats["total_duration"] / stats["cycles"] if stats["cycles"] else 0.0
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
@@ -0,0 +1,163 @@
+import os
+import time
+
+from weather_app.utils.cache import TTLCache
+from weather_app.utils.spatial_grid import SpatialGrid
+
+
+# How long each OpenWeatherMap payload stays fresh. Current conditions are
+# refreshed upstream roughly every 10 minutes, forecasts every few hours and
+# air pollution readings hourly.
+DEFAULT_TTLS = {
+    "weather": float(os.getenv("WEATHER_CACHE_TTL", "600")),
+    "forecast": float(os.getenv("FORECAST_CACHE_TTL", "1800")),
+    "air_pollution": float(os.getenv("AIR_POLLUTION_CACHE_TTL", "3600")),
+}
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+# How long an expired response may still be served while it is refreshed in
+# the background (stale-while-revalidate). 0 disables stale reads.
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "300"))
+
+
+
+class ResponseCache:
+    """Shared cache of OpenWeatherMap responses keyed by endpoint and spatial grid cell.
+
+    All users share one cache, so a popular city is fetched upstream at most
+    once per TTL no matter how many users have it in their favorites.
+    Coordinates are quantized by a ``SpatialGrid``, so nearby favorites share
+    an entry too. Memory is bounded by an LRU over all endpoints.
+
+    A response is fresh for its endpoint's TTL and then stale for a further
+    ``stale_ttl`` seconds. ``get`` only returns fresh responses; ``lookup``
+    also returns stale ones so that callers can serve them immediately and
+    refresh in the background.
+
+    Parameters
+    ----------
+    ttls : dict, optional
+        Per-endpoint TTLs in seconds. Endpoints not listed are not cached.
+    maxsize : int
+        The maximum number of responses held across all endpoints.
+    stale_ttl : float
+        Seconds an expired response is kept for stale reads.
+    grid : SpatialGrid, optional
+        Maps coordinates to cells. Defaults to a grid with the configured
+        ``SPATIAL_GRID_PRECISIONS``.
+    clock : callable, optional
+        A zero-argument function returning the current time in seconds.
+    """
+
+    def __init__(self, ttls: dict = None, maxsize: int = RESPONSE_CACHE_SIZE,
+                 stale_ttl: float = RESPONSE_CACHE_STALE_TTL, grid: SpatialGrid = None, clock=time.monotonic):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.grid = grid if grid is not None else SpatialGrid()
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        # Entries are stored as (fresh_until, data) and evicted once the stale window has passed too.
+        self._cache = TTLCache(maxsize=maxsize, ttl=max(self.ttls.values(), default=1.0) + stale_ttl, clock=clock)
+
+    def make_key(self, endpoint: str, latitude: float, longitude: float) -> tuple:
+        """Build the cache key for an endpoint and a pair of coordinates: ``(endpoint, cell)``."""
+        return (endpoint, self.grid.cell(endpoint, latitude, longitude))
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        """Return True if responses for ``endpoint`` are cached."""
+        return endpoint in self.ttls
+
+    def get(self, endpoint: str, latitude: float, longitude: float):
+        """Return the cached response, or None if there is no fresh entry.
+
+        The returned object is shared between callers and must not be mutated.
+        """
+        data, fresh = self.lookup(endpoint, latitude, longitude)
+        return data if fresh else None
+
+    def lookup(self, endpoint: str, latitude: float, longitude: float) -> tuple:
+        """Return ``(data, fresh)``, where ``data`` may be a stale response.
+
+        ``(None, False)`` means there is nothing to serve at all.
+        """
+        if not self.is_cacheable(endpoint):
+            return None, False
+        entry = self._cache.get(self.make_key(endpoint, latitude, longitude))
+        if entry is None:
+            return None, False
+        fresh_until, data = entry
+        return data, fresh_until > self._clock()
+
+    def peek(self, endpoint: str, latitude: float, longitude: float):
+        """Return ``(data, expires_in)`` for a cached response, or None if it is not cached.
+
+        ``expires_in`` is the seconds until the response stops being fresh,
+        negative for a stale response. Looking an entry up this way does not
+        affect the cache statistics or the LRU order.
+        """
+        if not self.is_cacheable(endpoint):
+            return None
+        entry = self._cache.peek(self.make_key(endpoint, latitude, longitude))
+        if entry is None:
+            return None
+        fresh_until, data = entry[1]
+        return data, fresh_until - self._clock()
+
+    def expires_in(self, endpoint: str, latitude: float, longitude: float):
+        """Return the seconds until a response stops being fresh, or None if it is not cached.
+
+        The result is negative for a stale response; see ``peek``.
+        """
+        entry = self.peek(endpoint, latitude, longitude)
+        return None if entry is None else entry[1]
+
+    def set(self, endpoint: str, latitude: float, longitude: float, data):
+        """Cache ``data`` for the endpoint's TTL. Uncached endpoints are ignored."""
+        if not self.is_cacheable(endpoint):
+            return
+        ttl = self.ttls[endpoint]
+        self._cache.set(self.make_key(endpoint, latitude, longitude), (self._clock() + ttl, data),
+                        ttl=ttl + self.stale_ttl)
+
+    def invalidate(self, endpoint: str = None, latitude: float = None, longitude: float = None) -> int:
+        """Drop cached responses.
+
+        With no arguments the whole cache is cleared. An endpoint restricts
+        the drop to that endpoint, and coordinates restrict it to that
+        location; both may be combined.
+
+        Parameters
+        ----------
+        endpoint : str, optional
+            Only invalidate responses for this endpoint.
+        latitude : float, optional
+            Only invalidate responses for this latitude. Must be given
+            together with ``longitude``.
+        longitude : float, optional
+            Only invalidate responses for this longitude.
+
+        Returns
+        -------
+        int
+            The number of entries removed.
+
+        Raises
+        ------
+        ValueError
+            If only one of latitude and longitude is given.
+        """
+        if (latitude is None) != (longitude is None):
+            raise ValueError("latitude and longitude must be given together.")
+
+        def matches(key):
+            if endpoint is not None and key[0] != endpoint:
+                return False
+            return latitude is None or key == self.make_key(key[0], latitude, longitude)
+
+        return self._cache.delete_where(matches)
+
+    def stats(self) -> dict:
+        """Return the underlying LRU counters plus the configured TTLs."""
+        stats = self._cache.stats()
+        stats["ttls"] = dict(self.ttls)
+        stats["stale_ttl"] = self.stale_ttl
+        stats["grid_precisions"] = dict(self.grid.precisions)
+        return stats
@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+
+from weather_app.utils.cache import TTLCache
+from weather_app.utils.logger import configure_logger
+from weather_app.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(24 * 3600)))  # token lifetime in seconds
+# How long a verified session is trusted from memory. This bounds how long a
+# revocation made by another worker can go unnoticed.
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "60"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "100000"))
+
+
+class SessionManager:
+    """Issues, verifies and revokes signed, expiring session tokens.
+
+    A token is ``<session id>.<expiry>.<signature>``, signed with HMAC-SHA256.
+    Forged or expired tokens are rejected without any I/O. Valid sessions
+    are recorded in a ``sessions`` table and cached in memory, so verifying
+    an authenticated request is normally a signature check and a dictionary
+    lookup.
+
+    Parameters
+    ----------
+    secret : str, optional
+        The signing key. Defaults to ``SESSION_SECRET``; if that is unset a
+        random key is generated, and tokens do not survive a restart.
+    ttl : float
+        Token lifetime in seconds.
+    cache_ttl : float
+        Seconds a verified session is served from memory before SQLite is
+        consulted again.
+    cache_size : int
+        The maximum number of sessions cached in memory.
+    """
+
+    def __init__(self, secret: str = SESSION_SECRET, ttl: float = SESSION_TTL,
+                 cache_ttl: float = SESSION_CACHE_TTL, cache_size: int = SESSION_CACHE_SIZE):
+        if not secret:
+            logger.warning("SESSION_SECRET is not set; using a random key, sessions will not survive a restart.")
+            secret = secrets.token_hex(32)
+        self._key = secret.encode()
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_table(self):
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            with get_db_connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "session_id TEXT PRIMARY KEY, "
+                    "username TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions (username)")
+                conn.commit()
+            self._table_ready = True
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._key, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def _parse(self, token: str):
+        """Return ``(session_id, expires_at)`` for a well-signed, unexpired token, else None."""
+        try:
+            session_id, expires, signature = token.split(".")
+            expires_at = int(expires)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(f"{session_id}.{expires}")):
+            return None
+        if expires_at <= time.time():
+            return None
+        return session_id, expires_at
+
+    def issue(self, username: str) -> str:
+        """Create a session for ``username`` and return its token."""
+        self._ensure_table()
+        session_id = secrets.token_urlsafe(24)
+        expires_at = int(time.time() + self.ttl)
+        with get_db_connection() as conn:
+            conn.execute("INSERT INTO sessions (session_id, username, expires_at) VALUES (?, ?, ?)",
+                         (session_id, username, expires_at))
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+        self._cache.set(session_id, username)
+        logger.info("Session issued for user %s", username)
+        return f"{session_id}.{expires_at}.{self._sign(f'{session_id}.{expires_at}')}"
+
+    def verify(self, token: str):
+        """Return the username a token belongs to, or None if it is invalid, expired or revoked."""
+        parsed = self._parse(token)
+        if parsed is None:
+            return None
+        session_id, expires_at = parsed
+
+        username = self._cache.get(session_id)
+        if username is not None:
+            return username
+
+        self._ensure_table()
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT username FROM sessions WHERE session_id = ? AND expires_at > ?",
+                               (session_id, time.time())).fetchone()
+        if row is None:
+            return None
+        self._cache.set(session_id, row[0], ttl=min(self._cache.ttl, expires_at - time.time()))
+        return row[0]
+
+    def revoke(self, token: str) -> bool:
+        """Revoke the session behind a token. Returns False if the token was not valid."""
+        parsed = self._parse(token)
+        if parsed is None:
+            return False
+        session_id = parsed[0]
+        self._ensure_table()
+        with get_db_connection() as conn:
+            revoked = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount == 1
+            conn.commit()
+        self._cache.delete(session_id)
+        return revoked
+
+    def revoke_all(self, username: str) -> int:
+        """Revoke every session of a user. Returns the number of sessions revoked."""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            session_ids = [row[0] for row in conn.execute(
+                "SELECT session_id FROM sessions WHERE username = ?", (username,)
+            ).fetchall()]
+            conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+            conn.commit()
+        for session_id in session_ids:
+            self._cache.delete(session_id)
+        return len(session_ids)
@@ -0,0 +1,86 @@
+import threading
+
+
+class _Call:
+    """An in-flight call whose outcome is shared with every waiter."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers that arrive for
+    the same key while it is still running wait for it and receive the same
+    result, or have the same exception raised. Once the call finishes the
+    key is forgotten, so later callers trigger a fresh execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # Structure: {key: _Call}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """Run ``func()`` for ``key``, or wait for the identical call already in flight.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifies calls that are interchangeable.
+        func : callable
+            A zero-argument function performing the work.
+
+        Returns
+        -------
+        object
+            The return value of ``func``, possibly produced by another thread.
+
+        Raises
+        ------
+        Exception
+            Whatever ``func`` raised, in this thread and every waiting thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """Return the number of executions, coalesced calls and calls in flight."""
+        with self._lock:
+            total = self.executions + self.coalesced
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_ratio": self.coalesced / total if total else 0.0,
+            }
@@ -0,0 +1,99 @@
+import os
+
+
+# Coordinates are rounded to this many decimals (about 11 m) when an endpoint has no grid.
+COORDINATE_PRECISION = 4
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _parse_precisions(value: str) -> dict:
+    """Parse ``"endpoint=precision,endpoint=precision"`` into a dictionary."""
+    precisions = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        endpoint, _, precision = item.partition("=")
+        precisions[endpoint.strip()] = int(precision)
+    return precisions
+
+
+# Geohash length per endpoint. Length 5 cells are about 4.9 x 4.9 km, length 4
+# about 39 x 20 km; current conditions and forecasts are modelled on grids of a
+# similar size, and air quality varies over tens of kilometres. 0 disables the grid.
+SPATIAL_GRID_PRECISIONS = _parse_precisions(
+    os.getenv("SPATIAL_GRID_PRECISIONS", "weather=5,forecast=5,air_pollution=4")
+)
+
+
+def geohash(latitude: float, longitude: float, precision: int) -> str:
+    """Return the geohash of length ``precision`` of the cell containing a coordinate."""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2  # geohash interleaves bits starting with longitude
+    lat_bits = bits // 2
+    lat_cells, lon_cells = 1 << lat_bits, 1 << lon_bits
+    lat_index = min(max(int((latitude + 90.0) / 180.0 * lat_cells), 0), lat_cells - 1)
+    lon_index = min(max(int((longitude + 180.0) / 360.0 * lon_cells), 0), lon_cells - 1)
+
+    value = 0
+    for i in range(bits):
+        if i % 2 == 0:
+            lon_bits -= 1
+            value = (value << 1) | ((lon_index >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((lat_index >> lat_bits) & 1)
+    return "".join(_BASE32[(value >> shift) & 31] for shift in range(bits - 5, -1, -5))
+
+
+class SpatialGrid:
+    """Quantizes coordinates into per-endpoint geohash cells.
+
+    Favorites a few kilometres apart ("Santa Monica", "Venice", "Los
+    Angeles") get effectively the same weather, so every coordinate in a
+    cell shares one cache entry and one upstream call.
+
+    Parameters
+    ----------
+    precisions : dict, optional
+        Geohash length per endpoint. Endpoints not listed, or with precision
+        0, fall back to coordinates rounded to ``COORDINATE_PRECISION`` decimals.
+    """
+
+    def __init__(self, precisions: dict = None):
+        self.precisions = dict(SPATIAL_GRID_PRECISIONS if precisions is None else precisions)
+
+    def cell(self, endpoint: str, latitude: float, longitude: float):
+        """Return the cell key of a coordinate for an endpoint."""
+        precision = self.precisions.get(endpoint, 0)
+        if precision <= 0:
+            return (round(latitude, COORDINATE_PRECISION), round(longitude, COORDINATE_PRECISION))
+        return geohash(latitude, longitude, precision)
+
+    def collapse_stats(self, locations, endpoints=None) -> dict:
+        """Report how many upstream locations the grid saves for a set of coordinates.
+
+        Parameters
+        ----------
+        locations : iterable of tuple
+            ``(latitude, longitude)`` pairs, typically every favorited location.
+        endpoints : iterable of str, optional
+            The endpoints to report. Defaults to those with a configured precision.
+
+        Returns
+        -------
+        dict
+            Per endpoint: the ``precision``, the number of distinct
+            ``locations`` (after the default rounding), the number of
+            ``cells`` they fall in, and ``collapse_ratio``, the fraction of
+            upstream locations saved.
+        """
+        locations = {(round(lat, COORDINATE_PRECISION), round(lon, COORDINATE_PRECISION)) for lat, lon in locations}
+        stats = {}
+        for endpoint in (self.precisions if endpoints is None else endpoints):
+            cells = {self.cell(endpoint, lat, lon) for lat, lon in locations}
+            stats[endpoint] = {
+                "precision": self.precisions.get(endpoint, 0),
+                "locations": len(locations),
+                "cells": len(cells),
+                "collapse_ratio": 1 - len(cells) / len(locations) if locations else 0.0,
+            }
+        return stats
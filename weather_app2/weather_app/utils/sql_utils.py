@@ -1,9 +1,13 @@
 from contextlib import contextmanager
 import logging
 import os
+import queue
 import sqlite3
+import threading
+import time
 
 from weather_app.utils.logger import configure_logger
+from weather_app.utils.metrics import DB_ACQUIRE_SECONDS, DB_CONNECTION_SECONDS, DB_ERRORS
 
 
 logger = logging.getLogger(__name__)
@@ -13,14 +17,180 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/weather_app.db") #Has the name of the weather app database!
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))  # maximum number of open connections
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))  # seconds to wait for a free connection
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))  # how long SQLite waits on a locked database
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough under WAL
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of SQLite connections.
+
+    Connections are opened lazily up to ``size`` and then reused, so the
+    connect, pragma and schema-load cost is paid once per connection rather
+    than once per query. Each connection is configured for WAL journaling,
+    the configured synchronous level and a busy timeout, and keeps a cache of
+    prepared statements.
+
+    Parameters
+    ----------
+    db_path : str
+        The path of the SQLite database file.
+    size : int
+        The maximum number of connections open at once.
+    timeout : float
+        Seconds a checkout waits for a free connection before failing.
+    """
+
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # LIFO keeps the warmest connections in use
+        self._lock = threading.Lock()
+        self._closed = False
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # a connection is only ever used by the thread that checked it out
+            cached_statements=DB_STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS};")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS};")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, opening a new one if the pool is not yet full.
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            If the pool is closed, or no connection becomes free within the pool timeout.
+        """
+        if self._closed:
+            raise sqlite3.OperationalError("The database connection pool is closed")
+        started = time.monotonic()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._connect()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back any uncommitted work.
+
+        If the pool has been closed, the connection is closed instead.
+        """
+        with self._lock:
+            self._in_use -= 1
+            closed = self._closed
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.error("Discarding broken database connection: %s", e)
+            closed = True
+        if closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Close every idle connection. Connections in use are closed when released."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> dict:
+        """Return pool size, utilization and checkout wait-time statistics."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "utilization": self._in_use / self.size if self.size else 0.0,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "total_wait_seconds": self._total_wait,
+                "avg_wait_seconds": self._total_wait / self._checkouts if self._checkouts else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the pool for the current ``DB_PATH``, replacing it if the path changed or it was closed."""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.db_path == DB_PATH and not pool.closed:
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.db_path != DB_PATH or _pool.closed:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_PATH)
+            logger.info("Created database connection pool for %s (size %d).", DB_PATH, _pool.size)
+        return _pool
+
 
 def check_database_connection():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        # This ensures the connection is actually active
-        cursor.execute("SELECT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # This ensures the connection is actually active
+            cursor.execute("SELECT 1;")
     except sqlite3.Error as e:
         error_message = f"Database connection error: {e}"
         logger.error(error_message)
@@ -28,10 +198,9 @@ def check_database_connection():
 
 def check_table_exists(tablename: str):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
     except sqlite3.Error as e:
         error_message = f"Table check error: {e}"
         logger.error(error_message)
@@ -40,19 +209,28 @@ def check_table_exists(tablename: str):
 ###################################################
 #
 # This one yields rather than returns.
-# What is the type of the yielded value?
+# It yields a pooled sqlite3.Connection; the connection
+# goes back to the pool (not closed) when the block exits.
 #
 ###################################################
 @contextmanager
 def get_db_connection():
-    conn = None
+    pool = get_pool()
+    started = time.perf_counter()
+    try:
+        conn = pool.acquire()
+    except sqlite3.Error as e:
+        DB_ERRORS.inc()
+        logger.error("Database connection error: %s", str(e))
+        raise e
+    acquired = time.perf_counter()
+    DB_ACQUIRE_SECONDS.observe(acquired - started)
     try:
-        conn = sqlite3.connect(DB_PATH)
         yield conn
     except sqlite3.Error as e:
+        DB_ERRORS.inc()
         logger.error("Database connection error: %s", str(e))
         raise e
     finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+        pool.release(conn)
+        DB_CONNECTION_SECONDS.observe(time.perf_counter() - acquired)
@@ -0,0 +1,210 @@
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from weather_app.utils.logger import configure_logger
+from weather_app.utils.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "weather_tiles"))
+TILE_CACHE_MAX_BYTES = int(os.getenv("TILE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+TILE_CACHE_TTL = float(os.getenv("TILE_CACHE_TTL", "1800"))  # default seconds a tile stays fresh
+
+
+def _parse_layer_ttls(value: str) -> dict:
+    """Parse ``"layer=seconds,layer=seconds"`` into a dictionary."""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        layer, _, seconds = item.partition("=")
+        ttls[layer.strip()] = float(seconds)
+    return ttls
+
+
+# Precipitation radar changes fastest; pressure and temperature fields slowest.
+TILE_CACHE_LAYER_TTLS = _parse_layer_ttls(os.getenv(
+    "TILE_CACHE_LAYER_TTLS", "precipitation_new=600,clouds_new=1200,wind_new=1800,pressure_new=3600,temp_new=3600"
+))
+
+
+def _process_exists(pid: int) -> bool:
+    """Return True if a process with this PID is running."""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TileEntry:
+    """A cached tile: where its bytes live on disk and how long they stay fresh."""
+
+    __slots__ = ("digest", "path", "size", "expires_at")
+
+    def __init__(self, digest: str, path: str, size: int, expires_at: float):
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self.expires_at = expires_at
+
+    def max_age(self) -> int:
+        """Seconds of freshness left, for the Cache-Control header."""
+        return max(int(self.expires_at - time.time()), 0)
+
+
+class TileCache:
+    """Size-bounded, content-addressed disk cache of map tile images.
+
+    Tile bytes are stored under their SHA-256 digest, so identical tiles
+    (most weather layers are empty over large areas) share one file on disk,
+    and the digest doubles as a strong ETag. An in-memory LRU index maps
+    ``(layer, z, x, y)`` to a digest; when the unique bytes on disk exceed
+    ``max_bytes`` the least recently used tiles are dropped and files no
+    longer referenced are deleted. Each layer has its own TTL.
+
+    The index lives in memory, so each process keeps its files in a
+    directory of its own (and the size cap applies per process). Directories
+    left behind by processes that are no longer running are removed when a
+    cache is created.
+
+    Parameters
+    ----------
+    directory : str
+        Where tile files are written.
+    max_bytes : int
+        The maximum total size of the files on disk.
+    default_ttl : float
+        Seconds a tile stays fresh if its layer has no TTL of its own.
+    layer_ttls : dict, optional
+        Per-layer TTLs in seconds.
+    """
+
+    def __init__(self, directory: str = TILE_CACHE_DIR, max_bytes: int = TILE_CACHE_MAX_BYTES,
+                 default_ttl: float = TILE_CACHE_TTL, layer_ttls: dict = None):
+        self.directory = os.path.join(directory, f"worker-{os.getpid()}")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.layer_ttls = dict(TILE_CACHE_LAYER_TTLS if layer_ttls is None else layer_ttls)
+        self._index = OrderedDict()  # Structure: {(layer, z, x, y): TileEntry}, in LRU order
+        self._refs = {}  # Structure: {digest: number of index entries using the file}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            pid = name[len("worker-"):]
+            if name.startswith("worker-") and pid.isdigit() and not _process_exists(int(pid)):
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        self.clear()
+
+    def ttl_for(self, layer: str) -> float:
+        """Return the TTL of a layer's tiles in seconds."""
+        return self.layer_ttls.get(layer, self.default_ttl)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], f"{digest}.png")
+
+    def get(self, layer: str, z: int, x: int, y: int, fetch) -> TileEntry:
+        """Return the cached tile, calling ``fetch()`` for its bytes on a miss or after it expires.
+
+        Concurrent misses for the same tile share one ``fetch`` call.
+
+        Raises
+        ------
+        Exception
+            Whatever ``fetch`` raised.
+        """
+        key = (layer, z, x, y)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and entry.expires_at > time.time():
+                self._index.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        return self._single_flight.do(key, lambda: self._store(key, fetch()))
+
+    def _store(self, key: tuple, content: bytes) -> TileEntry:
+        digest = hashlib.sha256(content).hexdigest()
+        entry = TileEntry(digest, self._path(digest), len(content), time.time() + self.ttl_for(key[0]))
+
+        # Files are written and deleted under the lock so that a file is never removed while a new
+        # entry takes a reference to it. Tiles are a few kilobytes, so the lock is held only briefly.
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._release(old.digest, old.size)
+            if digest not in self._refs:
+                self._write(entry.path, content)
+                self._refs[digest] = 0
+                self._bytes += entry.size
+            self._refs[digest] += 1
+            self._index[key] = entry
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                _, evicted = self._index.popitem(last=False)
+                self.evictions += 1
+                self._release(evicted.digest, evicted.size)
+        return entry
+
+    @staticmethod
+    def _write(path: str, content: bytes):
+        """Write a file atomically, so that readers never see a partial tile."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+
+    def _release(self, digest: str, size: int):
+        """Drop one reference to a file, deleting it once unused. Call with the lock held."""
+        self._refs[digest] -= 1
+        if self._refs[digest] > 0:
+            return
+        del self._refs[digest]
+        self._bytes -= size
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove every tile from the cache and from disk."""
+        with self._lock:
+            self._index.clear()
+            self._refs.clear()
+            self._bytes = 0
+        blobs = os.path.join(self.directory, "blobs")
+        shutil.rmtree(blobs, ignore_errors=True)
+        os.makedirs(blobs, exist_ok=True)
+
+    def stats(self) -> dict:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tiles": len(self._index),
+                "files": len(self._refs),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+import math
+import os
+import threading
+
+import numpy as np
+
+
+# Zoom used by /weather/map when none is requested.
+DEFAULT_MAP_ZOOM = int(os.getenv("DEFAULT_MAP_ZOOM", "5"))
+# Zoom levels whose tiles are precomputed when a favorite is added.
+PRECOMPUTED_ZOOMS = tuple(int(z) for z in os.getenv("PRECOMPUTED_ZOOMS", "3,4,5,6,7,8").split(","))
+# Locations whose precomputed tiles are kept; the least recently used are dropped beyond this.
+TILE_INDEX_SIZE = int(os.getenv("TILE_INDEX_SIZE", "10000"))
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+# Web Mercator is undefined at the poles; tiles stop at this latitude.
+MAX_LATITUDE = 85.05112878
+
+CRITERIA_TO_LAYER = {
+    "clouds": "clouds_new",
+    "precipitation": "precipitation_new",
+    "sea_level_pressure": "pressure_new",
+    "wind_speed": "wind_new",
+    "temperature": "temp_new",
+}
+
+
+def validate_zoom(zoom: int) -> int:
+    """Return ``zoom`` if it is a supported zoom level, else raise ValueError."""
+    if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+        raise ValueError(f"Invalid zoom: {zoom}. Zoom must be between {MIN_ZOOM} and {MAX_ZOOM}.")
+    return zoom
+
+
+def latlon_to_tile(latitude: float, longitude: float, zoom: int) -> tuple:
+    """Convert a coordinate to the ``(x, y)`` of the Web Mercator tile containing it."""
+    n = 2 ** zoom  # number of tiles along each axis at this zoom level
+    lat_rad = math.radians(min(max(latitude, -MAX_LATITUDE), MAX_LATITUDE))
+    x = (longitude + 180.0) / 360.0 * n
+    y = (1.0 - math.log(math.tan(lat_rad) + (1.0 / math.cos(lat_rad))) / math.pi) / 2.0 * n
+    # Convert to int and clamp to valid range [0, 2^z - 1]
+    return int(min(max(x, 0), n - 1)), int(min(max(y, 0), n - 1))
+
+
+def latlon_to_tiles(latitudes, longitudes, zooms) -> tuple:
+    """Convert arrays of coordinates to tile coordinates at several zoom levels at once.
+
+    Parameters
+    ----------
+    latitudes, longitudes : array-like of float
+        Coordinates of the same length ``n``.
+    zooms : array-like of int
+        The ``k`` zoom levels to compute.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(x, y)``, two integer arrays of shape ``(k, n)``; row ``i`` holds
+        the tiles at ``zooms[i]``.
+    """
+    lat_rad = np.radians(np.clip(np.asarray(latitudes, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    lon = np.asarray(longitudes, dtype=np.float64)
+    n = np.exp2(np.asarray(zooms, dtype=np.float64))[:, np.newaxis]
+
+    # The projection only depends on the coordinates; scaling by 2^z is the only per-zoom work.
+    x_unit = (lon + 180.0) / 360.0
+    y_unit = (1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0
+    x = np.clip(np.floor(x_unit * n), 0, n - 1).astype(np.int64)
+    y = np.clip(np.floor(y_unit * n), 0, n - 1).astype(np.int64)
+    return x, y
+
+
+def covering_tiles(latitudes, longitudes, zooms) -> list:
+    """Return the deduplicated ``(z, x, y)`` tiles containing any of the coordinates, sorted."""
+    zooms = np.asarray(list(zooms), dtype=np.int64)
+    if len(latitudes) == 0 or len(zooms) == 0:
+        return []
+    x, y = latlon_to_tiles(latitudes, longitudes, zooms)
+    z = np.broadcast_to(zooms[:, np.newaxis], x.shape)
+    unique = np.unique(np.stack([z.ravel(), x.ravel(), y.ravel()], axis=1), axis=0)
+    return [tuple(int(value) for value in row) for row in unique]
+
+
+class TileIndex:
+    """Precomputed tile coordinates of favorited locations.
+
+    Tiles for ``zooms`` are computed once, in a single vectorized pass, when
+    locations are added; lookups at those zooms are dictionary reads. Other
+    zoom levels, and locations that have been evicted, are computed on demand.
+
+    Parameters
+    ----------
+    zooms : tuple of int
+        The zoom levels to precompute.
+    maxsize : int
+        How many locations to keep; the least recently used are evicted first.
+    """
+
+    def __init__(self, zooms: tuple = PRECOMPUTED_ZOOMS, maxsize: int = TILE_INDEX_SIZE):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer.")
+        self.zooms = tuple(validate_zoom(zoom) for zoom in zooms)
+        self.maxsize = maxsize
+        self._tiles = OrderedDict()  # Structure: {(latitude, longitude): {zoom: (x, y)}}, in LRU order
+        self._lock = threading.Lock()
+
+    def add_many(self, locations):
+        """Precompute the tiles of several ``(latitude, longitude)`` pairs."""
+        locations = [location for location in locations if location not in self._tiles]
+        if not locations or not self.zooms:
+            return
+        latitudes, longitudes = zip(*locations)
+        x, y = latlon_to_tiles(latitudes, longitudes, self.zooms)
+        computed = {
+            location: {zoom: (int(x[i, j]), int(y[i, j])) for i, zoom in enumerate(self.zooms)}
+            for j, location in enumerate(locations)
+        }
+        with self._lock:
+            self._tiles.update(computed)
+            while len(self._tiles) > self.maxsize:
+                self._tiles.popitem(last=False)
+
+    def add(self, latitude: float, longitude: float):
+        """Precompute the tiles of one location."""
+        self.add_many([(latitude, longitude)])
+
+    def get(self, latitude: float, longitude: float, zoom: int) -> tuple:
+        """Return the ``(x, y)`` tile of a location at ``zoom``."""
+        with self._lock:
+            tiles = self._tiles.get((latitude, longitude))
+            if tiles is not None:
+                self._tiles.move_to_end((latitude, longitude))
+        tile = tiles.get(zoom) if tiles is not None else None
+        if tile is None:
+            tile = latlon_to_tile(latitude, longitude, validate_zoom(zoom))
+        return tile
+
+    def __len__(self):
+        return len(self._tiles)